@@ -1,34 +1,55 @@
 from flask import Flask, request, redirect
-from flask_cors import CORS
 from .config import Config
-from .extensions import db, jwt, mail, migrate, oauth
-import os
+from .extensions import db, jwt, mail, migrate, oauth, room_cache
+from .utils.outbox import outbox, purge_old_emails
+from .utils.hashing import password_hasher
+from .utils.log import setup_logging
+from .utils.payments import payment_gateway
+from .utils.idempotency import idempotency_store, purge_expired_keys
+from .utils.scheduler import scheduler
+from .utils.ratelimit import rate_limiter
+from .utils.cors import init_cors
+from .utils.proxy import init_proxy_fix
+from .utils.sqlite import init_sqlite
+from .utils.replicas import init_replicas
+from .utils.metrics import metrics
+from .utils.principal import principal_cache
+from .commands import register_commands
 from dotenv import load_dotenv
-import razorpay
 
-def create_app():
+def create_app(test_config=None):
     load_dotenv()
     app = Flask(__name__)
     app.config.from_object(Config)
+    if test_config:
+        app.config.update(test_config)
     app.config['STRICT_SLASHES'] = False
+    setup_logging(app)
+    metrics.init_app(app)
 
-    # Initialize Razorpay client and store in app.config
-    app.config['RAZORPAY_CLIENT'] = razorpay.Client(auth=(
-        os.getenv('RAZORPAY_KEY_ID'),
-        os.getenv('RAZORPAY_KEY_SECRET')
-    ))
-
-    # Enable CORS for frontend (Vite)
-    CORS(app, origins="http://localhost:5173", supports_credentials=True)
+    # CORS for the frontend, answered at the WSGI layer before routing
+    init_cors(app)
+    # Outermost, so everything below sees the client's address rather than the proxy's
+    init_proxy_fix(app)
 
     # Initialize extensions
     db.init_app(app)
+    init_sqlite(app)
+    init_replicas(app)
     jwt.init_app(app)
     mail.init_app(app)
     migrate.init_app(app, db)
     oauth.init_app(app)
+    room_cache.init_app(app)
+    outbox.init_app(app)
+    password_hasher.init_app(app)
+    principal_cache.init_app(app)
+    payment_gateway.init_app(app)
+    idempotency_store.init_app(app)
+    scheduler.init_app(app)
+    rate_limiter.init_app(app)
 
-    # Register Google OAuth
+    # Register Google OAuth (provider metadata is fetched on first login, once per process)
     oauth.register(
         name='google',
         client_id=app.config['GOOGLE_CLIENT_ID'],
@@ -41,31 +62,35 @@ def create_app():
     from .routes.auth import auth_bp
     from .routes.rooms import rooms_bp
     from .routes.bookings import bookings_bp
+    from .routes.admin import admin_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(rooms_bp, url_prefix='/api/rooms')
     app.register_blueprint(bookings_bp, url_prefix='/api/bookings')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+
+    register_commands(app)
+
+    # Background maintenance
+    from .utils.holds import sweep_expired_holds
+    from .utils.otp import purge_expired_otps
+    scheduler.add_job('release-expired-holds', app.config['ROOM_HOLD_SWEEP_INTERVAL'], sweep_expired_holds)
+    scheduler.add_job('purge-expired-otps', app.config['OTP_PURGE_INTERVAL'], purge_expired_otps)
+    scheduler.add_job('purge-old-emails', app.config['MAIL_OUTBOX_PURGE_INTERVAL'], purge_old_emails)
+    if app.config['IDEMPOTENCY_BACKEND'] == 'database':
+        scheduler.add_job('purge-idempotency-keys', app.config['IDEMPOTENCY_PURGE_INTERVAL'], purge_expired_keys)
+    if metrics.directory:
+        scheduler.add_job('flush-metrics', app.config['METRICS_FLUSH_INTERVAL'], metrics.flush)
 
     # Normalize trailing slashes
     @app.before_request
     def normalize_path():
         if request.path.endswith('/') and request.path != '/':
-            if request.method == 'OPTIONS':
-                request.environ['PATH_INFO'] = request.path.rstrip('/')
-            else:
-                return redirect(request.path.rstrip('/'), code=301)
-
-    # Add CORS headers even to error responses
-    @app.after_request
-    def add_cors_headers(response):
-        response.headers['Access-Control-Allow-Origin'] = 'http://localhost:5173'
-        response.headers['Access-Control-Allow-Credentials'] = 'true'
-        response.headers['Access-Control-Allow-Methods'] = 'GET,POST,PUT,DELETE,OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization'
-        return response
+            return redirect(request.path.rstrip('/'), code=301)
 
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    # Schema is managed by `flask init-db` / `flask db upgrade`; opt in for throwaway local databases
+    if app.config['AUTO_CREATE_TABLES']:
+        with app.app_context():
+            db.create_all()
 
     return app
\ No newline at end of file
@@ -0,0 +1,46 @@
+import click
+from flask_migrate import stamp
+from sqlalchemy import inspect
+from .extensions import db
+from .models.user import User
+from .utils.availability import rebuild_room_nights
+from .utils.reports import rebuild_booking_stats
+
+def register_commands(app):
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create every table in an empty database and mark migrations as applied."""
+        if inspect(db.engine).get_table_names():
+            print('Database already has tables; run `flask db upgrade` instead')
+            return
+        db.create_all()
+        stamp()
+        print('Database initialized')
+
+    @app.cli.command('promote-admin')
+    @click.argument('email')
+    def promote_admin_command(email):
+        """Give an existing user admin rights."""
+        user = User.query.filter_by(email=email).first()
+        if not user:
+            print(f'No user with email {email}')
+            return
+        user.is_admin = True
+        db.session.commit()
+        print(f'{email} is now an admin')
+
+    @app.cli.command('rebuild-room-nights')
+    def rebuild_room_nights_command():
+        """Recreate booked night slots from the bookings table."""
+        nights, conflicts = rebuild_room_nights()
+        db.session.commit()
+        print(f'Rebuilt {nights} booked night(s)')
+        if conflicts:
+            print(f'Skipped {conflicts} night(s) claimed by more than one booking')
+
+    @app.cli.command('rebuild-booking-stats')
+    def rebuild_booking_stats_command():
+        """Recompute the daily occupancy and revenue rollup from the bookings table."""
+        rows = rebuild_booking_stats()
+        db.session.commit()
+        print(f'Rebuilt {rows} daily stat row(s)')
@@ -9,9 +9,55 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key')
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-jwt-secret-key')
 
+    # Seconds an authenticated user's snapshot is reused across requests (0 disables). The cache is
+    # per worker process: after a profile update, other workers may serve the old snapshot for up to this long
+    PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL', 30))
+    PRINCIPAL_CACHE_MAX_ENTRIES = int(os.environ.get('PRINCIPAL_CACHE_MAX_ENTRIES', 10000))
+
     # Database
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///hotel.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Connection pool per worker process (SQLite keeps SQLAlchemy's defaults)
+    SQLALCHEMY_ENGINE_OPTIONS = {} if SQLALCHEMY_DATABASE_URI.startswith('sqlite') else {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'True') == 'True'
+    }
+    # Read replicas (comma-separated URLs) for @read_only views; a client that writes reads
+    # from the primary for REPLICA_STICKY_SECONDS afterwards
+    DATABASE_REPLICA_URLS = [u.strip() for u in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if u.strip()]
+    SQLALCHEMY_BINDS = {f'replica_{i}': url for i, url in enumerate(DATABASE_REPLICA_URLS)}
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+
+    # Opt-in SQLite profile: WAL, synchronous=NORMAL, busy/mmap/cache pragmas and one writer per process
+    SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'False') == 'True'
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))  # ms
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024))  # negative = KiB
+    SQLITE_WRITE_LOCK_TIMEOUT = float(os.environ.get('SQLITE_WRITE_LOCK_TIMEOUT', 30))
+    # Run db.create_all() on every app start (off: use `flask init-db` once, then migrations)
+    AUTO_CREATE_TABLES = os.environ.get('AUTO_CREATE_TABLES', 'False') == 'True'
+
+    # Password hashing (werkzeug method string; stored hashes are upgraded on login)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_SALT_LENGTH = int(os.environ.get('PASSWORD_HASH_SALT_LENGTH', 16))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 16))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+    PASSWORD_HASH_RETRY_AFTER = int(os.environ.get('PASSWORD_HASH_RETRY_AFTER', 1))
+
+    # Production server (gunicorn.conf.py); GUNICORN_WORKERS=0 means 2 * CPUs + 1
+    GUNICORN_BIND = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+    GUNICORN_WORKERS = int(os.environ.get('GUNICORN_WORKERS', 0))
+    GUNICORN_WORKER_CLASS = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+    GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', 4))
+    GUNICORN_KEEPALIVE = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+    GUNICORN_TIMEOUT = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+    GUNICORN_GRACEFUL_TIMEOUT = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+    GUNICORN_MAX_REQUESTS = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+    GUNICORN_MAX_REQUESTS_JITTER = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
 
     # Mail Configuration
     MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
@@ -22,10 +68,113 @@ class Config:
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER', 'no-reply@hotelbooking.com')
 
+    # Idempotency-Key response store: 'database' (idempotency_keys table) or 'redis' are shared by all
+    # workers; 'memory' is per process, so duplicates routed to different workers both run
+    IDEMPOTENCY_BACKEND = os.environ.get('IDEMPOTENCY_BACKEND', 'database')
+    IDEMPOTENCY_URL = os.environ.get('IDEMPOTENCY_URL', 'redis://localhost:6379/0')
+    IDEMPOTENCY_MAX_ENTRIES = int(os.environ.get('IDEMPOTENCY_MAX_ENTRIES', 10000))
+    IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', 24 * 3600))
+    IDEMPOTENCY_LOCK_TTL = int(os.environ.get('IDEMPOTENCY_LOCK_TTL', 60))
+    IDEMPOTENCY_WAIT = float(os.environ.get('IDEMPOTENCY_WAIT', 10))
+    IDEMPOTENCY_PURGE_INTERVAL = int(os.environ.get('IDEMPOTENCY_PURGE_INTERVAL', 3600))
+
+    # One-time codes: lifetime, wrong guesses per code, and send throttles per email / client IP
+    OTP_TTL = int(os.environ.get('OTP_TTL', 600))
+    OTP_MAX_ATTEMPTS = int(os.environ.get('OTP_MAX_ATTEMPTS', 5))
+    OTP_RESEND_INTERVAL = int(os.environ.get('OTP_RESEND_INTERVAL', 60))
+    OTP_SEND_WINDOW = int(os.environ.get('OTP_SEND_WINDOW', 3600))
+    OTP_MAX_SENDS_PER_EMAIL = int(os.environ.get('OTP_MAX_SENDS_PER_EMAIL', 5))
+    OTP_MAX_SENDS_PER_IP = int(os.environ.get('OTP_MAX_SENDS_PER_IP', 20))
+    OTP_PURGE_INTERVAL = int(os.environ.get('OTP_PURGE_INTERVAL', 300))
+
+    # CORS (comma-separated origins; preflights are answered by WSGI middleware)
+    CORS_ORIGINS = [o.strip() for o in os.environ.get('CORS_ORIGINS', 'http://localhost:5173').split(',') if o.strip()]
+    CORS_METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS']
+    CORS_ALLOW_HEADERS = ['Content-Type', 'Authorization', 'Idempotency-Key', 'X-Request-ID']
+    CORS_EXPOSE_HEADERS = ['ETag', 'X-Next-Cursor', 'Idempotent-Replayed', 'Retry-After', 'X-Request-ID']
+    CORS_MAX_AGE = int(os.environ.get('CORS_MAX_AGE', 600))
+    CORS_SUPPORTS_CREDENTIALS = os.environ.get('CORS_SUPPORTS_CREDENTIALS', 'True') == 'True'
+
+    # Reverse proxies in front of the app: how many hops to trust for each X-Forwarded-* header.
+    # Rate limits and OTP throttles key on the client IP, so set PROXY_FIX_X_FOR to the number of
+    # proxies that append to X-Forwarded-For (1 behind nginx); with 0 every client shares the
+    # proxy's address. Never set it higher than the real hop count or clients can spoof their IP.
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    PROXY_FIX_X_PROTO = int(os.environ.get('PROXY_FIX_X_PROTO', 0))
+    PROXY_FIX_X_HOST = int(os.environ.get('PROXY_FIX_X_HOST', 0))
+    PROXY_FIX_X_PORT = int(os.environ.get('PROXY_FIX_X_PORT', 0))
+    PROXY_FIX_X_PREFIX = int(os.environ.get('PROXY_FIX_X_PREFIX', 0))
+
+    # Token-bucket rate limits: endpoint -> ['<count>/<second|minute|hour|day>:<ip|user|email>', ...]
+    # ('memory' buckets are per process; use 'redis' to share them across workers)
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True') == 'True'
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_URL = os.environ.get('RATE_LIMIT_URL', 'redis://localhost:6379/0')
+    RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', 100000))
+    RATE_LIMITS = {
+        'auth.login': ['20/minute:ip', '5/minute:email'],
+        'auth.signup': ['5/minute:ip'],
+        'auth.verify_otp': ['20/minute:ip', '10/minute:email'],
+        'auth.resend_otp': ['5/minute:ip', '3/minute:email'],
+        'auth.forgot_password': ['5/minute:ip', '3/minute:email'],
+        'auth.reset_password': ['10/minute:ip', '5/minute:email'],
+        'bookings.create_order': ['10/minute:user', '30/minute:ip'],
+        'bookings.book_room': ['10/minute:user']
+    }
+
+    # Room holds taken at order creation while the guest pays
+    ROOM_HOLD_MINUTES = int(os.environ.get('ROOM_HOLD_MINUTES', 15))
+    ROOM_HOLD_SWEEP_INTERVAL = int(os.environ.get('ROOM_HOLD_SWEEP_INTERVAL', 60))
+
+    # Email outbox: messages are committed with the request and sent by background workers
+    MAIL_OUTBOX_WORKERS = int(os.environ.get('MAIL_OUTBOX_WORKERS', 1))
+    MAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('MAIL_OUTBOX_BATCH_SIZE', 50))
+    MAIL_OUTBOX_POLL_INTERVAL = float(os.environ.get('MAIL_OUTBOX_POLL_INTERVAL', 5))
+    MAIL_OUTBOX_LEASE_SECONDS = int(os.environ.get('MAIL_OUTBOX_LEASE_SECONDS', 300))
+    MAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('MAIL_OUTBOX_MAX_ATTEMPTS', 5))
+    MAIL_OUTBOX_RETRY_BACKOFF = int(os.environ.get('MAIL_OUTBOX_RETRY_BACKOFF', 30))
+    # Sent and failed messages (OTP and reset codes included) are deleted after this many days
+    MAIL_OUTBOX_RETENTION_DAYS = int(os.environ.get('MAIL_OUTBOX_RETENTION_DAYS', 7))
+    MAIL_OUTBOX_PURGE_INTERVAL = int(os.environ.get('MAIL_OUTBOX_PURGE_INTERVAL', 3600))
+
+    # Razorpay (RAZORPAY_BASE_URL overrides the API endpoint, e.g. for a local fake gateway)
+    RAZORPAY_KEY_ID = os.environ.get('RAZORPAY_KEY_ID')
+    RAZORPAY_KEY_SECRET = os.environ.get('RAZORPAY_KEY_SECRET')
+    RAZORPAY_BASE_URL = os.environ.get('RAZORPAY_BASE_URL')
+    RAZORPAY_CONNECT_TIMEOUT = float(os.environ.get('RAZORPAY_CONNECT_TIMEOUT', 3))
+    RAZORPAY_READ_TIMEOUT = float(os.environ.get('RAZORPAY_READ_TIMEOUT', 10))
+    RAZORPAY_MAX_RETRIES = int(os.environ.get('RAZORPAY_MAX_RETRIES', 2))
+    RAZORPAY_RETRY_BACKOFF = float(os.environ.get('RAZORPAY_RETRY_BACKOFF', 0.2))
+    RAZORPAY_POOL_SIZE = int(os.environ.get('RAZORPAY_POOL_SIZE', 10))
+    RAZORPAY_BREAKER_THRESHOLD = int(os.environ.get('RAZORPAY_BREAKER_THRESHOLD', 5))
+    RAZORPAY_BREAKER_RESET = float(os.environ.get('RAZORPAY_BREAKER_RESET', 30))
+
     # Google OAuth
     GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
     GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET')
 
+    # Logging (JSON lines, written off the request thread). '{pid}' in LOG_FILE gives each worker
+    # its own file; keep it when running several workers, since they cannot safely rotate one file
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+    LOG_FILE = os.environ.get('LOG_FILE', 'app-{pid}.log')
+    LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES', 10 * 1024 * 1024))
+    LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT', 5))
+
+    # /metrics (Prometheus text format). Set METRICS_DIR to a directory shared by all workers
+    # to report totals across processes; METRICS_TOKEN requires 'Authorization: Bearer <token>'
+    METRICS_DIR = os.environ.get('METRICS_DIR', '')
+    METRICS_FLUSH_INTERVAL = int(os.environ.get('METRICS_FLUSH_INTERVAL', 10))
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+    # Room catalog cache ('memory' per process, or 'redis' shared across workers). With 'memory'
+    # and several gunicorn workers, an admin edit clears only the worker that served it; the others
+    # keep serving the old catalog for up to ROOM_CACHE_TTL seconds. Use 'redis' (or a short TTL)
+    # whenever GUNICORN_WORKERS is above 1
+    ROOM_CACHE_BACKEND = os.environ.get('ROOM_CACHE_BACKEND', 'memory')
+    ROOM_CACHE_URL = os.environ.get('ROOM_CACHE_URL', 'redis://localhost:6379/0')
+    ROOM_CACHE_MAX_ENTRIES = int(os.environ.get('ROOM_CACHE_MAX_ENTRIES', 256))
+    ROOM_CACHE_TTL = int(os.environ.get('ROOM_CACHE_TTL', 300))
+
     # For local dev: allow insecure transport (only for development!)
     os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
     
\ No newline at end of file
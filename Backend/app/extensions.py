@@ -5,9 +5,11 @@ from flask_mail import Mail
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 from authlib.integrations.flask_client import OAuth
+from .utils.cache import RoomCatalogCache
+from .utils.replicas import RoutingSession
 
-# SQLAlchemy for DB
-db = SQLAlchemy()
+# SQLAlchemy for DB (read-only views may be routed to replicas)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Flask-Mail for sending emails
 mail = Mail()
@@ -20,3 +22,6 @@ migrate = Migrate()
 
 # OAuth client (Google, etc.)
 oauth = OAuth()  # ✅ Initialized later with app in create_app()
+
+# Pre-serialized room catalog responses
+room_cache = RoomCatalogCache()
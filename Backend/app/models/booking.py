@@ -3,9 +3,16 @@ from datetime import datetime
 
 class Booking(db.Model):
     __tablename__ = 'bookings'
+    __table_args__ = (
+        # Availability lives in room_nights; this only serves room deletes and the foreign key
+        db.Index('ix_bookings_room_id', 'room_id'),
+        db.Index('ix_bookings_user_id_created_at', 'user_id', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
+    room_type = db.Column(db.String(50), nullable=True)  # Room's type when booked; reports roll up by it
     start_date = db.Column(db.DateTime, nullable=False)
     end_date = db.Column(db.DateTime, nullable=False)
     guest_name = db.Column(db.String(100), nullable=False)
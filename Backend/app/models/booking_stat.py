@@ -0,0 +1,11 @@
+from ..extensions import db
+
+class DailyBookingStat(db.Model):
+    """Per-day, per-room-type rollup of sold nights and revenue, kept current by booking events."""
+    __tablename__ = 'daily_booking_stats'
+
+    day = db.Column(db.Date, primary_key=True)
+    room_type = db.Column(db.String(50), primary_key=True)
+    nights_sold = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    check_ins = db.Column(db.Integer, nullable=False, default=0)
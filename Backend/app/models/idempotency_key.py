@@ -0,0 +1,12 @@
+from ..extensions import db
+
+class IdempotencyKey(db.Model):
+    """A claimed or completed Idempotency-Key, shared by every worker process."""
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        db.Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+
+    key = db.Column(db.String(64), primary_key=True)  # sha256 of the endpoint/caller-scoped key
+    value = db.Column(db.LargeBinary, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
@@ -3,6 +3,13 @@ from datetime import datetime
 
 class Room(db.Model):
     __tablename__ = 'rooms'
+    __table_args__ = (
+        db.Index('ix_rooms_room_type_price', 'room_type', 'price'),
+        db.Index('ix_rooms_price_id', 'price', 'id'),
+        db.Index('ix_rooms_name_id', 'name', 'id'),
+        db.Index('ix_rooms_created_at_id', 'created_at', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
@@ -0,0 +1,19 @@
+from ..extensions import db
+from datetime import datetime
+
+class RoomHold(db.Model):
+    """A short-lived reservation taken at order creation and converted into a booking after payment."""
+    __tablename__ = 'room_holds'
+    __table_args__ = (
+        db.Index('ix_room_holds_expires_at', 'expires_at'),
+        db.Index('ix_room_holds_room_id_expires_at', 'room_id', 'expires_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    start_date = db.Column(db.DateTime, nullable=False)
+    end_date = db.Column(db.DateTime, nullable=False)
+    order_id = db.Column(db.String(100), nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
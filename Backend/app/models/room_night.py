@@ -0,0 +1,18 @@
+from ..extensions import db
+
+class RoomNight(db.Model):
+    """One row per room per taken night, owned by a booking or a hold.
+
+    The primary key makes double-booking impossible.
+    """
+    __tablename__ = 'room_nights'
+    __table_args__ = (
+        db.Index('ix_room_nights_night_date', 'night_date'),
+        db.Index('ix_room_nights_booking_id', 'booking_id'),
+        db.Index('ix_room_nights_hold_id', 'hold_id'),
+    )
+
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), primary_key=True)
+    night_date = db.Column(db.Date, primary_key=True)
+    booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'), nullable=True)
+    hold_id = db.Column(db.Integer, db.ForeignKey('room_holds.id'), nullable=True)
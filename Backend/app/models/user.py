@@ -1,5 +1,5 @@
 from ..extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from ..utils.hashing import password_hasher
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -11,7 +11,6 @@ class User(db.Model):
     password = db.Column(db.String(255))
     phone_number = db.Column(db.String(15), nullable=True)
     location = db.Column(db.String(100), nullable=True)
-    otp = db.Column(db.String(6), nullable=True)
     is_google_user = db.Column(db.Boolean, default=False)
     is_verified = db.Column(db.Boolean, default=False)
     is_admin = db.Column(db.Boolean, default=False)
@@ -22,7 +21,6 @@ class User(db.Model):
         last_name,
         email,
         password=None,
-        otp=None,
         is_google_user=False,
         is_verified=False,
         is_admin=False,
@@ -33,7 +31,6 @@ class User(db.Model):
         self.last_name = last_name
         self.email = email
         self.set_password(password)
-        self.otp = otp
         self.is_google_user = is_google_user
         self.is_verified = is_verified
         self.is_admin = is_admin
@@ -42,11 +39,14 @@ class User(db.Model):
 
     def set_password(self, password):
         if password:
-            self.password = generate_password_hash(password)
+            self.password = password_hasher.hash(password)
         else:
             self.password = ''
 
     def check_password(self, password):
         if not self.password:
             return False
-        return check_password_hash(self.password, password)
+        return password_hasher.verify(self.password, password)
+
+    def password_needs_rehash(self):
+        return bool(self.password) and password_hasher.needs_rehash(self.password)
@@ -0,0 +1,187 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from sqlalchemy import func
+from ..extensions import db
+from ..models.booking import Booking
+from ..models.room import Room
+from ..utils.principal import admin_required
+from ..utils.replicas import read_only
+from ..utils.reports import GROUPINGS, occupancy_report, revenue_report
+from .bookings import mask_govt_id
+from .rooms import VALID_ROOM_TYPES
+from datetime import datetime
+import csv
+import io
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+admin_bp = Blueprint('admin', __name__)
+
+MAX_REPORT_DAYS = 3 * 366
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FIELDS = (
+    'id', 'user_id', 'room_id', 'room_name', 'room_type', 'start_date', 'end_date', 'guest_name',
+    'government_id', 'phone_number', 'amount', 'payment_id', 'created_at'
+)
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+# Spreadsheets run a cell starting with one of these as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+def parse_report_args():
+    """Validated (start, end, group_by, room_type) from the query string; raises ValueError."""
+    start = request.args.get('start')
+    end = request.args.get('end')
+    group_by = request.args.get('group_by', 'day')
+    room_type = request.args.get('room_type')
+
+    if not start or not end:
+        raise ValueError('start and end query parameters are required')
+    try:
+        start_date = datetime.strptime(start, '%Y-%m-%d').date()
+        end_date = datetime.strptime(end, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError('Invalid date format. Use YYYY-MM-DD')
+    if start_date >= end_date:
+        raise ValueError('end must be after start')
+    if (end_date - start_date).days > MAX_REPORT_DAYS:
+        raise ValueError(f'Report range cannot exceed {MAX_REPORT_DAYS} days')
+    if group_by not in GROUPINGS:
+        raise ValueError(f'Invalid group_by. Must be one of: {", ".join(GROUPINGS)}')
+    if room_type and room_type not in VALID_ROOM_TYPES:
+        raise ValueError(f'Invalid room type. Must be one of: {", ".join(VALID_ROOM_TYPES)}')
+    return start_date, end_date, group_by, room_type
+
+@admin_bp.route('/reports/occupancy', methods=['GET'])
+@admin_required
+@read_only
+def get_occupancy_report():
+    try:
+        start_date, end_date, group_by, room_type = parse_report_args()
+    except ValueError as e:
+        logger.error('Invalid occupancy report request: %s', e)
+        return jsonify({'message': str(e)}), 400
+
+    logger.debug('Occupancy report: start=%s, end=%s, group_by=%s, room_type=%s', start_date, end_date, group_by, room_type)
+    return jsonify({
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        'group_by': group_by,
+        'rows': occupancy_report(start_date, end_date, group_by, room_type)
+    }), 200
+
+@admin_bp.route('/reports/revenue', methods=['GET'])
+@admin_required
+@read_only
+def get_revenue_report():
+    try:
+        start_date, end_date, group_by, room_type = parse_report_args()
+    except ValueError as e:
+        logger.error('Invalid revenue report request: %s', e)
+        return jsonify({'message': str(e)}), 400
+
+    logger.debug('Revenue report: start=%s, end=%s, group_by=%s, room_type=%s', start_date, end_date, group_by, room_type)
+    return jsonify({
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        'group_by': group_by,
+        'rows': revenue_report(start_date, end_date, group_by, room_type)
+    }), 200
+
+def export_rows(query):
+    for row in query.yield_per(EXPORT_BATCH_SIZE):
+        yield {
+            'id': row.id,
+            'user_id': row.user_id,
+            'room_id': row.room_id,
+            'room_name': row.name,
+            'room_type': row.room_type,
+            'start_date': row.start_date.strftime('%Y-%m-%d'),
+            'end_date': row.end_date.strftime('%Y-%m-%d'),
+            'guest_name': row.guest_name,
+            'government_id': mask_govt_id(row.government_id),
+            'phone_number': row.phone_number,
+            'amount': row.amount,
+            'payment_id': row.payment_id,
+            'created_at': row.created_at.isoformat() if row.created_at else None
+        }
+
+def csv_safe(value):
+    """Quote guest-supplied text so a spreadsheet shows it instead of evaluating it."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def stream_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for count, row in enumerate(rows, 1):
+        writer.writerow({field: csv_safe(value) for field, value in row.items()})
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def stream_ndjson(rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row))
+        if len(lines) == EXPORT_BATCH_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+@admin_bp.route('/bookings/export', methods=['GET'])
+@admin_required
+@read_only
+def export_bookings():
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        logger.error('Invalid export format: %s', export_format)
+        return jsonify({'message': f'Invalid format. Must be one of: {", ".join(EXPORT_FORMATS)}'}), 400
+
+    # from is inclusive and to is exclusive, both on the booking's creation date
+    try:
+        date_from = request.args.get('from')
+        date_to = request.args.get('to')
+        date_from = datetime.strptime(date_from, '%Y-%m-%d') if date_from else None
+        date_to = datetime.strptime(date_to, '%Y-%m-%d') if date_to else None
+    except ValueError as e:
+        logger.error('Invalid date format: %s', e)
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
+
+    query = db.session.query(
+        Booking.id,
+        Booking.user_id,
+        Booking.room_id,
+        Room.name,
+        # The type the room had when booked, as the reports count it; older rows fall back to the room's
+        func.coalesce(Booking.room_type, Room.room_type).label('room_type'),
+        Booking.start_date,
+        Booking.end_date,
+        Booking.guest_name,
+        Booking.government_id,
+        Booking.phone_number,
+        Booking.amount,
+        Booking.payment_id,
+        Booking.created_at
+    ).join(Room, Room.id == Booking.room_id)
+    if date_from:
+        query = query.filter(Booking.created_at >= date_from)
+    if date_to:
+        query = query.filter(Booking.created_at < date_to)
+    query = query.order_by(Booking.id)
+
+    # yield_per streams from a server-side cursor, and the generator writes the
+    # body in batches, so memory stays flat however many bookings match
+    stream = stream_csv if export_format == 'csv' else stream_ndjson
+    filename = f'bookings-{datetime.now().strftime("%Y%m%d%H%M%S")}.{export_format}'
+    logger.info('Exporting bookings: format=%s, from=%s, to=%s', export_format, date_from, date_to)
+    return Response(
+        stream_with_context(stream(export_rows(query))),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
@@ -1,38 +1,37 @@
-from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..extensions import db, mail
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+from ..extensions import db
 from ..models.booking import Booking
 from ..models.room import Room
-from ..models.user import User
-from flask_mail import Message
+from ..models.room_hold import RoomHold
+from ..utils.principal import current_principal
+from ..utils.replicas import read_only
+from ..utils.payments import payment_gateway, GatewayUnavailable
+from ..utils.idempotency import idempotent
+from ..utils.availability import reserve_nights, nights_taken, release_nights
+from ..utils.holds import place_hold, convert_hold, release_hold, release_expired_holds
+from ..utils.pagination import encode_cursor, decode_cursor, keyset_filter
+from sqlalchemy.exc import IntegrityError
+from ..utils.email import enqueue_email
 from datetime import datetime
 import logging
+import uuid
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    filename='app.log',
-    filemode='a',
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 bookings_bp = Blueprint('bookings', __name__)
 
+MAX_PAGE_SIZE = 200
+
 # Mask Government ID (e.g., "344567kjd" -> "344***kjd")
 def mask_govt_id(govt_id):
     if len(govt_id) < 6:
         return govt_id
     return govt_id[:3] + "***" + govt_id[-3:]
 
-@bookings_bp.route('/create-order', methods=['POST', 'OPTIONS'])
+@bookings_bp.route('/create-order', methods=['POST'])
+@idempotent
 def create_order():
-    if request.method == 'OPTIONS':
-        return jsonify({}), 200, {
-            'Access-Control-Allow-Origin': 'http://localhost:5173',
-            'Access-Control-Allow-Methods': 'POST,OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-        }
-
     data = request.get_json() or {}
     amount = data.get('amount')
 
@@ -40,36 +39,81 @@ def create_order():
         logger.error('Missing amount for order creation')
         return jsonify({'message': 'Amount is required'}), 400
 
+    # Optionally hold the room for the stay while the guest is in checkout
+    hold = None
+    room_id = data.get('room_id')
+    start_date = data.get('start_date')
+    end_date = data.get('end_date')
+    if any([room_id, start_date, end_date]):
+        # A hold blocks the room for everyone else, so it needs a signed-in owner
+        verify_jwt_in_request()
+        user_id = int(get_jwt_identity())
+        if not all([room_id, start_date, end_date]):
+            logger.error('Incomplete hold request, received: %s', sorted(data))
+            return jsonify({'message': 'room_id, start_date and end_date are required to hold a room'}), 400
+        try:
+            start_date = datetime.strptime(start_date, '%Y-%m-%d')
+            end_date = datetime.strptime(end_date, '%Y-%m-%d')
+        except ValueError as e:
+            logger.error('Invalid date format: %s', e)
+            return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        if start_date >= end_date:
+            logger.error('Invalid date range: start_date=%s, end_date=%s', start_date, end_date)
+            return jsonify({'message': 'Check-out date must be after check-in date'}), 400
+
+        room = Room.query.get(room_id)
+        if not room or not room.availability:
+            logger.warning('Room not available for hold: %s', room_id)
+            return jsonify({'message': 'Room not available'}), 400
+
+        try:
+            hold = place_hold(room.id, start_date, end_date, user_id)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            logger.warning('Room %s already booked or held for requested dates', room_id)
+            return jsonify({'message': 'Room already booked for these dates'}), 400
+
     try:
         order_data = {
             'amount': int(float(amount) * 100),  # Convert to paise
             'currency': 'INR',
-            'receipt': f'receipt_{datetime.now().strftime("%Y%m%d%H%M%S")}',
+            'receipt': f'receipt_{uuid.uuid4().hex[:24]}',
             'payment_capture': 1  # Auto-capture
         }
-        razorpay_client = current_app.config['RAZORPAY_CLIENT']
-        order = razorpay_client.order.create(data=order_data)
-        logger.info(f'Order created: {order["id"]}')
-        return jsonify({
+        order = payment_gateway.create_order(order_data)
+        logger.info('Order created: %s', order['id'])
+        response = {
             'success': True,
             'order_id': order['id'],
             'amount': order['amount'],
             'currency': order['currency']
-        }), 200
+        }
+        if hold:
+            hold.order_id = order['id']
+            db.session.commit()
+            response['hold_id'] = hold.id
+            response['hold_expires_at'] = hold.expires_at.isoformat()
+        return jsonify(response), 200
+    except GatewayUnavailable as e:
+        logger.error('Payment gateway unavailable: %s', e)
+        discard_hold(hold)
+        return jsonify({'message': 'Payment service is temporarily unavailable. Please try again shortly.'}), 503
     except Exception as e:
-        logger.error(f'Error creating order: {str(e)}')
+        logger.error('Error creating order: %s', e)
+        discard_hold(hold)
         return jsonify({'message': f'Failed to create order: {str(e)}'}), 500
 
-@bookings_bp.route('', methods=['POST', 'OPTIONS'])
+def discard_hold(hold):
+    db.session.rollback()
+    if hold:
+        release_hold(hold)
+        db.session.commit()
+
+@bookings_bp.route('', methods=['POST'])
 @jwt_required()
+@idempotent
 def book_room():
-    if request.method == 'OPTIONS':
-        return jsonify({}), 200, {
-            'Access-Control-Allow-Origin': 'http://localhost:5173',
-            'Access-Control-Allow-Methods': 'POST,OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-        }
-
     logger.debug('Received book room request')
     user_id = get_jwt_identity()
     data = request.get_json() or {}
@@ -81,46 +125,59 @@ def book_room():
     phone_number = data.get('phone_number')
     amount = data.get('amount')
     payment_id = data.get('payment_id')
+    hold_id = data.get('hold_id')
 
     if not all([room_id, start_date, end_date, guest_name, government_id, phone_number, amount, payment_id]):
-        logger.error(f'Missing required fields: {data}')
+        logger.error('Missing required fields, received: %s', sorted(data))
         return jsonify({'message': 'Missing required fields', 'fields': data}), 400
 
     room = Room.query.get(room_id)
     if not room:
-        logger.warning(f'Room not found: {room_id}')
+        logger.warning('Room not found: %s', room_id)
         return jsonify({'message': 'Room not found'}), 404
     if not room.availability:
-        logger.warning(f'Room not available: {room_id}')
+        logger.warning('Room not available: %s', room_id)
         return jsonify({'message': 'Room not available'}), 400
 
-    user = User.query.get(user_id)
+    user = current_principal()
     if not user:
-        logger.warning(f'User not found: {user_id}')
+        logger.warning('User not found: %s', user_id)
         return jsonify({'message': 'User not found'}), 404
 
     try:
         start_date = datetime.strptime(start_date, '%Y-%m-%d')
         end_date = datetime.strptime(end_date, '%Y-%m-%d')
         if start_date >= end_date:
-            logger.error(f'Invalid date range: start_date={start_date}, end_date={end_date}')
+            logger.error('Invalid date range: start_date=%s, end_date=%s', start_date, end_date)
             return jsonify({'message': 'Check-out date must be after check-in date'}), 400
         if start_date.date() < datetime.now().date():
-            logger.error(f'Cannot book in the past: start_date={start_date}')
+            logger.error('Cannot book in the past: start_date=%s', start_date)
             return jsonify({'message': 'Cannot book in the past'}), 400
 
-        existing_bookings = Booking.query.filter(
-            Booking.room_id == room_id,
-            Booking.start_date < end_date,
-            Booking.end_date > start_date
-        ).all()
-        if existing_bookings:
-            logger.warning(f'Room {room_id} already booked for requested dates')
+        now = datetime.utcnow()
+        hold = RoomHold.query.get(hold_id) if hold_id else None
+        if hold and hold.expires_at <= now:
+            # A lapsed hold is swept below and the stay is booked like any other
+            logger.info('Hold %s expired before booking', hold_id)
+            hold = None
+        if hold and (hold.room_id != room.id or hold.start_date != start_date or hold.end_date != end_date
+                     or hold.user_id != int(user_id)):
+            logger.warning('Hold %s does not match booking request for room %s', hold_id, room_id)
+            return jsonify({'message': 'Hold does not match this booking'}), 400
+
+        # Lapsed holds must not block the stay; live ones other than the caller's do.
+        # Sweeping as of the same instant keeps the caller's live hold out of the bulk delete
+        release_expired_holds(room.id, now=now)
+        if nights_taken(room.id, start_date, end_date, ignore_hold_id=hold.id if hold else None):
+            # Drop the sweep with the rest; leaving it pending would hold SQLite's write lock
+            db.session.rollback()
+            logger.warning('Room %s already booked for requested dates', room_id)
             return jsonify({'message': 'Room already booked for these dates'}), 400
 
         booking = Booking(
             user_id=user_id,
             room_id=room_id,
+            room_type=room.room_type,
             start_date=start_date,
             end_date=end_date,
             guest_name=guest_name,
@@ -129,38 +186,33 @@ def book_room():
             amount=amount,
             payment_id=payment_id
         )
-        room.availability = False
         db.session.add(booking)
-        db.session.commit()
-        logger.info(f'Room booked: room_id={room_id}, user_id={user_id}, payment_id={payment_id}')
-
-        # Send confirmation email
+        db.session.flush()
+        # The (room_id, night_date) key serializes concurrent bookings of the same nights;
+        # a live hold already owns them and only changes hands
+        if not (hold and convert_hold(hold, booking.id)):
+            reserve_nights(room.id, start_date, end_date, booking.id)
+        enqueue_email(
+            'Booking Confirmation',
+            [user.email],
+            f'Dear {guest_name},\n\n'
+            f'Your booking has been confirmed!\n'
+            f'Room: {room.name} (ID: {room.id}, Type: {room.room_type})\n'
+            f'Location: Hotel XYZ, City Center\n'
+            f'Check-in: {start_date.strftime("%Y-%m-%d")}\n'
+            f'Check-out: {end_date.strftime("%Y-%m-%d")}\n'
+            f'Phone: {phone_number}\n'
+            f'Government ID: {mask_govt_id(government_id)}\n'
+            f'Amount Paid: ₹{float(amount):.2f}\n\n'
+            f'Thank you for booking with us!'
+        )
         try:
-            msg = Message(
-                'Booking Confirmation',
-                recipients=[user.email]
-            )
-            msg.body = (
-                f'Dear {guest_name},\n\n'
-                f'Your booking has been confirmed!\n'
-                f'Room: {room.name} (ID: {room.id}, Type: {room.room_type})\n'
-                f'Location: Hotel XYZ, City Center\n'
-                f'Check-in: {start_date.strftime("%Y-%m-%d")}\n'
-                f'Check-out: {end_date.strftime("%Y-%m-%d")}\n'
-                f'Phone: {phone_number}\n'
-                f'Government ID: {mask_govt_id(government_id)}\n'
-                f'Amount Paid: ₹{amount:.2f}\n\n'
-                f'Thank you for booking with us!'
-            )
-            mail.send(msg)
-            logger.info(f'Booking confirmation email sent to {user.email}')
-        except Exception as e:
-            logger.error(f'Failed to send booking confirmation email: {str(e)}')
-            return jsonify({
-                'message': 'Room booked successfully, but failed to send confirmation email',
-                'booking_id': booking.id,
-                'payment_id': payment_id
-            }), 201
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            logger.warning('Room %s was booked concurrently for requested dates', room_id)
+            return jsonify({'message': 'Room already booked for these dates'}), 400
+        logger.info('Room booked: room_id=%s, user_id=%s, payment_id=%s, confirmation queued', room_id, user_id, payment_id)
 
         return jsonify({
             'message': 'Room booked successfully',
@@ -168,30 +220,102 @@ def book_room():
             'payment_id': payment_id
         }), 201
     except ValueError as e:
-        logger.error(f'Invalid date format: {str(e)}')
+        logger.error('Invalid date format: %s', e)
         return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
     except Exception as e:
-        logger.error(f'Error booking room: {str(e)}')
+        logger.error('Error booking room: %s', e)
         db.session.rollback()
         return jsonify({'message': f'Failed to book room: {str(e)}'}), 500
 
+@bookings_bp.route('/<int:id>', methods=['DELETE'])
+@jwt_required()
+def cancel_booking(id):
+    user = current_principal()
+    booking = Booking.query.get(id)
+    if not booking or not user or (booking.user_id != user.id and not user.is_admin):
+        logger.warning('Booking %s not found for user_id: %s', id, get_jwt_identity())
+        return jsonify({'message': 'Booking not found'}), 404
+    if booking.start_date.date() <= datetime.now().date():
+        logger.warning('Cannot cancel booking %s, stay already started', id)
+        return jsonify({'message': 'Cannot cancel a stay that has already started'}), 400
+
+    try:
+        # Free the night slots in the same transaction so the room is bookable again
+        release_nights(booking.id)
+        db.session.delete(booking)
+        db.session.commit()
+        logger.info('Booking cancelled: booking_id=%s, room_id=%s, by user_id=%s', id, booking.room_id, user.id)
+        return jsonify({'message': 'Booking cancelled successfully'}), 200
+    except Exception as e:
+        logger.error('Error cancelling booking %s: %s', id, e)
+        db.session.rollback()
+        return jsonify({'message': f'Failed to cancel booking: {str(e)}'}), 500
+
 @bookings_bp.route('/my-bookings', methods=['GET'])
 @jwt_required()
+@read_only
 def get_my_bookings():
     logger.debug('Fetching user bookings')
     user_id = get_jwt_identity()
-    bookings = Booking.query.filter_by(user_id=user_id).all()
-    return jsonify([{
-        'id': booking.id,
-        'room_id': booking.room_id,
-        'room_name': booking.room.name,
-        'room_type': booking.room.room_type,
-        'start_date': booking.start_date.isoformat(),
-        'end_date': booking.end_date.isoformat(),
-        'guest_name': booking.guest_name,
-        'government_id': mask_govt_id(booking.government_id),
-        'phone_number': booking.phone_number,
-        'amount': booking.amount,
-        'payment_id': booking.payment_id,
-        'created_at': booking.created_at.isoformat()
-    } for booking in bookings]), 200
\ No newline at end of file
+
+    try:
+        limit = int(request.args['limit']) if request.args.get('limit') else None
+        cursor = request.args.get('cursor')
+        if limit is not None:
+            if limit < 1:
+                raise ValueError('limit must be positive')
+            limit = min(limit, MAX_PAGE_SIZE)
+        if cursor:
+            if limit is None:
+                raise ValueError('cursor requires limit')
+            created_at, after_id = decode_cursor(cursor)
+            created_at = datetime.fromisoformat(created_at)
+    except (TypeError, ValueError) as e:
+        logger.error('Invalid bookings page request: %s', e)
+        return jsonify({'message': str(e)}), 400
+
+    # One joined query, newest first along the (user_id, created_at) index
+    query = db.session.query(
+        Booking.id,
+        Booking.room_id,
+        Room.name,
+        Room.room_type,
+        Booking.start_date,
+        Booking.end_date,
+        Booking.guest_name,
+        Booking.government_id,
+        Booking.phone_number,
+        Booking.amount,
+        Booking.payment_id,
+        Booking.created_at
+    ).join(Room, Room.id == Booking.room_id).filter(Booking.user_id == user_id)
+    if cursor:
+        query = query.filter(keyset_filter(Booking.created_at, Booking.id, created_at, after_id, descending=True))
+    query = query.order_by(Booking.created_at.desc(), Booking.id.desc())
+
+    # Without limit the whole history is returned, as before paging existed;
+    # with it, one extra row tells whether another page follows
+    has_more = False
+    if limit is None:
+        rows = query.all()
+    else:
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+    response = jsonify([{
+        'id': row.id,
+        'room_id': row.room_id,
+        'room_name': row.name,
+        'room_type': row.room_type,
+        'start_date': row.start_date.isoformat(),
+        'end_date': row.end_date.isoformat(),
+        'guest_name': row.guest_name,
+        'government_id': mask_govt_id(row.government_id),
+        'phone_number': row.phone_number,
+        'amount': row.amount,
+        'payment_id': row.payment_id,
+        'created_at': row.created_at.isoformat()
+    } for row in rows])
+    if has_more:
+        response.headers['X-Next-Cursor'] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return response, 200
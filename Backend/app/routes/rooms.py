@@ -1,27 +1,37 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..extensions import db
+from ..extensions import db, room_cache
 from ..models.room import Room
-from ..models.user import User
+from ..utils.principal import admin_required
+from ..utils.replicas import read_only
+from ..utils.availability import available_rooms_query, nights_taken
+from ..utils.pagination import encode_cursor, decode_cursor, keyset_filter
+from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime
+import csv
+import io
+import json
 import logging
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    filename='app.log',
-    filemode='a',
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 rooms_bp = Blueprint('rooms', __name__)
 
 VALID_ROOM_TYPES = ['Single', 'Double', 'Twin', 'Queen', 'King', 'Suites']
 
-@rooms_bp.route('', methods=['GET'])
-def get_rooms():
-    logger.debug('Fetching all rooms')
-    rooms = Room.query.all()
-    return jsonify([{
+SORT_COLUMNS = {
+    'id': Room.id,
+    'name': Room.name,
+    'price': Room.price,
+    'created_at': Room.created_at
+}
+MAX_PAGE_SIZE = 100
+BULK_MAX_ROWS = 20000
+BULK_CHUNK_SIZE = 500
+ROOM_FIELDS = ('name', 'description', 'price', 'room_type', 'is_ac', 'has_parking', 'availability')
+ROOM_DEFAULTS = {'is_ac': False, 'has_parking': False, 'availability': True}
+
+def room_to_dict(room):
+    return {
         'id': room.id,
         'name': room.name,
         'description': room.description,
@@ -31,24 +41,240 @@ def get_rooms():
         'has_parking': room.has_parking,
         'availability': room.availability,
         'created_at': room.created_at.isoformat()
-    } for room in rooms]), 200
+    }
 
-@rooms_bp.route('', methods=['POST', 'OPTIONS'])
-@jwt_required()
-def create_room():
-    if request.method == 'OPTIONS':
-        return jsonify({}), 200, {
-            'Access-Control-Allow-Origin': 'http://localhost:5173',
-            'Access-Control-Allow-Methods': 'POST,OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-        }
-
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user or not user.is_admin:
-        logger.warning(f'Unauthorized room creation attempt by user_id: {user_id}')
-        return jsonify({'message': 'Admin access required'}), 403
+def parse_bool(value):
+    if value is None:
+        return None
+    lowered = value.lower()
+    if lowered in ('true', '1', 'yes'):
+        return True
+    if lowered in ('false', '0', 'no'):
+        return False
+    raise ValueError(f'Invalid boolean: {value}')
+
+def coerce_bool(value):
+    # JSON sends real booleans, CSV sends strings
+    if isinstance(value, bool):
+        return value
+    return parse_bool(str(value))
+
+def read_bulk_rows():
+    """Rows from a JSON array body or a CSV upload (multipart ``file`` or a text/csv body)."""
+    upload = request.files.get('file')
+    if upload or request.mimetype == 'text/csv':
+        raw = upload.read() if upload else request.get_data()
+        return list(csv.DictReader(io.StringIO(raw.decode('utf-8-sig'))))
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('rooms')
+    if not isinstance(data, list):
+        raise ValueError('Expected a JSON array of rooms or a CSV upload')
+    return data
+
+def validate_room_row(row, partial=False):
+    """Normalize one bulk row into a Room mapping; returns (mapping, errors)."""
+    if not isinstance(row, dict):
+        return None, ['Row must be an object']
+    errors = []
+    mapping = {}
+    if partial:
+        try:
+            mapping['id'] = int(row.get('id'))
+        except (TypeError, ValueError):
+            errors.append('id is required and must be an integer')
+
+    for field in ROOM_FIELDS:
+        value = row.get(field)
+        if value is None or value == '':
+            if not partial:
+                if field in ROOM_DEFAULTS:
+                    mapping[field] = ROOM_DEFAULTS[field]
+                else:
+                    errors.append(f'{field} is required')
+            continue
+        try:
+            if field == 'price':
+                value = float(value)
+                if value < 0:
+                    raise ValueError('price must not be negative')
+            elif field in ROOM_DEFAULTS:
+                value = coerce_bool(value)
+            elif field == 'room_type' and value not in VALID_ROOM_TYPES:
+                raise ValueError(f'Invalid room type. Must be one of: {", ".join(VALID_ROOM_TYPES)}')
+        except (TypeError, ValueError) as e:
+            errors.append(f'{field}: {e}')
+            continue
+        mapping[field] = value
+
+    if partial and len(mapping) == 1 and not errors:
+        errors.append('No fields to update')
+    return mapping, errors
+
+def write_in_chunks(mappings, write):
+    """Apply ``write`` to committed chunks; returns (written, failed rows)."""
+    written, failed = 0, []
+    for offset in range(0, len(mappings), BULK_CHUNK_SIZE):
+        chunk = mappings[offset:offset + BULK_CHUNK_SIZE]
+        try:
+            write([mapping for _, mapping in chunk])
+            db.session.commit()
+            written += len(chunk)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error('Bulk room chunk at row %s failed: %s', chunk[0][0], e)
+            failed.extend({'row': index, 'errors': ['Database write failed for this chunk']} for index, _ in chunk)
+    return written, failed
+
+def bulk_response(key, written, failed):
+    status = 400 if not written and failed else 207 if failed else 200
+    return jsonify({key: written, 'failed': failed}), status
+
+def parse_room_filters(args):
+    """Validate catalog query parameters into a normalized dict (raises ValueError)."""
+    filters = {
+        'room_type': args.get('room_type'),
+        'is_ac': parse_bool(args.get('is_ac')),
+        'has_parking': parse_bool(args.get('has_parking')),
+        'availability': parse_bool(args.get('availability')),
+        'min_price': float(args['min_price']) if args.get('min_price') else None,
+        'max_price': float(args['max_price']) if args.get('max_price') else None,
+        'sort': args.get('sort', 'id'),
+        'cursor': args.get('cursor'),
+        'limit': int(args['limit']) if args.get('limit') else None
+    }
+    if filters['room_type'] and filters['room_type'] not in VALID_ROOM_TYPES:
+        raise ValueError(f'Invalid room type. Must be one of: {", ".join(VALID_ROOM_TYPES)}')
+    if filters['sort'].lstrip('-') not in SORT_COLUMNS:
+        raise ValueError(f'Invalid sort key. Must be one of: {", ".join(SORT_COLUMNS)} (prefix with - for descending)')
+    if filters['limit'] is not None:
+        if filters['limit'] < 1:
+            raise ValueError('limit must be positive')
+        filters['limit'] = min(filters['limit'], MAX_PAGE_SIZE)
+    if filters['cursor']:
+        if filters['limit'] is None:
+            raise ValueError('cursor requires limit')
+        decode_sort_cursor(filters['cursor'], filters['sort'].lstrip('-'))
+    return filters
+
+def decode_sort_cursor(cursor, sort_key):
+    value, row_id = decode_cursor(cursor)
+    if sort_key == 'created_at':
+        value = datetime.fromisoformat(value)
+    return value, row_id
+
+def build_rooms_page(filters):
+    query = Room.query
+    for field in ('room_type', 'is_ac', 'has_parking', 'availability'):
+        if filters[field] is not None:
+            query = query.filter(getattr(Room, field) == filters[field])
+    if filters['min_price'] is not None:
+        query = query.filter(Room.price >= filters['min_price'])
+    if filters['max_price'] is not None:
+        query = query.filter(Room.price <= filters['max_price'])
+
+    sort_key = filters['sort'].lstrip('-')
+    descending = filters['sort'].startswith('-')
+    column = SORT_COLUMNS[sort_key]
+    if filters['cursor']:
+        value, row_id = decode_sort_cursor(filters['cursor'], sort_key)
+        query = query.filter(keyset_filter(column, Room.id, value, row_id, descending))
+    if descending:
+        query = query.order_by(column.desc(), Room.id.desc())
+    else:
+        query = query.order_by(column, Room.id)
+
+    if filters['limit'] is None:
+        return [room_to_dict(room) for room in query.all()], {}
+
+    rooms = query.limit(filters['limit'] + 1).all()
+    headers = {}
+    if len(rooms) > filters['limit']:
+        rooms = rooms[:filters['limit']]
+        last = rooms[-1]
+        headers['X-Next-Cursor'] = encode_cursor(getattr(last, sort_key), last.id)
+    return [room_to_dict(room) for room in rooms], headers
+
+@rooms_bp.route('', methods=['GET'])
+def get_rooms():
+    logger.debug('Fetching rooms: %s', request.args)
+    try:
+        filters = parse_room_filters(request.args)
+    except (TypeError, ValueError) as e:
+        logger.error('Invalid room filters: %s', e)
+        return jsonify({'message': str(e)}), 400
+
+    cache_key = 'list:' + json.dumps(filters, sort_keys=True, separators=(',', ':'))
+    return room_cache.response(cache_key, lambda: build_rooms_page(filters))
+
+@rooms_bp.route('/available', methods=['GET'])
+@read_only
+def get_available_rooms():
+    start_date = request.args.get('start')
+    end_date = request.args.get('end')
+    room_type = request.args.get('room_type')
+
+    if not start_date or not end_date:
+        logger.error('Missing date range: start=%s, end=%s', start_date, end_date)
+        return jsonify({'message': 'start and end query parameters are required'}), 400
+
+    try:
+        start_date = datetime.strptime(start_date, '%Y-%m-%d')
+        end_date = datetime.strptime(end_date, '%Y-%m-%d')
+    except ValueError as e:
+        logger.error('Invalid date format: %s', e)
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
+
+    if start_date >= end_date:
+        logger.error('Invalid date range: start=%s, end=%s', start_date, end_date)
+        return jsonify({'message': 'Check-out date must be after check-in date'}), 400
+
+    if room_type and room_type not in VALID_ROOM_TYPES:
+        logger.error('Invalid room type: %s', room_type)
+        return jsonify({'message': f'Invalid room type. Must be one of: {", ".join(VALID_ROOM_TYPES)}'}), 400
+
+    logger.debug('Searching available rooms: start=%s, end=%s, room_type=%s', start_date, end_date, room_type)
+    rooms = available_rooms_query(start_date, end_date, room_type).all()
+    return jsonify([room_to_dict(room) for room in rooms]), 200
+
+@rooms_bp.route('/<int:id>/availability', methods=['GET'])
+@read_only
+def get_room_availability(id):
+    start_date = request.args.get('start')
+    end_date = request.args.get('end')
+
+    if not start_date or not end_date:
+        logger.error('Missing date range: start=%s, end=%s', start_date, end_date)
+        return jsonify({'message': 'start and end query parameters are required'}), 400
+
+    try:
+        start_date = datetime.strptime(start_date, '%Y-%m-%d')
+        end_date = datetime.strptime(end_date, '%Y-%m-%d')
+    except ValueError as e:
+        logger.error('Invalid date format: %s', e)
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
 
+    if start_date >= end_date:
+        logger.error('Invalid date range: start=%s, end=%s', start_date, end_date)
+        return jsonify({'message': 'Check-out date must be after check-in date'}), 400
+
+    room = Room.query.get(id)
+    if not room:
+        logger.warning('Room not found: %s', id)
+        return jsonify({'message': 'Room not found'}), 404
+
+    # Point lookup on the (room_id, night_date) primary key
+    available = bool(room.availability) and not nights_taken(room.id, start_date, end_date)
+    return jsonify({
+        'room_id': room.id,
+        'start': start_date.strftime('%Y-%m-%d'),
+        'end': end_date.strftime('%Y-%m-%d'),
+        'available': available
+    }), 200
+
+@rooms_bp.route('', methods=['POST'])
+@admin_required
+def create_room():
     data = request.get_json() or {}
     name = data.get('name')
     description = data.get('description')
@@ -59,11 +285,11 @@ def create_room():
     availability = data.get('availability', True)
 
     if not all([name, description, price, room_type]):
-        logger.error(f'Missing required fields: {data}')
+        logger.error('Missing required fields, received: %s', sorted(data))
         return jsonify({'message': 'Missing required fields', 'fields': data}), 400
 
     if room_type not in VALID_ROOM_TYPES:
-        logger.error(f'Invalid room type: {room_type}')
+        logger.error('Invalid room type: %s', room_type)
         return jsonify({'message': f'Invalid room type. Must be one of: {", ".join(VALID_ROOM_TYPES)}'}), 400
 
     try:
@@ -78,58 +304,107 @@ def create_room():
         )
         db.session.add(room)
         db.session.commit()
-        logger.info(f'Room created: {name}')
+        room_cache.invalidate()
+        logger.info('Room created: %s', name)
         return jsonify({'message': 'Room created successfully'}), 201
     except Exception as e:
-        logger.error(f'Error creating room: {str(e)}')
+        logger.error('Error creating room: %s', e)
         db.session.rollback()
         return jsonify({'message': f'Failed to create room: {str(e)}'}), 500
 
+@rooms_bp.route('/bulk', methods=['POST'])
+@admin_required
+def bulk_create_rooms():
+    try:
+        rows = read_bulk_rows()
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        logger.error('Invalid bulk room payload: %s', e)
+        return jsonify({'message': str(e)}), 400
+    if len(rows) > BULK_MAX_ROWS:
+        return jsonify({'message': f'At most {BULK_MAX_ROWS} rooms per request'}), 400
+
+    # Validate everything up front so bad rows never reach the database
+    now = datetime.utcnow()
+    valid, failed = [], []
+    for index, row in enumerate(rows, 1):
+        mapping, errors = validate_room_row(row)
+        if errors:
+            failed.append({'row': index, 'errors': errors})
+        else:
+            mapping['created_at'] = now
+            valid.append((index, mapping))
+
+    written, write_failed = write_in_chunks(valid, lambda chunk: db.session.bulk_insert_mappings(Room, chunk))
+    failed.extend(write_failed)
+    if written:
+        room_cache.invalidate()
+    logger.info('Bulk room import: %s created, %s failed', written, len(failed))
+    return bulk_response('created', written, sorted(failed, key=lambda f: f['row']))
+
+@rooms_bp.route('/bulk', methods=['PATCH'])
+@admin_required
+def bulk_update_rooms():
+    try:
+        rows = read_bulk_rows()
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        logger.error('Invalid bulk room payload: %s', e)
+        return jsonify({'message': str(e)}), 400
+    if len(rows) > BULK_MAX_ROWS:
+        return jsonify({'message': f'At most {BULK_MAX_ROWS} rooms per request'}), 400
+
+    valid, failed = [], []
+    for index, row in enumerate(rows, 1):
+        mapping, errors = validate_room_row(row, partial=True)
+        if errors:
+            failed.append({'row': index, 'errors': errors})
+        else:
+            valid.append((index, mapping))
+
+    # One IN query per chunk to find which ids exist
+    ids = [mapping['id'] for _, mapping in valid]
+    existing = set()
+    for offset in range(0, len(ids), BULK_CHUNK_SIZE):
+        existing.update(room_id for room_id, in db.session.query(Room.id).filter(
+            Room.id.in_(ids[offset:offset + BULK_CHUNK_SIZE])
+        ))
+    missing = [(index, mapping) for index, mapping in valid if mapping['id'] not in existing]
+    failed.extend({'row': index, 'errors': [f'Room {mapping["id"]} not found']} for index, mapping in missing)
+    valid = [(index, mapping) for index, mapping in valid if mapping['id'] in existing]
+
+    written, write_failed = write_in_chunks(valid, lambda chunk: db.session.bulk_update_mappings(Room, chunk))
+    failed.extend(write_failed)
+    if written:
+        room_cache.invalidate()
+    logger.info('Bulk room update: %s updated, %s failed', written, len(failed))
+    return bulk_response('updated', written, sorted(failed, key=lambda f: f['row']))
+
 @rooms_bp.route('/<int:id>', methods=['GET'])
 def get_room(id):
-    logger.debug(f'Fetching room: {id}')
-    room = Room.query.get(id)
-    if not room:
-        logger.warning(f'Room not found: {id}')
+    logger.debug('Fetching room: %s', id)
+
+    def build():
+        room = Room.query.get(id)
+        return (room_to_dict(room), {}) if room else None
+
+    response = room_cache.response(f'room:{id}', build)
+    if response is None:
+        logger.warning('Room not found: %s', id)
         return jsonify({'message': 'Room not found'}), 404
-    return jsonify({
-        'id': room.id,
-        'name': room.name,
-        'description': room.description,
-        'price': room.price,
-        'room_type': room.room_type,
-        'is_ac': room.is_ac,
-        'has_parking': room.has_parking,
-        'availability': room.availability,
-        'created_at': room.created_at.isoformat()
-    }), 200
+    return response
 
-@rooms_bp.route('/<int:id>', methods=['PUT', 'OPTIONS'])
-@jwt_required()
+@rooms_bp.route('/<int:id>', methods=['PUT'])
+@admin_required
 def update_room(id):
-    if request.method == 'OPTIONS':
-        return jsonify({}), 200, {
-            'Access-Control-Allow-Origin': 'http://localhost:5173',
-            'Access-Control-Allow-Methods': 'PUT,OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-        }
-
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user or not user.is_admin:
-        logger.warning(f'Unauthorized room update attempt by user_id: {user_id}')
-        return jsonify({'message': 'Admin access required'}), 403
-
     room = Room.query.get(id)
     if not room:
-        logger.warning(f'Room not found: {id}')
+        logger.warning('Room not found: %s', id)
         return jsonify({'message': 'Room not found'}), 404
 
     data = request.get_json() or {}
     room_type = data.get('room_type', room.room_type)
 
     if room_type and room_type not in VALID_ROOM_TYPES:
-        logger.error(f'Invalid room type: {room_type}')
+        logger.error('Invalid room type: %s', room_type)
         return jsonify({'message': f'Invalid room type. Must be one of: {", ".join(VALID_ROOM_TYPES)}'}), 400
 
     room.name = data.get('name', room.name)
@@ -142,40 +417,29 @@ def update_room(id):
 
     try:
         db.session.commit()
-        logger.info(f'Room updated: {room.name}')
+        room_cache.invalidate()
+        logger.info('Room updated: %s', room.name)
         return jsonify({'message': 'Room updated successfully'}), 200
     except Exception as e:
-        logger.error(f'Error updating room: {str(e)}')
+        logger.error('Error updating room: %s', e)
         db.session.rollback()
         return jsonify({'message': f'Failed to update room: {str(e)}'}), 500
 
-@rooms_bp.route('/<int:id>', methods=['DELETE', 'OPTIONS'])
-@jwt_required()
+@rooms_bp.route('/<int:id>', methods=['DELETE'])
+@admin_required
 def delete_room(id):
-    if request.method == 'OPTIONS':
-        return jsonify({}), 200, {
-            'Access-Control-Allow-Origin': 'http://localhost:5173',
-            'Access-Control-Allow-Methods': 'DELETE,OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type,Authorization'
-        }
-
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user or not user.is_admin:
-        logger.warning(f'Unauthorized room deletion attempt by user_id: {user_id}')
-        return jsonify({'message': 'Admin access required'}), 403
-
     room = Room.query.get(id)
     if not room:
-        logger.warning(f'Room not found: {id}')
+        logger.warning('Room not found: %s', id)
         return jsonify({'message': 'Room not found'}), 404
 
     try:
         db.session.delete(room)
         db.session.commit()
-        logger.info(f'Room deleted: {id}')
+        room_cache.invalidate()
+        logger.info('Room deleted: %s', id)
         return jsonify({'message': 'Room deleted successfully'}), 200
     except Exception as e:
-        logger.error(f'Error deleting room: {str(e)}')
+        logger.error('Error deleting room: %s', e)
         db.session.rollback()
         return jsonify({'message': f'Failed to delete room: {str(e)}'}), 500
\ No newline at end of file
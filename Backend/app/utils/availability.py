@@ -0,0 +1,71 @@
+from ..extensions import db
+from ..models.booking import Booking
+from ..models.room import Room
+from ..models.room_night import RoomNight
+from datetime import timedelta
+from sqlalchemy import or_
+
+def stay_nights(start_date, end_date):
+    # Nights are identified by their check-in date: [start_date, end_date)
+    first, last = start_date.date(), end_date.date()
+    return [first + timedelta(days=i) for i in range((last - first).days)]
+
+def reserve_nights(room_id, start_date, end_date, booking_id):
+    """Add night slots for a stay; the commit raises IntegrityError if any is taken."""
+    db.session.add_all([
+        RoomNight(room_id=room_id, night_date=night, booking_id=booking_id)
+        for night in stay_nights(start_date, end_date)
+    ])
+
+def nights_taken(room_id, start_date, end_date, ignore_hold_id=None):
+    """Whether any night of the stay is booked or held, other than by ``ignore_hold_id``."""
+    query = RoomNight.query.filter(
+        RoomNight.room_id == room_id,
+        RoomNight.night_date >= start_date.date(),
+        RoomNight.night_date < end_date.date()
+    )
+    if ignore_hold_id is not None:
+        query = query.filter(or_(RoomNight.hold_id.is_(None), RoomNight.hold_id != ignore_hold_id))
+    return db.session.query(query.exists()).scalar()
+
+def release_nights(booking_id):
+    RoomNight.query.filter_by(booking_id=booking_id).delete(synchronize_session=False)
+
+def rebuild_room_nights(batch_size=1000):
+    """Recreate every booking-owned night slot from ``bookings``; holds are left alone.
+
+    Returns ``(nights, conflicts)``; on overlapping history the earlier booking keeps the night.
+    """
+    RoomNight.query.filter(RoomNight.booking_id.isnot(None)).delete(synchronize_session=False)
+    taken = {(room_id, night) for room_id, night in db.session.query(RoomNight.room_id, RoomNight.night_date)}
+    nights = conflicts = 0
+    pending = []
+    rows = db.session.query(Booking.id, Booking.room_id, Booking.start_date, Booking.end_date).order_by(Booking.id)
+    for booking_id, room_id, start_date, end_date in rows.yield_per(batch_size):
+        for night in stay_nights(start_date, end_date):
+            if (room_id, night) in taken:
+                conflicts += 1
+                continue
+            taken.add((room_id, night))
+            pending.append({'room_id': room_id, 'night_date': night, 'booking_id': booking_id})
+        if len(pending) >= batch_size:
+            db.session.bulk_insert_mappings(RoomNight, pending)
+            nights += len(pending)
+            pending = []
+    if pending:
+        db.session.bulk_insert_mappings(RoomNight, pending)
+        nights += len(pending)
+    return nights, conflicts
+
+def available_rooms_query(start_date, end_date, room_type=None):
+    # Single anti-join over night slots, so booked and held nights are both excluded
+    taken = db.session.query(RoomNight.room_id).filter(
+        RoomNight.room_id == Room.id,
+        RoomNight.night_date >= start_date.date(),
+        RoomNight.night_date < end_date.date()
+    ).exists()
+
+    query = Room.query.filter(Room.availability.is_(True), ~taken)
+    if room_type:
+        query = query.filter(Room.room_type == room_type)
+    return query.order_by(Room.id)
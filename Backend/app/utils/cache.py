@@ -0,0 +1,158 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import request, current_app
+
+class LRUBackend:
+    """In-process cache. Counters are kept apart so eviction never resets a version."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        return value
+
+    def _store(self, key, value, ttl):
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            value = self._live(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        """Store ``value`` only if ``key`` is absent; returns whether it was stored."""
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_counter(self, key):
+        return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+class RedisBackend:
+    """Shared cache for multi-worker deployments (requires the redis package)."""
+
+    def __init__(self, url, prefix='hotel:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def add(self, key, value, ttl=None):
+        return bool(self.client.set(self.prefix + key, value, ex=ttl, nx=True))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def get_counter(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+def create_backend(kind, url=None, max_entries=256, prefix='hotel:'):
+    if kind == 'redis':
+        return RedisBackend(url, prefix=prefix)
+    if kind == 'memory':
+        return LRUBackend(max_entries=max_entries)
+    raise ValueError(f'Unknown cache backend: {kind}')
+
+class RoomCatalogCache:
+    """Pre-serialized room catalog responses keyed by a catalog version.
+
+    Every write bumps the version, so stale bodies are simply never looked up
+    again and age out of the backend instead of being deleted one by one.
+    """
+
+    VERSION_KEY = 'rooms:version'
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.backend = create_backend(
+            app.config['ROOM_CACHE_BACKEND'],
+            url=app.config['ROOM_CACHE_URL'],
+            max_entries=app.config['ROOM_CACHE_MAX_ENTRIES']
+        )
+        self.ttl = app.config['ROOM_CACHE_TTL']
+        app.extensions['room_cache'] = self
+
+    def invalidate(self):
+        self.backend.incr(self.VERSION_KEY)
+
+    def _lookup(self, key, build):
+        # Read the version before building so a concurrent write can only
+        # leave the freshly built body under an already obsolete key.
+        version = self.backend.get_counter(self.VERSION_KEY)
+        full_key = f'rooms:{version}:{key}'
+        cached = self.backend.get(full_key)
+        if cached is not None:
+            etag, headers, body = cached.split(b'\n', 2)
+            return etag.decode(), json.loads(headers), body
+
+        built = build()
+        if built is None:
+            return None, None, None
+        data, headers = built
+        body = json.dumps(data, separators=(',', ':')).encode()
+        etag = hashlib.sha1(body).hexdigest()
+        entry = b'\n'.join([etag.encode(), json.dumps(headers).encode(), body])
+        self.backend.set(full_key, entry, ttl=self.ttl)
+        return etag, headers, body
+
+    def response(self, key, build):
+        """Return a conditional JSON response for ``key``.
+
+        ``build`` returns ``(data, headers)`` on a miss, or None when there is
+        nothing to serve, in which case None is returned as well.
+        """
+        etag, headers, body = self._lookup(key, build)
+        if body is None:
+            return None
+        response = current_app.response_class(body, mimetype='application/json')
+        response.headers.update(headers)
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
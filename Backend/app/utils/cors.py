@@ -0,0 +1,55 @@
+class CorsMiddleware:
+    """WSGI-level CORS: preflights are answered here and never reach Flask.
+
+    Header lists are built once per allowed origin, so both the preflight
+    fast path and the headers added to normal responses are a dict lookup.
+    """
+
+    def __init__(self, wsgi_app, origins, methods, allow_headers, expose_headers, max_age=600,
+                 supports_credentials=True):
+        self.wsgi_app = wsgi_app
+        self._preflight = {}
+        self._actual = {}
+        for origin in origins:
+            common = [('Access-Control-Allow-Origin', origin), ('Vary', 'Origin')]
+            if supports_credentials:
+                common.append(('Access-Control-Allow-Credentials', 'true'))
+            self._preflight[origin] = common + [
+                ('Access-Control-Allow-Methods', ','.join(methods)),
+                ('Access-Control-Allow-Headers', ','.join(allow_headers)),
+                ('Access-Control-Max-Age', str(max_age)),
+                ('Content-Length', '0')
+            ]
+            self._actual[origin] = common + [('Access-Control-Expose-Headers', ','.join(expose_headers))]
+
+    def __call__(self, environ, start_response):
+        origin = environ.get('HTTP_ORIGIN')
+        if origin is None:
+            return self.wsgi_app(environ, start_response)
+
+        if environ['REQUEST_METHOD'] == 'OPTIONS' and 'HTTP_ACCESS_CONTROL_REQUEST_METHOD' in environ:
+            # Unknown origins get a bare 204, which the browser treats as a refusal
+            start_response('204 No Content', list(self._preflight.get(origin, [('Content-Length', '0')])))
+            return [b'']
+
+        cors_headers = self._actual.get(origin)
+        if cors_headers is None:
+            return self.wsgi_app(environ, start_response)
+
+        def start_with_cors(status, headers, exc_info=None):
+            headers = [h for h in headers if not h[0].lower().startswith('access-control-')]
+            return start_response(status, headers + cors_headers, exc_info)
+
+        return self.wsgi_app(environ, start_with_cors)
+
+def init_cors(app):
+    config = app.config
+    app.wsgi_app = CorsMiddleware(
+        app.wsgi_app,
+        origins=config['CORS_ORIGINS'],
+        methods=config['CORS_METHODS'],
+        allow_headers=config['CORS_ALLOW_HEADERS'],
+        expose_headers=config['CORS_EXPOSE_HEADERS'],
+        max_age=config['CORS_MAX_AGE'],
+        supports_credentials=config['CORS_SUPPORTS_CREDENTIALS']
+    )
@@ -1,15 +1,22 @@
-from flask_mail import Message
-from ..extensions import mail
+from ..extensions import db
+from ..models.outbox import OutboxEmail
 
-def send_otp_email(email, otp):
-    try:
-        msg = Message(
-            subject='Your OTP for Hotel Booking App',
-            recipients=[email],
-            body=f'Your OTP is {otp}. It is valid for 10 minutes.'
-        )
-        mail.send(msg)
-        return True
-    except Exception as e:
-        print(f"Error sending email: {str(e)}")
-        return False
\ No newline at end of file
+def enqueue_email(subject, recipients, body, sender=None):
+    """Queue an email in the current transaction; it is sent once the caller commits."""
+    entry = OutboxEmail(
+        subject=subject,
+        sender=sender,
+        recipients=','.join(recipients),
+        body=body
+    )
+    db.session.add(entry)
+    db.session.info['outbox_pending'] = True
+    return entry
+
+def send_otp_email(email, otp, minutes=10):
+    enqueue_email(
+        'Your OTP for Hotel Booking App',
+        [email],
+        f'Your OTP is {otp}. It is valid for {minutes} minutes.'
+    )
+    return True
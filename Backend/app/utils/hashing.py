@@ -0,0 +1,92 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import jsonify
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class HashingBusy(Exception):
+    """Raised when the hashing pool is full, or a job did not finish within PASSWORD_HASH_TIMEOUT."""
+
+class PasswordHasher:
+    """Runs password KDF calls on a bounded process pool so they never starve request threads.
+
+    Without an app (or with ``PASSWORD_HASH_WORKERS = 0``) hashing runs inline.
+    """
+
+    def __init__(self, app=None):
+        self.method = 'pbkdf2:sha256:600000'
+        self.salt_length = 16
+        self.workers = 0
+        self.timeout = None
+        self.retry_after = 1
+        self._slots = None
+        self._executor = None
+        self._pid = None
+        self._prefix = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.method = app.config['PASSWORD_HASH_METHOD']
+        self.salt_length = app.config['PASSWORD_HASH_SALT_LENGTH']
+        self.workers = app.config['PASSWORD_HASH_WORKERS']
+        self.timeout = app.config['PASSWORD_HASH_TIMEOUT']
+        self.retry_after = app.config['PASSWORD_HASH_RETRY_AFTER']
+        self._slots = threading.BoundedSemaphore(self.workers + app.config['PASSWORD_HASH_MAX_PENDING'])
+        self._prefix = None
+        app.extensions['password_hasher'] = self
+
+        @app.errorhandler(HashingBusy)
+        def handle_hashing_busy(e):
+            return jsonify({'message': 'Server is busy. Please try again shortly.'}), 503, {
+                'Retry-After': str(self.retry_after)
+            }
+
+    def _get_executor(self):
+        # A pool inherited across fork has no live workers, so build one per process.
+        # Workers are spawned rather than forked: this process already runs logging,
+        # outbox and scheduler threads whose locks a fork could copy mid-use.
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                    )
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _run(self, fn, *args):
+        if self.workers < 1:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is freed when the job ends, not when this caller stops waiting,
+        # so a timed-out job still counts against the queue until it finishes
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HashingBusy()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        # werkzeug expands the configured method (e.g. 'scrypt' -> 'scrypt:32768:8:1'),
+        # so learn the stored prefix from a throwaway hash rather than the config string
+        if self._prefix is None:
+            self._prefix = generate_password_hash('', self.method, 1).split('$', 1)[0]
+        return pwhash.split('$', 1)[0] != self._prefix
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,78 @@
+import logging
+from datetime import datetime, timedelta
+from flask import current_app
+from ..extensions import db
+from ..models.room_hold import RoomHold
+from ..models.room_night import RoomNight
+from .availability import stay_nights
+
+logger = logging.getLogger(__name__)
+
+SWEEP_BATCH_SIZE = 500
+
+def place_hold(room_id, start_date, end_date, user_id):
+    """Take the stay's night slots for user_id for ROOM_HOLD_MINUTES; the commit raises IntegrityError if any is taken."""
+    release_expired_holds(room_id)
+    # A retried checkout replaces the caller's own overlapping hold instead of colliding with it
+    for previous in RoomHold.query.filter(
+        RoomHold.room_id == room_id,
+        RoomHold.user_id == user_id,
+        RoomHold.start_date < end_date,
+        RoomHold.end_date > start_date
+    ).all():
+        release_hold(previous)
+    hold = RoomHold(
+        room_id=room_id,
+        user_id=user_id,
+        start_date=start_date,
+        end_date=end_date,
+        expires_at=datetime.utcnow() + timedelta(minutes=current_app.config['ROOM_HOLD_MINUTES'])
+    )
+    db.session.add(hold)
+    db.session.flush()
+    db.session.add_all([
+        RoomNight(room_id=room_id, night_date=night, hold_id=hold.id)
+        for night in stay_nights(start_date, end_date)
+    ])
+    return hold
+
+def convert_hold(hold, booking_id):
+    """Hand a hold's night slots to a booking; returns False if the hold was already swept."""
+    converted = RoomNight.query.filter_by(hold_id=hold.id).update(
+        {'booking_id': booking_id, 'hold_id': None}, synchronize_session=False
+    )
+    db.session.delete(hold)
+    # Sweeping removes a hold's nights all at once, so this is all or nothing
+    return converted > 0
+
+def release_hold(hold):
+    RoomNight.query.filter_by(hold_id=hold.id).delete(synchronize_session=False)
+    db.session.delete(hold)
+
+def release_expired_holds(room_id=None, now=None):
+    """Delete up to SWEEP_BATCH_SIZE holds expired as of now (optionally for one room); the caller commits."""
+    query = db.session.query(RoomHold.id).filter(RoomHold.expires_at <= (now or datetime.utcnow()))
+    if room_id is not None:
+        query = query.filter(RoomHold.room_id == room_id)
+    hold_ids = [hold_id for (hold_id,) in query.limit(SWEEP_BATCH_SIZE).all()]
+    if not hold_ids:
+        return 0
+    RoomNight.query.filter(RoomNight.hold_id.in_(hold_ids)).delete(synchronize_session=False)
+    RoomHold.query.filter(RoomHold.id.in_(hold_ids)).delete(synchronize_session=False)
+    return len(hold_ids)
+
+def sweep_expired_holds():
+    total = 0
+    try:
+        while True:
+            released = release_expired_holds()
+            db.session.commit()
+            total += released
+            if released < SWEEP_BATCH_SIZE:
+                break
+    except Exception:
+        db.session.rollback()
+        raise
+    if total:
+        logger.info('Released %s expired room hold(s)', total)
+    return total
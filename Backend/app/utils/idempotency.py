@@ -0,0 +1,193 @@
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import request, jsonify, make_response, current_app
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from ..extensions import db
+from ..models.idempotency_key import IdempotencyKey
+from .cache import create_backend
+
+logger = logging.getLogger(__name__)
+
+class DatabaseBackend:
+    """Keys in the ``idempotency_keys`` table, so claims hold across every worker process.
+
+    Each call is its own short transaction on the primary, outside the request
+    session: a claim is visible to other workers at once and survives the
+    handler rolling back.
+    """
+
+    table = IdempotencyKey.__table__
+
+    @staticmethod
+    def _id(key):
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        with db.engine.connect() as connection:
+            return connection.execute(select(self.table.c.value).where(
+                self.table.c.key == self._id(key),
+                self.table.c.expires_at > datetime.utcnow()
+            )).scalar()
+
+    def set(self, key, value, ttl):
+        row = {'value': value, 'expires_at': datetime.utcnow() + timedelta(seconds=ttl)}
+        with db.engine.begin() as connection:
+            updated = connection.execute(self.table.update().where(self.table.c.key == self._id(key)).values(**row))
+            if not updated.rowcount:
+                connection.execute(self.table.insert().values(key=self._id(key), **row))
+
+    def add(self, key, value, ttl):
+        """Store ``value`` only if ``key`` is absent or expired; the primary key decides races."""
+        now = datetime.utcnow()
+        with db.engine.begin() as connection:
+            connection.execute(self.table.delete().where(
+                self.table.c.key == self._id(key), self.table.c.expires_at <= now
+            ))
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(self.table.insert().values(
+                    key=self._id(key), value=value, expires_at=now + timedelta(seconds=ttl)
+                ))
+        except IntegrityError:
+            return False
+        return True
+
+    def delete(self, key):
+        with db.engine.begin() as connection:
+            connection.execute(self.table.delete().where(self.table.c.key == self._id(key)))
+
+class IdempotencyStore:
+    """Keyed store of completed responses for requests carrying an ``Idempotency-Key``.
+
+    The first request for a key claims it with an atomic add; duplicates that
+    arrive while it runs wait for the stored response instead of running the
+    handler again.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if app.config['IDEMPOTENCY_BACKEND'] == 'database':
+            self.backend = DatabaseBackend()
+        else:
+            self.backend = create_backend(
+                app.config['IDEMPOTENCY_BACKEND'],
+                url=app.config['IDEMPOTENCY_URL'],
+                max_entries=app.config['IDEMPOTENCY_MAX_ENTRIES'],
+                prefix='hotel:idem:'
+            )
+        app.extensions['idempotency'] = self
+
+    def claim(self, key, fingerprint, ttl):
+        return self.backend.add(key, json.dumps({'state': 'pending', 'fingerprint': fingerprint}).encode(), ttl=ttl)
+
+    def get(self, key):
+        raw = self.backend.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def complete(self, key, fingerprint, response, ttl):
+        self.backend.set(key, json.dumps({
+            'state': 'done',
+            'fingerprint': fingerprint,
+            'status': response.status_code,
+            'mimetype': response.mimetype,
+            'body': response.get_data(as_text=True)
+        }).encode(), ttl=ttl)
+
+    def release(self, key):
+        self.backend.delete(key)
+
+idempotency_store = IdempotencyStore()
+
+def _replay(entry):
+    response = make_response(entry['body'], entry['status'])
+    response.mimetype = entry['mimetype']
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+def idempotent(fn):
+    """Replay the stored response when a request repeats its ``Idempotency-Key``.
+
+    Keys are scoped to the endpoint and the caller (JWT identity, else client IP).
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return fn(*args, **kwargs)
+        if len(key) > 255:
+            return jsonify({'message': 'Idempotency-Key must be at most 255 characters'}), 400
+
+        verify_jwt_in_request(optional=True)
+        caller = get_jwt_identity() or request.remote_addr
+        scoped_key = f'{request.endpoint}:{caller}:{key}'
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        config = current_app.config
+
+        if not idempotency_store.claim(scoped_key, fingerprint, config['IDEMPOTENCY_LOCK_TTL']):
+            deadline = time.monotonic() + config['IDEMPOTENCY_WAIT']
+            while True:
+                entry = idempotency_store.get(scoped_key)
+                if entry is None:
+                    # The original attempt failed and released the key; run this one instead
+                    if idempotency_store.claim(scoped_key, fingerprint, config['IDEMPOTENCY_LOCK_TTL']):
+                        break
+                elif entry['fingerprint'] != fingerprint:
+                    logger.warning('Idempotency-Key reused with a different payload on %s', request.endpoint)
+                    return jsonify({'message': 'Idempotency-Key was already used with a different request'}), 422
+                elif entry['state'] == 'done':
+                    logger.info('Replaying response for Idempotency-Key on %s', request.endpoint)
+                    return _replay(entry)
+                if time.monotonic() >= deadline:
+                    return jsonify({'message': 'A request with this Idempotency-Key is still in progress'}), 409, {
+                        'Retry-After': '1'
+                    }
+                time.sleep(0.05)
+
+        try:
+            response = make_response(fn(*args, **kwargs))
+        except Exception:
+            # End the request's transaction first; it may hold locks the release needs
+            db.session.rollback()
+            idempotency_store.release(scoped_key)
+            raise
+        completed = False
+        try:
+            # The store writes on its own connection; on SQLite a request transaction
+            # left open here would hold the write lock it needs
+            if response.status_code < 300:
+                db.session.commit()
+            else:
+                db.session.rollback()
+            # Server-side failures are not final; let the client retry with the same key
+            if response.status_code < 500:
+                idempotency_store.complete(scoped_key, fingerprint, response, config['IDEMPOTENCY_TTL'])
+                completed = True
+        finally:
+            if not completed:
+                idempotency_store.release(scoped_key)
+        return response
+    return wrapper
+
+def purge_expired_keys():
+    """Delete expired rows from ``idempotency_keys`` (database backend only)."""
+    try:
+        deleted = IdempotencyKey.query.filter(
+            IdempotencyKey.expires_at <= datetime.utcnow()
+        ).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if deleted:
+        logger.info('Purged %s expired idempotency key(s)', deleted)
+    return deleted
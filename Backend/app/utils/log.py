@@ -0,0 +1,128 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import threading
+import uuid
+from datetime import datetime, timezone
+from flask import g, request, has_request_context
+
+SECRET_FIELDS = ('password', 'new_password', 'otp', 'access_token', 'token', 'government_id', 'authorization')
+JWT_PATTERN = re.compile(r'eyJ[\w-]+\.[\w-]+\.[\w-]+')
+BEARER_PATTERN = re.compile(r'(?i)(bearer\s+)\S+')
+FIELD_PATTERN = re.compile(
+    r'''(?i)(['"]?(?:%s)['"]?\s*[:=]\s*)('[^']*'|"[^"]*"|[^\s,}&]+)''' % '|'.join(SECRET_FIELDS)
+)
+
+def redact(text):
+    text = JWT_PATTERN.sub('[REDACTED]', text)
+    text = BEARER_PATTERN.sub(r'\1[REDACTED]', text)
+    return FIELD_PATTERN.sub(r'\1[REDACTED]', text)
+
+class RequestContextFilter(logging.Filter):
+    """Stamps request metadata on the record while still on the request thread."""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id')
+            record.method = request.method
+            record.path = request.path
+        else:
+            record.request_id = None
+        return True
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'pid': record.process,
+            'message': redact(record.getMessage())
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+            entry['method'] = record.method
+            entry['path'] = record.path
+        if record.exc_info:
+            entry['exc_info'] = redact(self.formatException(record.exc_info))
+        elif record.exc_text:
+            entry['exc_info'] = redact(record.exc_text)
+        return json.dumps(entry)
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to a listener thread that owns the real handlers.
+
+    The listener and its handlers are built per process by ``make_handlers``,
+    since threads do not survive a fork and each process writes its own file.
+    """
+
+    def __init__(self, make_handlers):
+        super().__init__(queue.SimpleQueue())
+        self.make_handlers = make_handlers
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.SimpleQueue()
+            self._listener = logging.handlers.QueueListener(
+                self.queue, *self.make_handlers(), respect_handler_level=True
+            )
+            self._listener.start()
+            self._pid = os.getpid()
+            atexit.register(self._listener.stop)
+
+    def prepare(self, record):
+        # Merge args now (they may change after the call returns) but leave
+        # traceback rendering and JSON encoding to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def emit(self, record):
+        self._ensure_listener()
+        super().emit(record)
+
+def setup_logging(app):
+    config = app.config
+
+    def make_handlers():
+        # Resolved in the process that logs, so every worker rotates its own file
+        log_file = config['LOG_FILE'].replace('{pid}', str(os.getpid()))
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=config['LOG_MAX_BYTES'],
+            backupCount=config['LOG_BACKUP_COUNT'],
+            delay=True
+        )
+        file_handler.setFormatter(JsonFormatter())
+        return [file_handler]
+
+    queue_handler = AsyncQueueHandler(make_handlers)
+    queue_handler.addFilter(RequestContextFilter())
+
+    app_logger = logging.getLogger('app')
+    app_logger.handlers = [queue_handler]
+    app_logger.setLevel(config['LOG_LEVEL'])
+    app_logger.propagate = False
+
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+
+    @app.after_request
+    def echo_request_id(response):
+        if 'request_id' in g:
+            response.headers['X-Request-ID'] = g.request_id
+        return response
@@ -0,0 +1,269 @@
+import bisect
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from flask import Response, g, request, abort, current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[label] for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[label] for label in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # Per-bucket counts (last one is +Inf), then sum
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self):
+        with self._lock:
+            return [[list(key), [list(counts), total]] for key, (counts, total) in self._values.items()]
+
+RETIRED_SNAPSHOT = 'metrics-retired.json'
+
+def snapshot_path(directory, pid):
+    return os.path.join(directory, f'metrics-{pid}.json')
+
+def merge_snapshots(snapshots):
+    """Sum snapshots into {name: {label_tuple: value}}; histogram values are (bucket counts, sum)."""
+    merged = {}
+    for snapshot in snapshots:
+        for name, samples in snapshot.items():
+            target = merged.setdefault(name, {})
+            for labels, value in samples:
+                key = tuple(labels)
+                if isinstance(value, list):
+                    counts, total = target.get(key, ([0] * len(value[0]), 0.0))
+                    target[key] = ([a + b for a, b in zip(counts, value[0])], total + value[1])
+                else:
+                    target[key] = target.get(key, 0) + value
+    return merged
+
+def _write_json(path, data):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+class Registry:
+    """Process-local metrics, merged across worker processes through snapshot files.
+
+    Each process only touches its own dicts (one short lock per metric);
+    with ``METRICS_DIR`` set, processes write ``metrics-<pid>.json`` there and
+    the scraping process sums every file. When a worker dies the gunicorn
+    master folds its file into ``metrics-retired.json`` and deletes it, so
+    recycled workers' counters are kept without one file per pid ever used.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+
+    def counter(self, name, help, labels=()):
+        return self.metrics.setdefault(name, Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self.metrics.setdefault(name, Histogram(name, help, labels, buckets))
+
+    def snapshot(self):
+        return {name: metric.samples() for name, metric in self.metrics.items()}
+
+    def write_snapshot(self, directory):
+        _write_json(snapshot_path(directory, os.getpid()), self.snapshot())
+
+    def retire_snapshot(self, directory, pid):
+        """Add a dead process's snapshot to the retired totals and delete it; returns False if it had none.
+
+        Only call this for a pid that is not running, and from one process at a
+        time (the gunicorn master), since the retired file is read-modify-write.
+        """
+        path = snapshot_path(directory, pid)
+        retired_path = os.path.join(directory, RETIRED_SNAPSHOT)
+        try:
+            with open(path) as f:
+                dead = json.load(f)
+        except FileNotFoundError:
+            return False
+        except ValueError as e:
+            logger.warning('Discarding unreadable metrics snapshot %s: %s', path, e)
+            os.remove(path)
+            return False
+        retired = {}
+        if os.path.exists(retired_path):
+            with open(retired_path) as f:
+                retired = json.load(f)
+        merged = merge_snapshots([retired, dead])
+        _write_json(retired_path, {
+            name: [[list(key), list(value) if isinstance(value, tuple) else value] for key, value in samples.items()]
+            for name, samples in merged.items()
+        })
+        # Removed only after the totals are safely in the retired file
+        os.remove(path)
+        return True
+
+    def retire_stale_snapshots(self, directory):
+        """Retire every per-pid snapshot, e.g. left over from a previous server run."""
+        for path in glob.glob(os.path.join(directory, 'metrics-*.json')):
+            pid = os.path.basename(path)[len('metrics-'):-len('.json')]
+            if pid.isdigit():
+                self.retire_snapshot(directory, int(pid))
+
+    def collect(self, directory=None):
+        """Merged samples: {name: {label_tuple: value}} over this process and any snapshot files."""
+        snapshots = [self.snapshot()]
+        if directory:
+            self.write_snapshot(directory)
+            snapshots = []
+            for path in glob.glob(os.path.join(directory, 'metrics-*.json')):
+                try:
+                    with open(path) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError) as e:
+                    logger.warning('Skipping unreadable metrics snapshot %s: %s', path, e)
+
+        merged = merge_snapshots(snapshots)
+        return {name: merged.get(name, {}) for name in self.metrics}
+
+    def render(self, directory=None):
+        lines = []
+        for name, samples in self.collect(directory).items():
+            metric = self.metrics[name]
+            kind = 'histogram' if isinstance(metric, Histogram) else 'counter'
+            lines.append(f'# HELP {name} {metric.help}')
+            lines.append(f'# TYPE {name} {kind}')
+            for key, value in sorted(samples.items()):
+                pairs = [f'{label}="{_escape(v)}"' for label, v in zip(metric.labels, key)]
+                if kind == 'counter':
+                    lines.append(f'{name}{_labels(pairs)} {value}')
+                    continue
+                counts, total = value
+                running = 0
+                for bound, count in zip(metric.buckets + (float('inf'),), counts):
+                    running += count
+                    le = 'le="%s"' % ('+Inf' if bound == float('inf') else repr(bound))
+                    lines.append(f'{name}_bucket{_labels(pairs + [le])} {running}')
+                lines.append(f'{name}_sum{_labels(pairs)} {total}')
+                lines.append(f'{name}_count{_labels(pairs)} {running}')
+        return '\n'.join(lines) + '\n'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(pairs):
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+registry = Registry()
+
+http_requests = registry.counter(
+    'http_requests_total', 'HTTP requests by endpoint and status.', ('blueprint', 'endpoint', 'method', 'status')
+)
+http_duration = registry.histogram(
+    'http_request_duration_seconds', 'Time to build the HTTP response.', ('blueprint', 'endpoint', 'method')
+)
+db_duration = registry.histogram(
+    'db_query_duration_seconds', 'Database statement execution time.', ('operation',)
+)
+smtp_duration = registry.histogram(
+    'smtp_send_duration_seconds', 'Time to hand one message to the SMTP server.', ('outcome',)
+)
+payment_duration = registry.histogram(
+    'payment_gateway_duration_seconds', 'Razorpay API call time.', ('operation', 'outcome')
+)
+payment_rejected = registry.counter(
+    'payment_gateway_rejected_total', 'Calls refused while the circuit breaker was open.', ('operation',)
+)
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info['metrics_query_start'] = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop('metrics_query_start', None)
+    if started is not None:
+        operation = statement.lstrip()[:6].lower()
+        if operation not in ('select', 'insert', 'update', 'delete'):
+            operation = 'other'
+        db_duration.observe(time.perf_counter() - started, operation=operation)
+
+class Metrics:
+    def __init__(self, app=None):
+        self.directory = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.directory = app.config['METRICS_DIR'] or None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            # A file under our pid belongs to a dead process; keep its totals instead of overwriting them
+            registry.retire_snapshot(self.directory, os.getpid())
+        app.extensions['metrics'] = self
+
+        @app.before_request
+        def start_request_timer():
+            g.metrics_started = time.perf_counter()
+
+        @app.after_request
+        def record_request(response):
+            started = g.pop('metrics_started', None)
+            if started is not None:
+                # Unmatched URLs share one label so scanners cannot blow up cardinality
+                endpoint = request.endpoint or 'unmatched'
+                blueprint = request.blueprint or ''
+                http_duration.observe(
+                    time.perf_counter() - started, blueprint=blueprint, endpoint=endpoint, method=request.method
+                )
+                http_requests.inc(
+                    blueprint=blueprint, endpoint=endpoint, method=request.method, status=response.status_code
+                )
+            return response
+
+        app.add_url_rule('/metrics', 'metrics', self.serve)
+
+    def serve(self):
+        token = current_app.config['METRICS_TOKEN']
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            abort(401)
+        return Response(registry.render(self.directory), mimetype='text/plain; version=0.0.4')
+
+    def flush(self):
+        """Publish this process's snapshot for the scraping process (scheduler job)."""
+        if self.directory:
+            registry.write_snapshot(self.directory)
+
+metrics = Metrics()
@@ -1,29 +1,117 @@
 from ..extensions import db
-import random
+from flask import current_app
+import hmac
+import logging
+import secrets
 import string
 from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
+
+OTP_VALID = 'valid'
+OTP_INVALID = 'invalid'
+OTP_EXPIRED = 'expired'
+OTP_LOCKED = 'locked'
+
+PURPOSE_VERIFY = 'verify'
+PURPOSE_RESET = 'reset'
+
 class Otp(db.Model):
+    """One issued code; rows outlive their TTL until the send-throttle window has passed."""
     __tablename__ = 'otps'
+    __table_args__ = (
+        db.Index('ix_otps_email_created_at', 'email', 'created_at'),
+        db.Index('ix_otps_ip_created_at', 'ip', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), nullable=False)
+    purpose = db.Column(db.String(20), nullable=False)
     otp = db.Column(db.String(6), nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    ip = db.Column(db.String(45), nullable=True)
+    used = db.Column(db.Boolean, nullable=False, default=False)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
+class OtpThrottled(Exception):
+    """Too many codes were requested for this email or client address."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
 def generate_otp():
-    return ''.join(random.choices(string.digits, k=6))
-
-def store_otp(email, otp):
-    # Remove existing OTPs for this email
-    Otp.query.filter_by(email=email).delete()
-    otp_entry = Otp(email=email, otp=otp, created_at=datetime.utcnow())
-    db.session.add(otp_entry)
-    db.session.commit()
-
-def verify_otp(email, otp):
-    otp_entry = Otp.query.filter_by(email=email, otp=otp).first()
-    if otp_entry:
-        # Check if OTP is not older than 10 minutes
-        if datetime.utcnow() < otp_entry.created_at + timedelta(minutes=10):
-            return True
-    return False
\ No newline at end of file
+    return ''.join(secrets.choice(string.digits) for _ in range(6))
+
+def _check_send_limits(email, ip, now):
+    config = current_app.config
+    window_start = now - timedelta(seconds=config['OTP_SEND_WINDOW'])
+
+    latest = db.session.query(db.func.max(Otp.created_at)).filter(Otp.email == email).scalar()
+    if latest and latest + timedelta(seconds=config['OTP_RESEND_INTERVAL']) > now:
+        wait = (latest + timedelta(seconds=config['OTP_RESEND_INTERVAL']) - now).total_seconds()
+        raise OtpThrottled('Please wait before requesting another OTP', int(wait) + 1)
+
+    sent_to_email = Otp.query.filter(Otp.email == email, Otp.created_at >= window_start).count()
+    if sent_to_email >= config['OTP_MAX_SENDS_PER_EMAIL']:
+        raise OtpThrottled('Too many OTP requests for this email', config['OTP_SEND_WINDOW'])
+    if ip:
+        sent_from_ip = Otp.query.filter(Otp.ip == ip, Otp.created_at >= window_start).count()
+        if sent_from_ip >= config['OTP_MAX_SENDS_PER_IP']:
+            raise OtpThrottled('Too many OTP requests from this address', config['OTP_SEND_WINDOW'])
+
+def issue_otp(email, purpose, ip=None):
+    """Add a fresh code for ``email`` to the session and return it; raises OtpThrottled.
+
+    The caller commits, together with the email that delivers the code.
+    """
+    now = datetime.utcnow()
+    _check_send_limits(email, ip, now)
+    code = generate_otp()
+    db.session.add(Otp(email=email, purpose=purpose, otp=code, ip=ip, created_at=now))
+    return code
+
+def verify_otp(email, purpose, code):
+    """Check ``code`` against the newest code issued for ``email`` and ``purpose``.
+
+    Failed attempts are committed immediately so they count even though the
+    request is rejected. On success the code is marked used in the current
+    transaction and the caller commits it with the rest of its changes.
+    """
+    config = current_app.config
+    entry = Otp.query.filter_by(email=email, purpose=purpose).order_by(Otp.created_at.desc()).first()
+    if not entry or entry.used:
+        return OTP_INVALID
+    if entry.created_at + timedelta(seconds=config['OTP_TTL']) < datetime.utcnow():
+        return OTP_EXPIRED
+
+    # Conditional increment so concurrent guesses cannot exceed the limit
+    claimed = Otp.query.filter(
+        Otp.id == entry.id,
+        Otp.attempts < config['OTP_MAX_ATTEMPTS']
+    ).update({Otp.attempts: Otp.attempts + 1}, synchronize_session=False)
+    if not claimed:
+        db.session.commit()
+        return OTP_LOCKED
+    if not hmac.compare_digest(entry.otp.encode(), str(code).encode()):
+        db.session.commit()
+        return OTP_INVALID
+
+    consumed = Otp.query.filter(Otp.id == entry.id, Otp.used.is_(False)).update(
+        {Otp.used: True}, synchronize_session=False
+    )
+    return OTP_VALID if consumed else OTP_INVALID
+
+def purge_expired_otps():
+    """Delete codes older than both their TTL and the send-throttle window."""
+    config = current_app.config
+    cutoff = datetime.utcnow() - timedelta(seconds=max(config['OTP_TTL'], config['OTP_SEND_WINDOW']))
+    try:
+        deleted = Otp.query.filter(Otp.created_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if deleted:
+        logger.info('Purged %s expired OTP(s)', deleted)
+    return deleted
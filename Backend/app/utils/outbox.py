@@ -0,0 +1,183 @@
+import logging
+import os
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import event
+from ..extensions import db, mail
+from ..models.outbox import OutboxEmail
+from .metrics import smtp_duration
+
+logger = logging.getLogger(__name__)
+
+def is_permanent(error):
+    """A 5xx reply to one message (unknown mailbox, rejected content) will not change on retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+class OutboxDispatcher:
+    """Background threads that drain ``email_outbox`` over one SMTP connection per batch.
+
+    Rows are claimed by pushing ``next_attempt_at`` forward as a lease, so any
+    number of threads and processes can drain the same table, and a row held
+    by a crashed worker becomes due again once the lease runs out.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['mail_outbox'] = self
+
+        @app.before_request
+        def start_outbox_workers():
+            self.ensure_started()
+
+        @event.listens_for(db.session, 'after_commit')
+        def wake_outbox(session):
+            if session.info.pop('outbox_pending', False):
+                self.wake()
+
+        @app.cli.command('outbox-drain')
+        def outbox_drain():
+            """Send every due message in the email outbox and exit."""
+            total = 0
+            while True:
+                sent = self.drain_batch()
+                if not sent:
+                    break
+                total += sent
+            print(f'Processed {total} outbox message(s)')
+
+    def ensure_started(self):
+        # Threads do not survive a fork, so start them once per worker process
+        if self._pid == os.getpid() or self.app.config['MAIL_OUTBOX_WORKERS'] < 1:
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            for i in range(self.app.config['MAIL_OUTBOX_WORKERS']):
+                thread = threading.Thread(target=self._run, name=f'mail-outbox-{i}', daemon=True)
+                thread.start()
+            self._pid = os.getpid()
+
+    def wake(self):
+        self.ensure_started()
+        self._wakeup.set()
+
+    def _run(self):
+        poll_interval = self.app.config['MAIL_OUTBOX_POLL_INTERVAL']
+        while True:
+            try:
+                with self.app.app_context():
+                    processed = self.drain_batch()
+            except Exception:
+                logger.exception('Mail outbox worker failed')
+                processed = 0
+            if not processed:
+                self._wakeup.wait(poll_interval)
+                self._wakeup.clear()
+
+    def _claim(self):
+        config = self.app.config
+        now = datetime.utcnow()
+        lease_until = now + timedelta(seconds=config['MAIL_OUTBOX_LEASE_SECONDS'])
+        candidates = db.session.query(OutboxEmail.id).filter(
+            OutboxEmail.status.in_(['pending', 'sending']),
+            OutboxEmail.next_attempt_at <= now
+        ).order_by(OutboxEmail.next_attempt_at).limit(config['MAIL_OUTBOX_BATCH_SIZE']).all()
+
+        claimed = []
+        for (entry_id,) in candidates:
+            updated = OutboxEmail.query.filter(
+                OutboxEmail.id == entry_id,
+                OutboxEmail.status.in_(['pending', 'sending']),
+                OutboxEmail.next_attempt_at <= now
+            ).update({'status': 'sending', 'next_attempt_at': lease_until}, synchronize_session=False)
+            if updated:
+                claimed.append(entry_id)
+        db.session.commit()
+        if not claimed:
+            return []
+        return OutboxEmail.query.filter(OutboxEmail.id.in_(claimed)).all()
+
+    def _mark_failed(self, entry, error, permanent=False):
+        config = self.app.config
+        entry.attempts += 1
+        entry.last_error = error
+        if permanent or entry.attempts >= config['MAIL_OUTBOX_MAX_ATTEMPTS']:
+            entry.status = 'failed'
+            logger.error('Giving up on outbox email %s after %s attempts: %s', entry.id, entry.attempts, error)
+        else:
+            entry.status = 'pending'
+            delay = config['MAIL_OUTBOX_RETRY_BACKOFF'] * 2 ** (entry.attempts - 1)
+            entry.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+            logger.warning('Outbox email %s failed, retrying in %ss: %s', entry.id, delay, error)
+
+    def drain_batch(self):
+        """Send one batch of due messages; returns how many were processed."""
+        try:
+            entries = self._claim()
+        except Exception:
+            db.session.rollback()
+            raise
+        if not entries:
+            return 0
+
+        try:
+            with mail.connect() as connection:
+                for entry in entries:
+                    msg = Message(
+                        entry.subject,
+                        sender=entry.sender,
+                        recipients=entry.recipients.split(','),
+                        body=entry.body
+                    )
+                    started = time.perf_counter()
+                    try:
+                        connection.send(msg)
+                        smtp_duration.observe(time.perf_counter() - started, outcome='sent')
+                        entry.status = 'sent'
+                        entry.sent_at = datetime.utcnow()
+                        entry.last_error = None
+                    except Exception as e:
+                        smtp_duration.observe(time.perf_counter() - started, outcome='error')
+                        self._mark_failed(entry, str(e), permanent=is_permanent(e))
+        except Exception as e:
+            # Connecting or closing the SMTP session failed; retry whatever was not sent
+            for entry in entries:
+                if entry.status == 'sending':
+                    self._mark_failed(entry, str(e))
+        db.session.commit()
+        logger.info('Mail outbox processed %s message(s)', len(entries))
+        return len(entries)
+
+outbox = OutboxDispatcher()
+
+def purge_old_emails():
+    """Delete sent and failed messages older than MAIL_OUTBOX_RETENTION_DAYS."""
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config['MAIL_OUTBOX_RETENTION_DAYS'])
+    try:
+        # next_attempt_at is the last lease taken, so it is never earlier than the
+        # final attempt and the (status, next_attempt_at) index serves the delete
+        deleted = OutboxEmail.query.filter(
+            OutboxEmail.status.in_(['sent', 'failed']),
+            OutboxEmail.next_attempt_at < cutoff
+        ).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if deleted:
+        logger.info('Purged %s old outbox message(s)', deleted)
+    return deleted
@@ -0,0 +1,27 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+def encode_cursor(value, row_id):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Return ``(value, row_id)`` from an opaque cursor; raises ValueError if malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+    if not isinstance(row_id, int):
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return value, row_id
+
+def keyset_filter(column, id_column, value, row_id, descending=False):
+    # Rows strictly after (value, row_id) in (column, id) order; id breaks ties
+    if descending:
+        return or_(column < value, and_(column == value, id_column < row_id))
+    return or_(column > value, and_(column == value, id_column > row_id))
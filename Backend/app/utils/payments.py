@@ -0,0 +1,135 @@
+import logging
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from .metrics import payment_duration, payment_rejected
+
+logger = logging.getLogger(__name__)
+
+class GatewayUnavailable(Exception):
+    """The payment gateway is failing or the circuit breaker is open."""
+
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive failures and lets one trial call through
+    every ``reset_timeout`` seconds until a call succeeds."""
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Half-open: re-arm the timer so only this caller probes the gateway
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+class PaymentGateway:
+    """Razorpay client with a keep-alive pool, per-call timeouts, bounded retries
+    and a circuit breaker that fails fast while the gateway is down."""
+
+    def __init__(self, app=None):
+        self.breaker = CircuitBreaker()
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.auth = (config['RAZORPAY_KEY_ID'], config['RAZORPAY_KEY_SECRET'])
+        self.base_url = config['RAZORPAY_BASE_URL']
+        self.timeout = (config['RAZORPAY_CONNECT_TIMEOUT'], config['RAZORPAY_READ_TIMEOUT'])
+        self.max_retries = config['RAZORPAY_MAX_RETRIES']
+        self.retry_backoff = config['RAZORPAY_RETRY_BACKOFF']
+        self.pool_size = config['RAZORPAY_POOL_SIZE']
+        self.breaker = CircuitBreaker(config['RAZORPAY_BREAKER_THRESHOLD'], config['RAZORPAY_BREAKER_RESET'])
+        # Rebuild the client on next use so it picks up this app's endpoint and keys
+        self._client = None
+        self._pid = None
+        app.extensions['payment_gateway'] = self
+
+    @property
+    def client(self):
+        # Sockets must not be shared with a forked parent, so build one client per process
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    import razorpay
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    client = razorpay.Client(session=session, auth=self.auth)
+                    if self.base_url:
+                        client.base_url = self.base_url
+                    self._client = client
+                    self._pid = os.getpid()
+        return self._client
+
+    def _is_gateway_failure(self, error):
+        import razorpay
+        # Client errors (bad request, auth) say nothing about gateway health
+        return isinstance(error, (requests.RequestException, razorpay.errors.ServerError))
+
+    def _is_retryable(self, error):
+        import razorpay
+        # Only retry when the order cannot have been created: the connection
+        # never got through, or the gateway reported a server-side failure
+        return isinstance(error, (requests.ConnectionError, requests.ConnectTimeout, razorpay.errors.ServerError))
+
+    def _call(self, operation, fn):
+        if not self.breaker.allow():
+            payment_rejected.inc(operation=operation)
+            raise GatewayUnavailable('Payment gateway circuit is open')
+
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                result = fn()
+            except Exception as e:
+                payment_duration.observe(time.perf_counter() - started, operation=operation, outcome='error')
+                if not self._is_gateway_failure(e):
+                    raise
+                if self._is_retryable(e) and attempt < self.max_retries:
+                    logger.warning('Razorpay %s failed (attempt %s), retrying: %s', operation, attempt + 1, e)
+                    time.sleep(self.retry_backoff * 2 ** attempt)
+                    continue
+                self.breaker.record_failure()
+                raise GatewayUnavailable(f'Payment gateway error: {e}') from e
+            payment_duration.observe(time.perf_counter() - started, operation=operation, outcome='ok')
+            self.breaker.record_success()
+            return result
+
+    def create_order(self, data):
+        return self._call('order.create', lambda: self.client.order.create(data=data, timeout=self.timeout))
+
+payment_gateway = PaymentGateway()
@@ -0,0 +1,89 @@
+import logging
+from collections import namedtuple
+from functools import wraps
+from flask import g, request, jsonify, current_app
+from flask_jwt_extended import create_access_token, verify_jwt_in_request, get_jwt, get_jwt_identity
+from sqlalchemy import event
+from ..models.user import User
+from .cache import LRUBackend
+
+logger = logging.getLogger(__name__)
+
+Principal = namedtuple('Principal', [
+    'id', 'email', 'first_name', 'last_name', 'phone_number', 'location', 'is_admin'
+])
+
+class PrincipalCache:
+    """Short-lived per-process snapshots of users keyed by id, least recently used dropped first.
+
+    Invalidation on update only reaches the process that made the change;
+    other workers keep their snapshot until PRINCIPAL_CACHE_TTL runs out.
+    """
+
+    def __init__(self, max_entries=10000):
+        self._entries = LRUBackend(max_entries)
+
+    def init_app(self, app):
+        self._entries = LRUBackend(app.config['PRINCIPAL_CACHE_MAX_ENTRIES'])
+        app.extensions['principal_cache'] = self
+
+    def get(self, user_id):
+        return self._entries.get(user_id)
+
+    def set(self, user_id, principal, ttl):
+        self._entries.set(user_id, principal, ttl=ttl)
+
+    def invalidate(self, user_id):
+        self._entries.delete(user_id)
+
+principal_cache = PrincipalCache()
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_principal(mapper, connection, target):
+    principal_cache.invalidate(target.id)
+
+def create_token(user):
+    return create_access_token(identity=str(user.id), additional_claims={'is_admin': bool(user.is_admin)})
+
+def load_principal(user_id):
+    ttl = current_app.config['PRINCIPAL_CACHE_TTL']
+    principal = principal_cache.get(user_id) if ttl > 0 else None
+    if principal is None:
+        user = User.query.get(user_id)
+        if not user:
+            return None
+        principal = Principal(
+            id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            phone_number=user.phone_number,
+            location=user.location,
+            is_admin=bool(user.is_admin)
+        )
+        if ttl > 0:
+            principal_cache.set(user_id, principal, ttl)
+    return principal
+
+def current_principal():
+    """The authenticated user for this request, resolved at most once; None if unknown."""
+    if 'principal' not in g:
+        identity = get_jwt_identity()
+        g.principal = load_principal(int(identity)) if identity else None
+    return g.principal
+
+def admin_required(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        verify_jwt_in_request()
+        is_admin = get_jwt().get('is_admin')
+        if is_admin is None:
+            # Tokens issued before the claim existed fall back to the user row
+            principal = current_principal()
+            is_admin = bool(principal and principal.is_admin)
+        if not is_admin:
+            logger.warning('Admin access denied for user_id: %s on %s', get_jwt_identity(), request.endpoint)
+            return jsonify({'message': 'Admin access required'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,14 @@
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+def init_proxy_fix(app):
+    """Trust X-Forwarded-* from the configured number of proxy hops, so remote_addr is the client's."""
+    config = app.config
+    hops = {
+        'x_for': config['PROXY_FIX_X_FOR'],
+        'x_proto': config['PROXY_FIX_X_PROTO'],
+        'x_host': config['PROXY_FIX_X_HOST'],
+        'x_port': config['PROXY_FIX_X_PORT'],
+        'x_prefix': config['PROXY_FIX_X_PREFIX']
+    }
+    if any(hops.values()):
+        app.wsgi_app = ProxyFix(app.wsgi_app, **hops)
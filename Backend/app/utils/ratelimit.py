@@ -0,0 +1,168 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import request, jsonify
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+KEY_KINDS = ('ip', 'user', 'email')
+
+def parse_rule(spec):
+    """Parse ``'<count>/<period>:<key>'`` (e.g. ``'5/minute:email'``) into (capacity, rate, key)."""
+    limit, _, kind = spec.partition(':')
+    count, _, period = limit.partition('/')
+    kind = kind or 'ip'
+    if period not in PERIODS or kind not in KEY_KINDS or int(count) < 1:
+        raise ValueError(f'Invalid rate limit rule: {spec}')
+    return int(count), int(count) / PERIODS[period], kind
+
+class MemoryBuckets:
+    """Per-process token buckets; the least recently used are dropped past ``max_entries``."""
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate):
+        """Take one token; returns seconds until one is available, or 0 if it was taken."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                self._buckets.move_to_end(key)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / rate
+            if len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def refund(self, key, capacity):
+        """Give back a token taken by ``consume``."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                self._buckets[key] = (min(capacity, bucket[0] + 1), bucket[1])
+
+class RedisBuckets:
+    """Token buckets shared by all workers; each take is one atomic script call."""
+
+    SCRIPT = '''
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return tostring(wait)
+    '''
+
+    REFUND_SCRIPT = '''
+    local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+    if tokens then
+        redis.call('HSET', KEYS[1], 'tokens', math.min(tonumber(ARGV[1]), tokens + 1))
+    end
+    '''
+
+    def __init__(self, url, prefix='hotel:rl:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._script = self.client.register_script(self.SCRIPT)
+        self._refund = self.client.register_script(self.REFUND_SCRIPT)
+
+    def consume(self, key, capacity, rate):
+        return float(self._script(keys=[self.prefix + key], args=[capacity, rate, time.time()]))
+
+    def refund(self, key, capacity):
+        self._refund(keys=[self.prefix + key], args=[capacity])
+
+class RateLimiter:
+    """Token-bucket limits per endpoint, keyed by client IP, JWT user or request email.
+
+    Rules come from ``RATE_LIMITS`` (endpoint -> list of rule strings) and are
+    parsed once, so unlimited endpoints cost a single dict lookup.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.rules = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.rules = {} if not config['RATE_LIMIT_ENABLED'] else {
+            endpoint: [parse_rule(spec) for spec in specs]
+            for endpoint, specs in config['RATE_LIMITS'].items()
+        }
+        if config['RATE_LIMIT_BACKEND'] == 'redis':
+            self.backend = RedisBuckets(config['RATE_LIMIT_URL'])
+        elif config['RATE_LIMIT_BACKEND'] == 'memory':
+            self.backend = MemoryBuckets(config['RATE_LIMIT_MAX_KEYS'])
+        else:
+            raise ValueError(f'Unknown rate limit backend: {config["RATE_LIMIT_BACKEND"]}')
+        app.extensions['rate_limiter'] = self
+        app.before_request(self.check)
+
+    def _key_value(self, kind):
+        if kind == 'ip':
+            return request.remote_addr
+        if kind == 'user':
+            verify_jwt_in_request(optional=True)
+            # Anonymous callers share the per-IP bucket for this rule
+            identity = get_jwt_identity()
+            return f'u{identity}' if identity else f'ip{request.remote_addr}'
+        email = (request.get_json(silent=True) or {}).get('email')
+        return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+    def check(self):
+        rules = self.rules.get(request.endpoint)
+        if not rules or request.method == 'OPTIONS':
+            return None
+        taken = []
+        for index, (capacity, rate, kind) in enumerate(rules):
+            value = self._key_value(kind)
+            if value is None:
+                continue
+            key = f'{request.endpoint}:{index}:{value}'
+            try:
+                wait = self.backend.consume(key, capacity, rate)
+                if wait:
+                    # A refused request costs nothing: one locked-out email must not
+                    # drain the per-IP bucket shared by everyone behind that address
+                    for taken_key, taken_capacity in taken:
+                        self.backend.refund(taken_key, taken_capacity)
+            except Exception as e:
+                # A broken shared store must not take the API down with it
+                logger.warning('Rate limit backend error, allowing request: %s', e)
+                return None
+            if wait:
+                logger.warning('Rate limit exceeded on %s by %s key', request.endpoint, kind)
+                return jsonify({'message': 'Too many requests. Please try again later.'}), 429, {
+                    'Retry-After': str(math.ceil(wait))
+                }
+            taken.append((key, capacity))
+        return None
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,63 @@
+import random
+from functools import wraps
+from flask import g, request, current_app, has_request_context
+from flask_sqlalchemy.session import Session
+
+STICKY_COOKIE = 'read_primary'
+
+class RoutingSession(Session):
+    """Sends plain SELECTs from ``@read_only`` views to a replica; everything else to the primary.
+
+    The replica is picked once per request, so all of a view's reads see the
+    same snapshot even when replicas lag by different amounts. Once a request
+    writes, or while the client's read-your-writes cookie is set, its reads
+    stay on the primary as well.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or getattr(clause, 'is_dml', False):
+                g.db_wrote = True
+            elif self._use_replica(clause):
+                replicas = current_app.config['SQLALCHEMY_REPLICA_KEYS']
+                if replicas:
+                    if 'db_replica' not in g:
+                        g.db_replica = random.choice(replicas)
+                    return self._db.engines[g.db_replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _use_replica(self, clause):
+        return (
+            g.get('db_read_only')
+            and not g.get('db_wrote')
+            and not g.get('db_sticky')
+            and getattr(clause, 'is_select', False)
+            # SELECT ... FOR UPDATE must lock rows on the primary
+            and getattr(clause, '_for_update_arg', None) is None
+        )
+
+def read_only(fn):
+    """Allow this view's queries to be served by a read replica."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        g.db_read_only = True
+        return fn(*args, **kwargs)
+    return wrapper
+
+def init_replicas(app):
+    replicas = [key for key in app.config.get('SQLALCHEMY_BINDS', {}) if key.startswith('replica_')]
+    app.config['SQLALCHEMY_REPLICA_KEYS'] = replicas
+    if not replicas:
+        return
+    sticky_seconds = app.config['REPLICA_STICKY_SECONDS']
+
+    @app.before_request
+    def load_read_primary():
+        g.db_sticky = STICKY_COOKIE in request.cookies
+
+    @app.after_request
+    def set_read_primary(response):
+        # Keep this client on the primary until its writes have replicated
+        if g.get('db_wrote') and sticky_seconds > 0:
+            response.set_cookie(STICKY_COOKIE, '1', max_age=sticky_seconds, httponly=True, samesite='Lax')
+        return response
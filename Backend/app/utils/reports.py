@@ -0,0 +1,184 @@
+from collections import defaultdict
+from datetime import timedelta
+from sqlalchemy import event, func, select
+from ..extensions import db
+from ..models.booking import Booking
+from ..models.booking_stat import DailyBookingStat
+from ..models.room import Room
+from .availability import stay_nights
+
+GROUPINGS = ('day', 'week', 'month')
+
+def stat_deltas(room_type, start_date, end_date, amount, sign=1):
+    """Rollup increments for one stay; revenue is spread evenly over its nights."""
+    nights = stay_nights(start_date, end_date)
+    if not nights:
+        return []
+    nightly = float(amount) / len(nights)
+    return [{
+        'day': night,
+        'room_type': room_type,
+        'nights_sold': sign,
+        'revenue': sign * nightly,
+        'check_ins': sign if night == nights[0] else 0
+    } for night in nights]
+
+def apply_deltas(connection, rows):
+    """Add ``rows`` onto the rollup with a single upsert where the dialect has one."""
+    if not rows:
+        return
+    table = DailyBookingStat.__table__
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(index_elements=['day', 'room_type'], set_={
+            'nights_sold': table.c.nights_sold + stmt.excluded.nights_sold,
+            'revenue': table.c.revenue + stmt.excluded.revenue,
+            'check_ins': table.c.check_ins + stmt.excluded.check_ins
+        })
+        connection.execute(stmt)
+    elif dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_duplicate_key_update(
+            nights_sold=table.c.nights_sold + stmt.inserted.nights_sold,
+            revenue=table.c.revenue + stmt.inserted.revenue,
+            check_ins=table.c.check_ins + stmt.inserted.check_ins
+        )
+        connection.execute(stmt)
+    else:
+        for row in rows:
+            updated = connection.execute(table.update().where(
+                table.c.day == row['day'], table.c.room_type == row['room_type']
+            ).values(
+                nights_sold=table.c.nights_sold + row['nights_sold'],
+                revenue=table.c.revenue + row['revenue'],
+                check_ins=table.c.check_ins + row['check_ins']
+            ))
+            if not updated.rowcount:
+                connection.execute(table.insert().values(**row))
+
+def _room_type(connection, room_id):
+    return connection.execute(select(Room.room_type).where(Room.id == room_id)).scalar()
+
+# The booking keeps the room type it was sold as, so a cancellation takes its
+# nights back out of the same rollup rows even if the room was retyped since
+@event.listens_for(Booking, 'before_insert')
+def stamp_room_type(mapper, connection, target):
+    if target.room_type is None:
+        target.room_type = _room_type(connection, target.room_id)
+
+# Booking writes update the rollup inside the same transaction, so a rolled
+# back booking never shows up in reports
+@event.listens_for(Booking, 'after_insert')
+def record_booking(mapper, connection, target):
+    apply_deltas(connection, stat_deltas(
+        target.room_type, target.start_date, target.end_date, target.amount
+    ))
+
+@event.listens_for(Booking, 'after_delete')
+def unrecord_booking(mapper, connection, target):
+    apply_deltas(connection, stat_deltas(
+        target.room_type or _room_type(connection, target.room_id),
+        target.start_date, target.end_date, target.amount, sign=-1
+    ))
+
+def rebuild_booking_stats(batch_size=1000):
+    """Recompute the whole rollup from ``bookings``; returns the number of rollup rows written."""
+    totals = defaultdict(lambda: [0, 0.0, 0])
+    rows = db.session.query(
+        Booking.start_date, Booking.end_date, Booking.amount, func.coalesce(Booking.room_type, Room.room_type)
+    ).join(Room, Room.id == Booking.room_id)
+    for start_date, end_date, amount, room_type in rows.yield_per(batch_size):
+        for delta in stat_deltas(room_type, start_date, end_date, amount):
+            total = totals[(delta['day'], room_type)]
+            total[0] += delta['nights_sold']
+            total[1] += delta['revenue']
+            total[2] += delta['check_ins']
+
+    DailyBookingStat.query.delete(synchronize_session=False)
+    db.session.bulk_insert_mappings(DailyBookingStat, [{
+        'day': day,
+        'room_type': room_type,
+        'nights_sold': nights_sold,
+        'revenue': revenue,
+        'check_ins': check_ins
+    } for (day, room_type), (nights_sold, revenue, check_ins) in totals.items()])
+    return len(totals)
+
+def period_start(day, group_by):
+    if group_by == 'week':
+        return day - timedelta(days=day.weekday())
+    if group_by == 'month':
+        return day.replace(day=1)
+    return day
+
+def _stat_rows(start_date, end_date, room_type):
+    query = db.session.query(
+        DailyBookingStat.day,
+        DailyBookingStat.room_type,
+        DailyBookingStat.nights_sold,
+        DailyBookingStat.revenue,
+        DailyBookingStat.check_ins
+    ).filter(DailyBookingStat.day >= start_date, DailyBookingStat.day < end_date)
+    if room_type:
+        query = query.filter(DailyBookingStat.room_type == room_type)
+    return query.all()
+
+def _bucket(rows, group_by):
+    buckets = defaultdict(lambda: [0, 0.0, 0])
+    for row in rows:
+        bucket = buckets[(period_start(row.day, group_by), row.room_type)]
+        bucket[0] += row.nights_sold
+        bucket[1] += row.revenue
+        bucket[2] += row.check_ins
+    return buckets
+
+def occupancy_report(start_date, end_date, group_by='day', room_type=None):
+    """Sold nights against sellable room-nights per period and room type.
+
+    Capacity uses the rooms currently marked available.
+    """
+    room_counts = dict(db.session.query(Room.room_type, func.count(Room.id)).filter(
+        Room.availability.is_(True)
+    ).group_by(Room.room_type).all())
+    if room_type:
+        room_counts = {room_type: room_counts.get(room_type, 0)}
+
+    # Days of each period that fall inside the requested range
+    period_days = defaultdict(int)
+    day = start_date
+    while day < end_date:
+        period_days[period_start(day, group_by)] += 1
+        day += timedelta(days=1)
+
+    buckets = _bucket(_stat_rows(start_date, end_date, room_type), group_by)
+    report = []
+    for period, days in sorted(period_days.items()):
+        for kind in sorted(set(room_counts) | {kind for p, kind in buckets if p == period}):
+            nights_sold = buckets[(period, kind)][0] if (period, kind) in buckets else 0
+            capacity = room_counts.get(kind, 0) * days
+            report.append({
+                'period': period.isoformat(),
+                'room_type': kind,
+                'nights_sold': nights_sold,
+                'capacity': capacity,
+                'occupancy': round(nights_sold / capacity, 4) if capacity else None
+            })
+    return report
+
+def revenue_report(start_date, end_date, group_by='day', room_type=None):
+    """Accrued revenue per period and room type, with average daily rate."""
+    buckets = _bucket(_stat_rows(start_date, end_date, room_type), group_by)
+    return [{
+        'period': period.isoformat(),
+        'room_type': kind,
+        'revenue': round(revenue, 2),
+        'nights_sold': nights_sold,
+        'check_ins': check_ins,
+        'average_daily_rate': round(revenue / nights_sold, 2) if nights_sold else None
+    } for (period, kind), (nights_sold, revenue, check_ins) in sorted(buckets.items())]
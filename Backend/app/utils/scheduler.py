@@ -0,0 +1,61 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class Scheduler:
+    """Runs registered maintenance jobs at fixed intervals on one daemon thread per process.
+
+    The thread starts on the first request a process serves, so prefork
+    workers each get their own and the master process stays idle. A job
+    registered with an interval of 0 or less is disabled.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.jobs = []
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.jobs = []
+        app.extensions['scheduler'] = self
+
+        @app.before_request
+        def start_scheduler():
+            self.ensure_started()
+
+    def add_job(self, name, interval, fn):
+        if interval <= 0:
+            return
+        self.jobs.append({'name': name, 'interval': interval, 'fn': fn, 'next_run': 0.0})
+
+    def ensure_started(self):
+        if self._pid == os.getpid() or not self.jobs:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(target=self._run, name='scheduler', daemon=True).start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            now = time.monotonic()
+            for job in self.jobs:
+                if job['next_run'] > now:
+                    continue
+                try:
+                    with self.app.app_context():
+                        job['fn']()
+                except Exception:
+                    logger.exception('Scheduled job %s failed', job['name'])
+                job['next_run'] = time.monotonic() + job['interval']
+            time.sleep(max(0.5, min(job['next_run'] for job in self.jobs) - time.monotonic()))
+
+scheduler = Scheduler()
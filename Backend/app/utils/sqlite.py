@@ -0,0 +1,84 @@
+import logging
+import sqlite3
+import threading
+from sqlalchemy import event
+from ..extensions import db
+
+logger = logging.getLogger(__name__)
+
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+class WriterLock:
+    """Lets one connection per process write at a time; the rest queue here.
+
+    pysqlite only opens a transaction at the first write, so taking the lock
+    just before that statement means a waiting writer never holds a stale
+    read snapshot. Other processes are covered by ``busy_timeout``.
+
+    A thread that writes on a second connection while its first still holds
+    the lock could only wait for itself, so that fails at once instead.
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._owner = None
+
+    def acquire(self, info):
+        if info.get('sqlite_writer'):
+            return
+        if self._owner == threading.get_ident():
+            raise sqlite3.OperationalError(
+                'database is locked (this thread already has a write transaction open on another connection)'
+            )
+        if not self._lock.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError('database is locked (timed out waiting for the writer lock)')
+        self._owner = threading.get_ident()
+        info['sqlite_writer'] = True
+
+    def release(self, info):
+        if info.pop('sqlite_writer', False):
+            self._owner = None
+            self._lock.release()
+
+def init_sqlite(app):
+    """Opt-in tuning for SQLite deployments: per-connection pragmas plus the writer lock."""
+    config = app.config
+    if not config['SQLITE_TUNING'] or not config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        return
+    with app.app_context():
+        engine = db.engine
+    pragmas = (
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f'PRAGMA busy_timeout={int(config["SQLITE_BUSY_TIMEOUT"])}',
+        f'PRAGMA mmap_size={int(config["SQLITE_MMAP_SIZE"])}',
+        f'PRAGMA cache_size={int(config["SQLITE_CACHE_SIZE"])}'
+    )
+    writer = WriterLock(config['SQLITE_WRITE_LOCK_TIMEOUT'])
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def take_writer_lock(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip()[:7].upper().startswith(WRITE_PREFIXES):
+            writer.acquire(conn.info)
+
+    # Released as the commit is issued; busy_timeout absorbs the brief overlap
+    @event.listens_for(engine, 'commit')
+    @event.listens_for(engine, 'rollback')
+    def release_writer_lock(conn):
+        writer.release(conn.info)
+
+    # Connections returned to the pool or discarded mid-transaction
+    @event.listens_for(engine, 'reset')
+    @event.listens_for(engine, 'invalidate')
+    def release_on_reset(dbapi_connection, connection_record, *args):
+        writer.release(connection_record.info)
+
+    logger.info('SQLite tuning enabled (WAL, single writer per process)')
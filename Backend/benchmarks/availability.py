@@ -0,0 +1,60 @@
+"""GET /api/rooms/available latency as booking history grows.
+
+    python -m benchmarks.availability --bookings 1000,10000,100000 --rooms 20
+
+The search is an anti-join on room_nights over the requested nights, so its
+cost should follow the rooms and nights searched, not the size of history.
+Keep bookings / rooms * 3 above ~90 at the smallest size so every run sees
+the same occupancy over the next month, and so the same result sizes.
+Exits non-zero if the median at the largest size is more than --max-growth
+times the median at the smallest.
+"""
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from .common import bench_app, parse_sizes, print_table, seed_bookings, seed_rooms, seed_user, summarize, time_calls
+
+def search_ranges(count, seed=1):
+    rng = random.Random(seed)
+    today = datetime.now().date()
+    ranges = []
+    for _ in range(count):
+        start = today + timedelta(days=rng.randint(1, 30))
+        ranges.append((start.isoformat(), (start + timedelta(days=rng.randint(1, 4))).isoformat()))
+    return ranges
+
+def run(bookings, rooms, searches):
+    app = bench_app()
+    user_id, _ = seed_user(app)
+    seed_bookings(app, user_id, seed_rooms(app, rooms), bookings)
+    client = app.test_client()
+    ranges = iter(search_ranges(searches * 2))
+
+    def search():
+        start, end = next(ranges)
+        response = client.get('/api/rooms/available', query_string={'start': start, 'end': end})
+        assert response.status_code == 200, response.status_code
+
+    time_calls(search, searches // 10)  # warm up caches and the connection pool
+    return dict({'bookings': bookings, 'rooms': rooms}, **summarize(time_calls(search, searches)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bookings', type=parse_sizes, default=[1000, 10000, 100000])
+    parser.add_argument('--rooms', type=int, default=20)
+    parser.add_argument('--searches', type=int, default=500)
+    parser.add_argument('--max-growth', type=float, default=3.0)
+    args = parser.parse_args()
+
+    rows = [run(size, args.rooms, args.searches) for size in args.bookings]
+    print_table(rows)
+    growth = rows[-1]['p50_ms'] / rows[0]['p50_ms']
+    print(f'median growth {rows[0]["bookings"]} -> {rows[-1]["bookings"]} bookings: {growth:.2f}x')
+    if growth > args.max_growth:
+        print(f'FAIL: more than {args.max_growth}x', file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
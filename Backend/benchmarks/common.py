@@ -0,0 +1,163 @@
+"""Helpers shared by the benchmark scripts.
+
+Each benchmark builds its own app on a throwaway SQLite file, seeds it with
+Core executemany inserts (no ORM events, so seeding stays fast) and prints a
+table. Run them from Backend/, e.g. ``python -m benchmarks.availability``.
+"""
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import islice
+from sqlalchemy import insert
+from app import create_app
+from app.extensions import db
+from app.models.booking import Booking
+from app.models.room import Room
+from app.models.room_night import RoomNight
+from app.models.user import User
+from app.utils.principal import create_token
+
+BENCH_CONFIG = {
+    'SECRET_KEY': 'benchmark-secret-key-that-is-long-enough-for-hs256',
+    'JWT_SECRET_KEY': 'benchmark-jwt-secret-key-that-is-long-enough-for-hs256',
+    'AUTO_CREATE_TABLES': False,
+    'PRINCIPAL_CACHE_TTL': 0,
+    'RATE_LIMIT_ENABLED': False,
+    'MAIL_OUTBOX_WORKERS': 0,
+    'MAIL_SUPPRESS_SEND': True,
+    'ROOM_HOLD_SWEEP_INTERVAL': 0,
+    'OTP_PURGE_INTERVAL': 0,
+    'MAIL_OUTBOX_PURGE_INTERVAL': 0,
+    'IDEMPOTENCY_PURGE_INTERVAL': 0,
+    'METRICS_DIR': '',
+    'LOG_LEVEL': 'WARNING'
+}
+ROOM_TYPES = ('Single', 'Double', 'Twin', 'Queen', 'King', 'Suites')
+CHUNK = 10000
+
+def bench_app(**overrides):
+    """An app on a new SQLite file in a temporary directory, with every table created."""
+    directory = tempfile.mkdtemp(prefix='hotel-bench-')
+    config = dict(BENCH_CONFIG)
+    config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(directory, "hotel.db")}'
+    config['LOG_FILE'] = os.path.join(directory, 'app.log')
+    config.update(overrides)
+    app = create_app(config)
+    with app.app_context():
+        db.create_all(bind_key=None)
+    return app
+
+def insert_rows(table, rows):
+    """Insert an iterable of row dicts CHUNK at a time, so large seeds never sit in memory at once."""
+    rows = iter(rows)
+    while chunk := list(islice(rows, CHUNK)):
+        db.session.execute(insert(table), chunk)
+    db.session.commit()
+
+def seed_user(app, email='bench@example.com', password='secret123', is_admin=False):
+    """One verified user; returns (user_id, auth headers)."""
+    with app.app_context():
+        user = User(first_name='Bench', last_name='User', email=email, password=password,
+                    is_verified=True, is_admin=is_admin)
+        db.session.add(user)
+        db.session.commit()
+        return user.id, {'Authorization': f'Bearer {create_token(user)}'}
+
+def seed_rooms(app, count):
+    with app.app_context():
+        insert_rows(Room.__table__, [{
+            'id': i,
+            'name': f'Room {i}',
+            'price': 1000.0 + i % 50 * 100,
+            'room_type': ROOM_TYPES[i % len(ROOM_TYPES)],
+            'is_ac': i % 2 == 0,
+            'has_parking': i % 3 == 0,
+            'availability': True,
+            'created_at': datetime.utcnow()
+        } for i in range(1, count + 1)])
+    return list(range(1, count + 1))
+
+def seed_bookings(app, user_id, room_ids, count, nights=2, future_days=60, with_nights=True):
+    """``count`` back-to-back two-night stays spread over the rooms, ending ``future_days`` from today.
+
+    History grows into the past, so searches over the coming weeks always see
+    the same number of nearby stays however large ``count`` is.
+    """
+    per_room = -(-count // len(room_ids))
+    first_day = datetime.combine(datetime.now().date(), datetime.min.time()) \
+        + timedelta(days=future_days - per_room * (nights + 1))
+
+    def stays():
+        for i in range(count):
+            room_id = room_ids[i % len(room_ids)]
+            yield i + 1, room_id, first_day + timedelta(days=(i // len(room_ids)) * (nights + 1))
+
+    bookings = ({
+        'id': booking_id,
+        'user_id': user_id,
+        'room_id': room_id,
+        'room_type': ROOM_TYPES[room_id % len(ROOM_TYPES)],
+        'start_date': start,
+        'end_date': start + timedelta(days=nights),
+        'guest_name': 'Bench Guest',
+        'government_id': 'ABC123456',
+        'phone_number': '9999999999',
+        'amount': 2000.0,
+        'payment_id': f'pay_{booking_id}',
+        'created_at': start - timedelta(days=7)
+    } for booking_id, room_id, start in stays())
+    room_nights = ({
+        'room_id': room_id, 'night_date': (start + timedelta(days=n)).date(), 'booking_id': booking_id
+    } for booking_id, room_id, start in stays() for n in range(nights))
+    with app.app_context():
+        insert_rows(Booking.__table__, bookings)
+        if with_nights:
+            insert_rows(RoomNight.__table__, room_nights)
+
+def time_calls(fn, repeat):
+    """Latency of ``repeat`` sequential calls, in seconds."""
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+def run_concurrently(fn, threads, calls):
+    """Run ``fn(i)`` ``calls`` times over ``threads`` threads; returns (latencies, wall seconds)."""
+    def timed(i):
+        started = time.perf_counter()
+        fn(i)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        latencies = list(pool.map(timed, range(calls)))
+    return latencies, time.perf_counter() - started
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def summarize(latencies, wall=None):
+    """p50/p99 in milliseconds and throughput per second."""
+    return {
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'per_s': round(len(latencies) / (wall if wall is not None else sum(latencies)), 1)
+    }
+
+def print_table(rows):
+    """Print a list of dicts as an aligned table."""
+    if not rows:
+        return
+    headers = list(rows[0])
+    widths = [max(len(str(h)), *(len(str(row[h])) for row in rows)) for h in headers]
+    print('  '.join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(str(row[h]).rjust(w) for h, w in zip(headers, widths)))
+
+def parse_sizes(value):
+    return [int(size) for size in value.split(',')]
@@ -0,0 +1,73 @@
+"""CORS preflight throughput: the WSGI middleware against routing the preflight into Flask.
+
+    python -m benchmarks.cors_preflight --requests 20000
+
+Calls the WSGI stack directly (no test client, no sockets) with a browser's
+preflight for POST /api/bookings. 'middleware' is the app as served;
+'flask' hands the same request to the Flask app beneath the middleware, which
+is what every preflight paid for before, routing and request hooks included.
+Exits non-zero if the middleware's answer is missing its CORS headers or is
+not at least --min-speedup times the Flask rate.
+"""
+import argparse
+import sys
+from werkzeug.test import EnvironBuilder
+from app.utils.cors import CorsMiddleware
+from .common import bench_app, print_table, summarize, time_calls
+
+ORIGIN = 'http://localhost:5173'
+
+def find_cors(wsgi_app):
+    while not isinstance(wsgi_app, CorsMiddleware):
+        wsgi_app = getattr(wsgi_app, 'app', None) or wsgi_app.wsgi_app
+    return wsgi_app
+
+def preflight_environ():
+    return EnvironBuilder(path='/api/bookings', method='OPTIONS', headers={
+        'Origin': ORIGIN,
+        'Access-Control-Request-Method': 'POST',
+        'Access-Control-Request-Headers': 'authorization,content-type,idempotency-key'
+    }).get_environ()
+
+def call(wsgi_app, environ):
+    """One request; returns (status, headers) after consuming the body."""
+    answer = {}
+
+    def start_response(status, headers, exc_info=None):
+        answer['status'], answer['headers'] = status, dict(headers)
+
+    body = wsgi_app(dict(environ), start_response)
+    for _ in body:
+        pass
+    if hasattr(body, 'close'):
+        body.close()
+    return answer['status'], answer['headers']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--min-speedup', type=float, default=5.0)
+    args = parser.parse_args()
+
+    app = bench_app(CORS_ORIGINS=[ORIGIN])
+    environ = preflight_environ()
+    status, headers = call(app.wsgi_app, environ)
+    if not status.startswith('204') or headers.get('Access-Control-Allow-Origin') != ORIGIN \
+            or 'POST' not in headers.get('Access-Control-Allow-Methods', ''):
+        print(f'FAIL: unexpected preflight answer {status} {headers}', file=sys.stderr)
+        return 1
+
+    rows = []
+    for path, wsgi_app in (('middleware', app.wsgi_app), ('flask', find_cors(app.wsgi_app).wsgi_app)):
+        time_calls(lambda: call(wsgi_app, environ), args.requests // 10)
+        rows.append(dict({'path': path}, **summarize(time_calls(lambda: call(wsgi_app, environ), args.requests))))
+    print_table(rows)
+    speedup = rows[0]['per_s'] / rows[1]['per_s']
+    print(f'middleware answers preflights {speedup:.1f}x faster')
+    if speedup < args.min_speedup:
+        print(f'FAIL: under {args.min_speedup}x', file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Cold import cost of the app package, from ``python -X importtime``.
+
+    python -m benchmarks.import_time --budget 1.5 --top 15
+
+Imports ``app`` in a fresh interpreter --runs times and keeps the fastest
+run, so one slow disk read does not fail the check. Prints the heaviest
+modules of that run by cumulative time. Exits non-zero if the import takes
+longer than --budget seconds, or if a module that should load on first use
+(LAZY_MODULES) is imported up front.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Clients built on first use; importing them at startup would slow every worker boot
+LAZY_MODULES = ('razorpay', 'redis')
+IMPORT_BUDGET = 1.5
+
+def profile_import(module='app'):
+    """{module name: (self seconds, cumulative seconds)} for one cold ``import module``."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BACKEND, capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(own) / 1e6, int(cumulative) / 1e6)
+    return modules
+
+def eager_lazy_modules(modules):
+    return sorted(name for name in modules if name.split('.')[0] in LAZY_MODULES)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget', type=float, default=IMPORT_BUDGET)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    modules = min((profile_import() for _ in range(args.runs)), key=lambda run: run['app'][1])
+    heaviest = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)[:args.top]
+    print(f'{"cumulative_ms":>13}  {"self_ms":>8}  module')
+    for name, (own, cumulative) in heaviest:
+        print(f'{cumulative * 1000:13.1f}  {own * 1000:8.1f}  {name}')
+
+    total = modules['app'][1]
+    print(f'import app: {total:.3f}s (budget {args.budget}s)')
+    failed = False
+    if total > args.budget:
+        print('FAIL: import over budget', file=sys.stderr)
+        failed = True
+    eager = eager_lazy_modules(modules)
+    if eager:
+        print(f'FAIL: imported at startup: {", ".join(eager)}', file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Throughput of the gunicorn deployment across worker and thread counts.
+
+    python -m benchmarks.load_test --configs 1x1,1x4,2x4,4x2 --clients 16 --duration 10
+
+For each ``<workers>x<threads>`` configuration, starts ``gunicorn -c
+gunicorn.conf.py wsgi:app`` on a free local port against one seeded SQLite
+database (SQLITE_TUNING on), waits for it to answer, and runs --clients
+keep-alive clients for --duration seconds over a read-heavy mix: the room
+catalog, an availability search and /api/auth/me. Server output goes to
+gunicorn.log next to the database. Needs gunicorn installed. Exits non-zero
+if any request fails, or if the best configuration stays under --min-rps.
+"""
+import argparse
+import importlib.util
+import itertools
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import requests
+from .common import (BENCH_CONFIG, bench_app, percentile, print_table, seed_bookings, seed_rooms,
+                     seed_user)
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def server_env(database_uri, directory, port, workers, threads, worker_class):
+    return dict(
+        os.environ,
+        DATABASE_URL=database_uri,
+        LOG_FILE=os.path.join(directory, 'app-{pid}.log'),
+        LOG_LEVEL='WARNING',
+        SECRET_KEY=BENCH_CONFIG['SECRET_KEY'],
+        JWT_SECRET_KEY=BENCH_CONFIG['JWT_SECRET_KEY'],
+        SQLITE_TUNING='True',
+        RATE_LIMIT_ENABLED='False',
+        GUNICORN_BIND=f'127.0.0.1:{port}',
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_THREADS=str(threads),
+        GUNICORN_WORKER_CLASS=worker_class,
+        GUNICORN_MAX_REQUESTS='0'
+    )
+
+def wait_until_up(base_url, server, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with {server.returncode}')
+        try:
+            if requests.get(f'{base_url}/api/rooms', timeout=1).ok:
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError('gunicorn did not come up')
+
+def drive(base_url, headers, clients, duration):
+    """Run the request mix; returns (latencies, errors, wall seconds)."""
+    start = (datetime.now().date() + timedelta(days=7)).isoformat()
+    end = (datetime.now().date() + timedelta(days=9)).isoformat()
+    mix = [
+        ('/api/rooms', {}),
+        (f'/api/rooms/available?start={start}&end={end}', {}),
+        ('/api/auth/me', headers)
+    ]
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        latencies, errors = [], 0
+        with requests.Session() as session:
+            for path, request_headers in itertools.islice(itertools.cycle(mix), offset, None):
+                if time.monotonic() >= deadline:
+                    break
+                started = time.perf_counter()
+                try:
+                    ok = session.get(base_url + path, headers=request_headers, timeout=10).ok
+                except requests.RequestException:
+                    ok = False
+                latencies.append(time.perf_counter() - started)
+                errors += not ok
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        results = list(pool.map(client, range(clients)))
+    wall = time.perf_counter() - started
+    return [latency for latencies, _ in results for latency in latencies], sum(e for _, e in results), wall
+
+def run(config, app, headers, args):
+    workers, _, threads = config.partition('x')
+    directory = os.path.dirname(app.config['LOG_FILE'])
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    env = server_env(app.config['SQLALCHEMY_DATABASE_URI'], directory, port, int(workers), int(threads or 1),
+                     args.worker_class)
+    with open(os.path.join(directory, 'gunicorn.log'), 'a') as log:
+        server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                                  cwd=BACKEND, env=env, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            wait_until_up(base_url, server)
+            drive(base_url, headers, args.clients, min(2, args.duration))  # warm every worker
+            latencies, errors, wall = drive(base_url, headers, args.clients, args.duration)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+    return {
+        'config': config,
+        'class': args.worker_class,
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'rps': round(len(latencies) / wall, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--configs', default='1x1,1x4,2x4,4x2', help='comma-separated <workers>x<threads>')
+    parser.add_argument('--worker-class', default='gthread')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--rooms', type=int, default=50)
+    parser.add_argument('--bookings', type=int, default=5000)
+    parser.add_argument('--min-rps', type=float, default=0)
+    args = parser.parse_args()
+
+    if importlib.util.find_spec('gunicorn') is None:
+        print('gunicorn is not installed (pip install gunicorn)', file=sys.stderr)
+        return 2
+
+    app = bench_app(SQLITE_TUNING=True)
+    user_id, headers = seed_user(app)
+    seed_bookings(app, user_id, seed_rooms(app, args.rooms), args.bookings)
+
+    rows = [run(config.strip(), app, headers, args) for config in args.configs.split(',')]
+    print_table(rows)
+    if any(row['errors'] for row in rows):
+        print('FAIL: some requests failed', file=sys.stderr)
+        return 1
+    if max(row['rps'] for row in rows) < args.min_rps:
+        print(f'FAIL: no configuration reached {args.min_rps} requests/s', file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Logging cost on the calling thread at INFO vs. DEBUG, against a synchronous file handler.
+
+    python -m benchmarks.logging_throughput --records 50000
+
+Each run logs the same mix of debug and info records with request-style
+arguments. 'caller_us' is what a request thread pays per record; 'drain_s'
+is how long the listener thread needs to get everything onto disk. The
+'sync' row writes with a plain FileHandler and the same JSON formatter, the
+way every record used to be written. Also times GET /api/rooms at both
+levels. Exits non-zero if queued DEBUG logging costs the caller as much as
+writing synchronously does (the listener shares the GIL, so the queued cost
+is lower but not zero).
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from app.utils.log import JsonFormatter, RequestContextFilter
+from .common import bench_app, print_table, seed_rooms, summarize, time_calls
+
+PAYLOAD = {'room_id': 12, 'start_date': '2026-11-01', 'end_date': '2026-11-03', 'guest_name': 'Bench Guest'}
+
+def log_mix(logger, records):
+    for i in range(records // 2):
+        logger.debug('Booking request %s: %s', i, PAYLOAD)
+        logger.info('Booking created: booking_id=%s, room_id=%s', i, PAYLOAD['room_id'])
+
+def wait_for_lines(path, expected, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                if sum(1 for _ in f) >= expected:
+                    return
+        time.sleep(0.01)
+    raise TimeoutError(f'{path} did not reach {expected} lines')
+
+def run_queued(level, records):
+    app = bench_app(LOG_LEVEL=level, LOG_MAX_BYTES=1 << 30)
+    logger = logging.getLogger('app.benchmark')
+    path = app.config['LOG_FILE'].replace('{pid}', str(os.getpid()))
+    logger.info('warm up')  # start the listener thread
+    wait_for_lines(path, 1)
+
+    started = time.perf_counter()
+    log_mix(logger, records)
+    caller = time.perf_counter() - started
+    expected = 1 + (records if level == 'DEBUG' else records // 2)
+    wait_for_lines(path, expected)
+    drained = time.perf_counter() - started
+
+    seed_rooms(app, 50)
+    client = app.test_client()
+    requests = summarize(time_calls(lambda: client.get('/api/rooms'), 500))
+    return {
+        'handler': 'queued', 'level': level, 'records': records,
+        'caller_us': round(caller / records * 1e6, 2), 'drain_s': round(drained, 3),
+        'rooms_p50_ms': requests['p50_ms'], 'rooms_p99_ms': requests['p99_ms']
+    }
+
+def run_sync(records):
+    app = bench_app()
+    logger = logging.getLogger('app.benchmark.sync')
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    handler = logging.FileHandler(app.config['LOG_FILE'] + '.sync')
+    handler.setFormatter(JsonFormatter())
+    handler.addFilter(RequestContextFilter())
+    logger.handlers = [handler]
+
+    started = time.perf_counter()
+    log_mix(logger, records)
+    caller = time.perf_counter() - started
+    handler.close()
+    return {
+        'handler': 'sync', 'level': 'DEBUG', 'records': records,
+        'caller_us': round(caller / records * 1e6, 2), 'drain_s': round(caller, 3),
+        'rooms_p50_ms': '-', 'rooms_p99_ms': '-'
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=50000)
+    args = parser.parse_args()
+
+    rows = [run_sync(args.records), run_queued('INFO', args.records), run_queued('DEBUG', args.records)]
+    print_table(rows)
+    if rows[-1]['caller_us'] >= rows[0]['caller_us']:
+        print('FAIL: queued DEBUG logging costs the caller as much as a synchronous handler', file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Concurrent /api/auth/login mixed with /api/rooms reads, hashing inline vs. on the pool.
+
+    python -m benchmarks.login_mix --requests 400 --threads 16 --login-share 0.25
+
+Logins use the production-strength KDF (--method) so each one costs real CPU.
+With PASSWORD_HASH_WORKERS=0 the KDF runs on the request thread; with the
+pool it runs in worker processes and overflow is answered with 503. Exits
+non-zero if the pooled run's room-read p99 exceeds --max-rooms-p99 ms.
+"""
+import argparse
+import sys
+import time
+from .common import bench_app, print_table, run_concurrently, seed_rooms, seed_user, summarize
+
+def run(workers, method, requests, threads, login_share):
+    app = bench_app(PASSWORD_HASH_METHOD=method, PASSWORD_HASH_WORKERS=workers, SQLITE_TUNING=True)
+    seed_rooms(app, 50)
+    seed_user(app)
+    client = app.test_client()
+    every = max(1, round(1 / login_share))
+    timings = {'login': [], 'rooms': []}
+    busy = []
+
+    def call(i):
+        if i % every == 0:
+            response = client.post('/api/auth/login', json={'email': 'bench@example.com', 'password': 'secret123'})
+            if response.status_code == 503:
+                busy.append(i)
+            else:
+                assert response.status_code == 200, response.status_code
+        else:
+            assert client.get('/api/rooms').status_code == 200
+
+    def timed_call(i):
+        started = time.perf_counter()
+        call(i)
+        timings['login' if i % every == 0 else 'rooms'].append(time.perf_counter() - started)
+
+    client.post('/api/auth/login', json={'email': 'bench@example.com', 'password': 'secret123'})  # start the pool
+    _, wall = run_concurrently(timed_call, threads, requests)
+    rows = []
+    for kind, latencies in timings.items():
+        rows.append(dict({'hash_workers': workers, 'kind': kind, 'calls': len(latencies),
+                          'busy_503': len(busy) if kind == 'login' else 0}, **summarize(latencies, wall)))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--method', default='pbkdf2:sha256:600000')
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--login-share', type=float, default=0.25)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--max-rooms-p99', type=float, default=250.0)
+    args = parser.parse_args()
+
+    rows = run(0, args.method, args.requests, args.threads, args.login_share)
+    rows += run(args.workers, args.method, args.requests, args.threads, args.login_share)
+    print_table(rows)
+    pooled_rooms = rows[-1]
+    if pooled_rooms['p99_ms'] > args.max_rooms_p99:
+        print(f'FAIL: room reads p99 {pooled_rooms["p99_ms"]} ms > {args.max_rooms_p99} ms', file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
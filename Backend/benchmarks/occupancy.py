@@ -0,0 +1,94 @@
+"""room_nights point lookups against the booking overlap scans they replaced.
+
+    python -m benchmarks.occupancy --bookings 10000,1000000 --rooms 100
+
+Times both questions availability asks, straight against the database:
+"is room X free for these nights" (nights_taken against an overlap EXISTS on
+bookings) and "which rooms are free on date D" (an anti-join on room_nights
+against one on bookings). The bookings table gets back the (room_id,
+start_date, end_date) index the overlap queries used, so they run at their
+best. Exits non-zero if a room_nights lookup at the largest size is slower
+than the overlap query, or more than --max-growth times its own median at
+the smallest size.
+"""
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import and_, exists, select, text
+from app.extensions import db
+from app.models.booking import Booking
+from app.models.room import Room
+from app.models.room_night import RoomNight
+from app.utils.availability import nights_taken
+from .common import bench_app, parse_sizes, print_table, seed_bookings, seed_rooms, seed_user, summarize, time_calls
+
+def booking_overlaps(room_id, start, end):
+    return db.session.query(exists().where(
+        Booking.room_id == room_id, Booking.start_date < end, Booking.end_date > start
+    )).scalar()
+
+def free_rooms_by_nights(day):
+    return db.session.execute(select(Room.id).where(~exists().where(
+        RoomNight.room_id == Room.id, RoomNight.night_date == day.date()
+    ))).all()
+
+def free_rooms_by_overlap(day):
+    return db.session.execute(select(Room.id).where(~exists().where(and_(
+        Booking.room_id == Room.id, Booking.start_date < day + timedelta(days=1), Booking.end_date > day
+    )))).all()
+
+def run(bookings, rooms, lookups):
+    app = bench_app()
+    user_id, _ = seed_user(app)
+    room_ids = seed_rooms(app, rooms)
+    seed_bookings(app, user_id, room_ids, bookings)
+    rng = random.Random(1)
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    stays = []
+    for _ in range(lookups):
+        start = today + timedelta(days=rng.randint(1, 30))
+        stays.append((rng.choice(room_ids), start, start + timedelta(days=rng.randint(1, 4))))
+
+    rows = []
+    with app.app_context():
+        db.session.execute(text('CREATE INDEX ix_bench_bookings_overlap ON bookings (room_id, start_date, end_date)'))
+        db.session.commit()
+        for query, check in (
+            ('stay/nights', lambda stay: nights_taken(*stay)),
+            ('stay/overlap', lambda stay: booking_overlaps(*stay)),
+            ('day/nights', lambda stay: free_rooms_by_nights(stay[1])),
+            ('day/overlap', lambda stay: free_rooms_by_overlap(stay[1]))
+        ):
+            calls = iter(stays * 2)
+            time_calls(lambda: check(next(calls)), lookups // 10)  # warm the page cache
+            rows.append(dict({'bookings': bookings, 'query': query},
+                             **summarize(time_calls(lambda: check(next(calls)), lookups))))
+        db.session.remove()
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bookings', type=parse_sizes, default=[10000, 1000000])
+    parser.add_argument('--rooms', type=int, default=100)
+    parser.add_argument('--lookups', type=int, default=500)
+    parser.add_argument('--max-growth', type=float, default=3.0)
+    args = parser.parse_args()
+
+    rows = [row for size in args.bookings for row in run(size, args.rooms, args.lookups)]
+    print_table(rows)
+    median = {(row['bookings'], row['query']): row['p50_ms'] for row in rows}
+    smallest, largest = args.bookings[0], args.bookings[-1]
+    failed = False
+    for question in ('stay', 'day'):
+        nights, overlap = median[largest, f'{question}/nights'], median[largest, f'{question}/overlap']
+        growth = nights / median[smallest, f'{question}/nights']
+        print(f'{question}: room_nights {nights}ms vs overlap {overlap}ms at {largest} bookings, '
+              f'{growth:.2f}x growth from {smallest}')
+        if nights > overlap or growth > args.max_growth:
+            print(f'FAIL: {question} lookup regressed', file=sys.stderr)
+            failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""POST /api/auth/verify-otp throughput as the otps table grows.
+
+    python -m benchmarks.otp_verify --history 1000,200000 --requests 1000 --threads 4
+
+Seeds --history past codes spread over other addresses, then sends
+--requests verifications for fresh sign-ups from --threads threads: one wrong
+guess (a committed attempt) and then the right code per account. The newest
+code is found on the (email, created_at) index, so throughput should not
+depend on history. Exits non-zero if it falls below 1 / --max-slowdown of the
+smallest size, or if any account is left unverified.
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models.user import User
+from app.utils.otp import Otp, PURPOSE_VERIFY
+from .common import bench_app, insert_rows, parse_sizes, print_table, run_concurrently, summarize
+
+def seed(app, history, accounts):
+    now = datetime.utcnow()
+    with app.app_context():
+        insert_rows(Otp.__table__, ({
+            'email': f'past{i % 5000}@example.com',
+            'purpose': PURPOSE_VERIFY,
+            'otp': f'{i % 10 ** 6:06d}',
+            'attempts': 0,
+            'ip': '198.51.100.1',
+            'used': True,
+            'created_at': now - timedelta(seconds=i)
+        } for i in range(history)))
+        insert_rows(User.__table__, ({
+            'first_name': 'Bench', 'last_name': 'Guest', 'email': f'guest{i}@example.com',
+            'password': 'unused', 'is_verified': False, 'is_google_user': False, 'is_admin': False
+        } for i in range(accounts)))
+        insert_rows(Otp.__table__, ({
+            'email': f'guest{i}@example.com', 'purpose': PURPOSE_VERIFY, 'otp': f'{i:06d}',
+            'attempts': 0, 'ip': '203.0.113.1', 'used': False, 'created_at': now
+        } for i in range(accounts)))
+
+def run(history, requests, threads):
+    app = bench_app(SQLITE_TUNING=True)
+    accounts = requests // 2
+    seed(app, history, accounts)
+    client = app.test_client()
+
+    def verify(i):
+        account, guess = divmod(i, 2)
+        code = f'{account:06d}' if guess else f'{(account + 1) % 10 ** 6:06d}'
+        response = client.post('/api/auth/verify-otp', json={'email': f'guest{account}@example.com', 'otp': code})
+        assert response.status_code == (200 if guess else 400), response.get_data(as_text=True)
+
+    # Each worker takes an account's wrong and right guess in order, so pairs never race
+    latencies, wall = run_concurrently(lambda i: (verify(2 * i), verify(2 * i + 1)), threads, accounts)
+    with app.app_context():
+        unverified = User.query.filter_by(is_verified=False).count()
+    return dict({'history': history, 'unverified': unverified}, **summarize(latencies, wall))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--history', type=parse_sizes, default=[1000, 200000])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--max-slowdown', type=float, default=2.0)
+    args = parser.parse_args()
+
+    rows = [run(size, args.requests, args.threads) for size in args.history]
+    for row in rows:
+        # Latencies and rates above are per account, i.e. per pair of requests
+        row['verify_per_s'] = round(row.pop('per_s') * 2, 1)
+    print_table(rows)
+    if any(row['unverified'] for row in rows):
+        print('FAIL: some accounts were not verified', file=sys.stderr)
+        return 1
+    if rows[-1]['verify_per_s'] * args.max_slowdown < rows[0]['verify_per_s']:
+        print(f'FAIL: verify throughput fell more than {args.max_slowdown}x with history', file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Admin room onboarding: one POST /api/rooms per room against the bulk endpoints.
+
+    python -m benchmarks.room_import --rooms 10000 --single 500
+
+Imports --rooms rooms through POST /api/rooms/bulk as a JSON array and again
+as a CSV upload, reprices them all with PATCH /api/rooms/bulk, and times
+--single rooms created one request at a time for the per-room baseline.
+Exits non-zero if a bulk import is not at least --min-speedup times the
+single-room rate, or if any row is rejected.
+"""
+import argparse
+import csv
+import io
+import sys
+import time
+from .common import ROOM_TYPES, bench_app, print_table, seed_user
+
+def rooms(count, prefix):
+    return [{
+        'name': f'{prefix} {i}',
+        'description': 'Benchmark room',
+        'price': 1000.0 + i % 50 * 100,
+        'room_type': ROOM_TYPES[i % len(ROOM_TYPES)],
+        'is_ac': i % 2 == 0,
+        'has_parking': i % 3 == 0
+    } for i in range(count)]
+
+def as_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+def timed(label, count, send):
+    started = time.perf_counter()
+    send()
+    elapsed = time.perf_counter() - started
+    return {'import': label, 'rooms': count, 'seconds': round(elapsed, 3), 'rooms_per_s': round(count / elapsed, 1)}
+
+def expect(response, key, count):
+    body = response.get_json()
+    assert response.status_code == 200 and body[key] == count and not body.get('failed'), \
+        (response.status_code, body.get(key), body.get('failed', [])[:3])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rooms', type=int, default=10000)
+    parser.add_argument('--single', type=int, default=500)
+    parser.add_argument('--min-speedup', type=float, default=10.0)
+    args = parser.parse_args()
+
+    app = bench_app()
+    _, headers = seed_user(app, is_admin=True)
+    client = app.test_client()
+
+    def single():
+        for row in rooms(args.single, 'Single'):
+            assert client.post('/api/rooms', headers=headers, json=row).status_code == 201
+
+    def bulk_json():
+        expect(client.post('/api/rooms/bulk', headers=headers, json=rooms(args.rooms, 'Json')), 'created', args.rooms)
+
+    def bulk_csv():
+        upload = (io.BytesIO(as_csv(rooms(args.rooms, 'Csv')).encode()), 'rooms.csv')
+        expect(client.post('/api/rooms/bulk', headers=headers, data={'file': upload}), 'created', args.rooms)
+
+    def bulk_reprice():
+        # Ids 1..single are the one-at-a-time rooms; reprice the JSON import after them
+        ids = range(args.single + 1, args.single + args.rooms + 1)
+        expect(client.patch('/api/rooms/bulk', headers=headers, json=[{'id': i, 'price': 1500.0} for i in ids]),
+               'updated', args.rooms)
+
+    rows = [
+        timed('single POST', args.single, single),
+        timed('bulk JSON', args.rooms, bulk_json),
+        timed('bulk CSV', args.rooms, bulk_csv),
+        timed('bulk PATCH', args.rooms, bulk_reprice)
+    ]
+    print_table(rows)
+    baseline = rows[0]['rooms_per_s']
+    slow = [row['import'] for row in rows[1:] if row['rooms_per_s'] < baseline * args.min_speedup]
+    if slow:
+        print(f'FAIL: {", ".join(slow)} under {args.min_speedup}x the single-room rate', file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
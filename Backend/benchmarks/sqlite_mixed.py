@@ -0,0 +1,74 @@
+"""Mixed read/write traffic on SQLite, default settings against the SQLITE_TUNING profile.
+
+    python -m benchmarks.sqlite_mixed --requests 2000 --threads 8 --writes 0.2
+
+Each mode gets its own seeded database and --threads concurrent clients.
+--writes of the requests are writes, split between bookings (each on nights
+of its own) and admin room updates; the rest are room reads and availability
+searches. 'failed' counts 5xx answers, which is how 'database is locked'
+reaches clients. Exits non-zero if the tuned profile fails any request.
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+from .common import bench_app, print_table, run_concurrently, seed_bookings, seed_rooms, seed_user, summarize
+
+def run(tuned, requests, threads, writes, rooms):
+    app = bench_app(SQLITE_TUNING=tuned)
+    user_id, user = seed_user(app)
+    _, admin = seed_user(app, email='admin@example.com', is_admin=True)
+    room_ids = seed_rooms(app, rooms)
+    seed_bookings(app, user_id, room_ids, rooms * 10, future_days=0)
+    client = app.test_client()
+    today = datetime.now().date()
+    every = max(1, round(1 / writes)) if writes else 0
+    failed = []
+
+    def book(i):
+        # Stays never overlap: each booking takes the next free slot of its room
+        start = today + timedelta(days=1 + 3 * (i // rooms))
+        return client.post('/api/bookings', headers=user, json={
+            'room_id': room_ids[i % rooms],
+            'start_date': start.isoformat(),
+            'end_date': (start + timedelta(days=2)).isoformat(),
+            'guest_name': 'Bench Guest',
+            'government_id': 'ABC123456',
+            'phone_number': '9999999999',
+            'amount': 2000,
+            'payment_id': f'pay_mixed_{i}'
+        })
+
+    def request(i):
+        if every and i % every == 0:
+            response = book(i // every) if i // every % 2 == 0 else client.put(
+                f'/api/rooms/{room_ids[i % rooms]}', headers=admin, json={'price': 1000 + i % 500})
+        elif i % 2:
+            response = client.get(f'/api/rooms/{room_ids[i % rooms]}')
+        else:
+            start = today + timedelta(days=1 + i % 30)
+            response = client.get('/api/rooms/available', query_string={
+                'start': start.isoformat(), 'end': (start + timedelta(days=2)).isoformat()
+            })
+        if response.status_code >= 500:
+            failed.append(response.status_code)
+
+    latencies, wall = run_concurrently(request, threads, requests)
+    return dict({'mode': 'tuned' if tuned else 'default', 'failed': len(failed)}, **summarize(latencies, wall))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--writes', type=float, default=0.2)
+    parser.add_argument('--rooms', type=int, default=20)
+    args = parser.parse_args()
+
+    rows = [run(tuned, args.requests, args.threads, args.writes, args.rooms) for tuned in (False, True)]
+    print_table(rows)
+    if rows[1]['failed']:
+        print('FAIL: requests failed with SQLITE_TUNING on', file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
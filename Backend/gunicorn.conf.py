@@ -0,0 +1,41 @@
+# gunicorn -c gunicorn.conf.py wsgi:app
+# Every setting comes from app.config.Config, so the environment drives both the app and the server.
+# Send SIGHUP to the master for a graceful reload.
+import multiprocessing
+from app.config import Config
+from app.utils.metrics import metrics, registry
+
+bind = Config.GUNICORN_BIND
+workers = Config.GUNICORN_WORKERS or multiprocessing.cpu_count() * 2 + 1
+worker_class = Config.GUNICORN_WORKER_CLASS
+threads = Config.GUNICORN_THREADS
+keepalive = Config.GUNICORN_KEEPALIVE
+timeout = Config.GUNICORN_TIMEOUT
+graceful_timeout = Config.GUNICORN_GRACEFUL_TIMEOUT
+# Recycle workers periodically; jitter keeps them from restarting together
+max_requests = Config.GUNICORN_MAX_REQUESTS
+max_requests_jitter = Config.GUNICORN_MAX_REQUESTS_JITTER
+
+# Each worker builds its own app, DB pool and background threads after the fork
+preload_app = False
+accesslog = '-'
+
+# Metrics snapshots (METRICS_DIR): fold each dead worker's file into the retired totals,
+# so a new worker that reuses the pid starts a fresh file. Per-process caches are flagged at start.
+def on_starting(server):
+    if Config.METRICS_DIR:
+        registry.retire_stale_snapshots(Config.METRICS_DIR)
+    if workers > 1 and Config.ROOM_CACHE_BACKEND == 'memory':
+        server.log.warning(
+            'ROOM_CACHE_BACKEND=memory with %s workers: room edits reach other workers only after '
+            'ROOM_CACHE_TTL (%ss); set ROOM_CACHE_BACKEND=redis to share invalidations',
+            workers, Config.ROOM_CACHE_TTL
+        )
+
+def worker_exit(server, worker):
+    # Last flush from the worker itself, so counts since the previous flush are not lost
+    metrics.flush()
+
+def child_exit(server, worker):
+    if Config.METRICS_DIR:
+        registry.retire_snapshot(Config.METRICS_DIR, worker.pid)
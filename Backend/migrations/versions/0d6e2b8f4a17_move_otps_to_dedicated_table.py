@@ -0,0 +1,48 @@
+"""Move OTPs from users.otp to an expiring otps table
+
+Revision ID: 0d6e2b8f4a17
+Revises: f3a7c9d15b42
+Create Date: 2026-10-18 15:22:37.640918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0d6e2b8f4a17'
+down_revision = 'f3a7c9d15b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('otps',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('purpose', sa.String(length=20), nullable=False),
+        sa.Column('otp', sa.String(length=6), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('ip', sa.String(length=45), nullable=True),
+        sa.Column('used', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('otps', schema=None) as batch_op:
+        batch_op.create_index('ix_otps_email_created_at', ['email', 'created_at'], unique=False)
+        batch_op.create_index('ix_otps_ip_created_at', ['ip', 'created_at'], unique=False)
+
+    # Outstanding codes never expired before; users can request a new one
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('otp')
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('otp', sa.String(length=6), nullable=True))
+
+    with op.batch_alter_table('otps', schema=None) as batch_op:
+        batch_op.drop_index('ix_otps_ip_created_at')
+        batch_op.drop_index('ix_otps_email_created_at')
+
+    op.drop_table('otps')
@@ -0,0 +1,28 @@
+"""Add booking overlap and history indexes
+
+Revision ID: 3b9d2c7e41a6
+Revises: fe4bffbc1039
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9d2c7e41a6'
+down_revision = 'fe4bffbc1039'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.create_index('ix_bookings_room_id_start_date_end_date', ['room_id', 'start_date', 'end_date'], unique=False)
+        batch_op.create_index('ix_bookings_user_id_created_at', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_index('ix_bookings_user_id_created_at')
+        batch_op.drop_index('ix_bookings_room_id_start_date_end_date')
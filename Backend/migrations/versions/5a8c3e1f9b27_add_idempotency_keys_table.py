@@ -0,0 +1,34 @@
+"""Add idempotency_keys table shared by all workers
+
+Revision ID: 5a8c3e1f9b27
+Revises: 0d6e2b8f4a17
+Create Date: 2026-10-18 17:41:26.305518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a8c3e1f9b27'
+down_revision = '0d6e2b8f4a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('idempotency_keys',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('value', sa.LargeBinary(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key')
+    )
+    with op.batch_alter_table('idempotency_keys', schema=None) as batch_op:
+        batch_op.create_index('ix_idempotency_keys_expires_at', ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('idempotency_keys', schema=None) as batch_op:
+        batch_op.drop_index('ix_idempotency_keys_expires_at')
+
+    op.drop_table('idempotency_keys')
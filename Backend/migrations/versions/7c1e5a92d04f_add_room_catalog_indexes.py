@@ -0,0 +1,32 @@
+"""Add room catalog filter and sort indexes
+
+Revision ID: 7c1e5a92d04f
+Revises: 3b9d2c7e41a6
+Create Date: 2026-10-18 11:03:47.815230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e5a92d04f'
+down_revision = '3b9d2c7e41a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('rooms', schema=None) as batch_op:
+        batch_op.create_index('ix_rooms_room_type_price', ['room_type', 'price'], unique=False)
+        batch_op.create_index('ix_rooms_price_id', ['price', 'id'], unique=False)
+        batch_op.create_index('ix_rooms_name_id', ['name', 'id'], unique=False)
+        batch_op.create_index('ix_rooms_created_at_id', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('rooms', schema=None) as batch_op:
+        batch_op.drop_index('ix_rooms_created_at_id')
+        batch_op.drop_index('ix_rooms_name_id')
+        batch_op.drop_index('ix_rooms_price_id')
+        batch_op.drop_index('ix_rooms_room_type_price')
@@ -0,0 +1,40 @@
+"""Reopen rooms that the old booking flow marked unavailable
+
+Revision ID: 9e4f2a6c8d13
+Revises: 5a8c3e1f9b27
+Create Date: 2026-10-18 18:22:07.514093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4f2a6c8d13'
+down_revision = '5a8c3e1f9b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # book_room used to set availability = False on every booking, which
+    # blocked the room for all future dates. Night slots now decide whether a
+    # range is free, so any room with bookings goes back on sale.
+    rooms = sa.table('rooms',
+        sa.column('id', sa.Integer()),
+        sa.column('availability', sa.Boolean())
+    )
+    bookings = sa.table('bookings',
+        sa.column('room_id', sa.Integer())
+    )
+    op.execute(
+        rooms.update()
+        .where(rooms.c.id.in_(sa.select(bookings.c.room_id)))
+        .values(availability=True)
+    )
+
+
+def downgrade():
+    # Which rooms were closed by a booking and which by an admin is not
+    # recorded, so there is nothing to restore
+    pass
@@ -0,0 +1,40 @@
+"""Record the room type on each booking for the reports rollup
+
+Revision ID: b7d1e4a9c362
+Revises: 9e4f2a6c8d13
+Create Date: 2026-10-18 18:51:34.772610
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d1e4a9c362'
+down_revision = '9e4f2a6c8d13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('room_type', sa.String(length=50), nullable=True))
+
+    # Existing bookings take their room's current type, which is what the
+    # rollup was last built from
+    bookings = sa.table('bookings',
+        sa.column('room_id', sa.Integer()),
+        sa.column('room_type', sa.String())
+    )
+    rooms = sa.table('rooms',
+        sa.column('id', sa.Integer()),
+        sa.column('room_type', sa.String())
+    )
+    op.execute(bookings.update().values(
+        room_type=sa.select(rooms.c.room_type).where(rooms.c.id == bookings.c.room_id).scalar_subquery()
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_column('room_type')
@@ -0,0 +1,60 @@
+"""Add room_nights table for race-free bookings
+
+Revision ID: c52e9f1a7b38
+Revises: a4f08d3b6e21
+Create Date: 2026-10-18 13:20:41.903577
+
+"""
+from datetime import timedelta
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52e9f1a7b38'
+down_revision = 'a4f08d3b6e21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    room_nights = op.create_table('room_nights',
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('night_date', sa.Date(), nullable=False),
+        sa.Column('booking_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['booking_id'], ['bookings.id'], ),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ),
+        sa.PrimaryKeyConstraint('room_id', 'night_date')
+    )
+    with op.batch_alter_table('room_nights', schema=None) as batch_op:
+        batch_op.create_index('ix_room_nights_night_date', ['night_date'], unique=False)
+        batch_op.create_index('ix_room_nights_booking_id', ['booking_id'], unique=False)
+
+    # Backfill from existing bookings; if history already holds overlaps the
+    # earliest booking keeps the night
+    bookings = sa.table('bookings',
+        sa.column('id', sa.Integer()),
+        sa.column('room_id', sa.Integer()),
+        sa.column('start_date', sa.DateTime()),
+        sa.column('end_date', sa.DateTime())
+    )
+    connection = op.get_bind()
+    taken = set()
+    rows = []
+    for booking in connection.execute(sa.select(bookings).order_by(bookings.c.id)):
+        night = booking.start_date.date()
+        while night < booking.end_date.date():
+            if (booking.room_id, night) not in taken:
+                taken.add((booking.room_id, night))
+                rows.append({'room_id': booking.room_id, 'night_date': night, 'booking_id': booking.id})
+            night += timedelta(days=1)
+    if rows:
+        op.bulk_insert(room_nights, rows)
+
+
+def downgrade():
+    with op.batch_alter_table('room_nights', schema=None) as batch_op:
+        batch_op.drop_index('ix_room_nights_booking_id')
+        batch_op.drop_index('ix_room_nights_night_date')
+
+    op.drop_table('room_nights')
@@ -0,0 +1,29 @@
+"""Replace the booking overlap index with a plain room_id index
+
+Revision ID: d4a8f1c6e259
+Revises: b7d1e4a9c362
+Create Date: 2026-10-19 09:14:52.318406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8f1c6e259'
+down_revision = 'b7d1e4a9c362'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Overlap checks moved to room_nights, so the date columns only cost writes
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_index('ix_bookings_room_id_start_date_end_date')
+        batch_op.create_index('ix_bookings_room_id', ['room_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_index('ix_bookings_room_id')
+        batch_op.create_index('ix_bookings_room_id_start_date_end_date', ['room_id', 'start_date', 'end_date'], unique=False)
@@ -0,0 +1,53 @@
+"""Add room holds between order creation and payment
+
+Revision ID: e81d4b6c2f90
+Revises: c52e9f1a7b38
+Create Date: 2026-10-18 14:05:12.558301
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e81d4b6c2f90'
+down_revision = 'c52e9f1a7b38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('room_holds',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('start_date', sa.DateTime(), nullable=False),
+        sa.Column('end_date', sa.DateTime(), nullable=False),
+        sa.Column('order_id', sa.String(length=100), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('room_holds', schema=None) as batch_op:
+        batch_op.create_index('ix_room_holds_expires_at', ['expires_at'], unique=False)
+        batch_op.create_index('ix_room_holds_room_id_expires_at', ['room_id', 'expires_at'], unique=False)
+
+    with op.batch_alter_table('room_nights', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('hold_id', sa.Integer(), nullable=True))
+        batch_op.create_index('ix_room_nights_hold_id', ['hold_id'], unique=False)
+        batch_op.create_foreign_key('fk_room_nights_hold_id_room_holds', 'room_holds', ['hold_id'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('room_nights', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_room_nights_hold_id_room_holds', type_='foreignkey')
+        batch_op.drop_index('ix_room_nights_hold_id')
+        batch_op.drop_column('hold_id')
+
+    with op.batch_alter_table('room_holds', schema=None) as batch_op:
+        batch_op.drop_index('ix_room_holds_room_id_expires_at')
+        batch_op.drop_index('ix_room_holds_expires_at')
+
+    op.drop_table('room_holds')
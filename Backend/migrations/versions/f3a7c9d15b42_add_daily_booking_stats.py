@@ -0,0 +1,63 @@
+"""Add daily_booking_stats rollup for admin reports
+
+Revision ID: f3a7c9d15b42
+Revises: e81d4b6c2f90
+Create Date: 2026-10-18 14:48:09.231774
+
+"""
+from collections import defaultdict
+from datetime import timedelta
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a7c9d15b42'
+down_revision = 'e81d4b6c2f90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    daily_booking_stats = op.create_table('daily_booking_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('room_type', sa.String(length=50), nullable=False),
+        sa.Column('nights_sold', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.Column('check_ins', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'room_type')
+    )
+
+    # Backfill from existing bookings, spreading each stay's amount over its nights
+    bookings = sa.table('bookings',
+        sa.column('room_id', sa.Integer()),
+        sa.column('start_date', sa.DateTime()),
+        sa.column('end_date', sa.DateTime()),
+        sa.column('amount', sa.Float())
+    )
+    rooms = sa.table('rooms',
+        sa.column('id', sa.Integer()),
+        sa.column('room_type', sa.String())
+    )
+    connection = op.get_bind()
+    totals = defaultdict(lambda: [0, 0.0, 0])
+    query = sa.select(bookings.c.start_date, bookings.c.end_date, bookings.c.amount, rooms.c.room_type).select_from(
+        bookings.join(rooms, rooms.c.id == bookings.c.room_id)
+    )
+    for booking in connection.execute(query):
+        first, last = booking.start_date.date(), booking.end_date.date()
+        nights = (last - first).days
+        for i in range(nights):
+            total = totals[(first + timedelta(days=i), booking.room_type)]
+            total[0] += 1
+            total[1] += booking.amount / nights
+            total[2] += 1 if i == 0 else 0
+    if totals:
+        op.bulk_insert(daily_booking_stats, [
+            {'day': day, 'room_type': room_type, 'nights_sold': n, 'revenue': r, 'check_ins': c}
+            for (day, room_type), (n, r, c) in totals.items()
+        ])
+
+
+def downgrade():
+    op.drop_table('daily_booking_stats')
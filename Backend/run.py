@@ -1,13 +1,8 @@
-from app import create_app, db
-from app.models.user import User
+# Development server only; use wsgi.py with gunicorn in production
+import os
+from app import create_app
 app = create_app()
 
-with app.app_context():
-    user = User.query.filter_by(email='admintest@example.com').first()
-    if user:
-        user.is_admin = True
-        db.session.commit()
-
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=os.environ.get('FLASK_DEBUG', 'False') == 'True', host='0.0.0.0', port=5000)
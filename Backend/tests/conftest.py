@@ -0,0 +1,132 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db
+from app.models.booking import Booking
+from app.models.room import Room
+from app.models.user import User
+from app.utils.availability import reserve_nights
+from app.utils.principal import create_token
+
+TEST_CONFIG = {
+    'TESTING': True,
+    'SECRET_KEY': 'test-secret-key-that-is-long-enough-for-hs256',
+    'JWT_SECRET_KEY': 'test-jwt-secret-key-that-is-long-enough-for-hs256',
+    'AUTO_CREATE_TABLES': False,
+    'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+    'PASSWORD_HASH_WORKERS': 0,
+    'PRINCIPAL_CACHE_TTL': 0,
+    'RATE_LIMIT_ENABLED': False,
+    'MAIL_OUTBOX_WORKERS': 0,
+    'MAIL_SUPPRESS_SEND': True,
+    'ROOM_HOLD_SWEEP_INTERVAL': 0,
+    'OTP_PURGE_INTERVAL': 0,
+    'MAIL_OUTBOX_PURGE_INTERVAL': 0,
+    'IDEMPOTENCY_PURGE_INTERVAL': 0,
+    'METRICS_DIR': ''
+}
+
+@pytest.fixture
+def app_factory(tmp_path):
+    """Build apps on a throwaway SQLite file (files, not :memory:, so threads share the data)."""
+    apps = []
+
+    def build(**overrides):
+        config = dict(TEST_CONFIG)
+        config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmp_path / "hotel.db"}'
+        config['LOG_FILE'] = str(tmp_path / 'app.log')
+        config.update(overrides)
+        app = create_app(config)
+        with app.app_context():
+            # Primary only; replica binds get their data by copying the primary
+            db.create_all(bind_key=None)
+        apps.append(app)
+        return app
+
+    yield build
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+@pytest.fixture
+def app(app_factory):
+    return app_factory()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_user(app):
+    counter = iter(range(1, 10 ** 6))
+
+    def make(is_admin=False, **fields):
+        with app.app_context():
+            user = User(
+                first_name='Test',
+                last_name='Guest',
+                email=fields.pop('email', f'guest{next(counter)}@example.com'),
+                password=fields.pop('password', 'secret123'),
+                is_verified=True,
+                is_admin=is_admin,
+                **fields
+            )
+            db.session.add(user)
+            db.session.commit()
+            return user.id, {'Authorization': f'Bearer {create_token(user)}'}
+    return make
+
+@pytest.fixture
+def make_room(app):
+    def make(**fields):
+        with app.app_context():
+            room = Room(
+                name=fields.pop('name', 'Room'),
+                price=fields.pop('price', 100.0),
+                room_type=fields.pop('room_type', 'Single'),
+                **fields
+            )
+            db.session.add(room)
+            db.session.commit()
+            return room.id
+    return make
+
+@pytest.fixture
+def make_booking(app):
+    """Insert a booking and its night slots directly, bypassing payment."""
+    def make(user_id, room_id, start_date, nights=1, amount=100.0, created_at=None):
+        with app.app_context():
+            booking = Booking(
+                user_id=user_id,
+                room_id=room_id,
+                start_date=start_date,
+                end_date=start_date + timedelta(days=nights),
+                guest_name='Test Guest',
+                government_id='ABC123456',
+                phone_number='9999999999',
+                amount=amount,
+                payment_id='pay_test',
+                created_at=created_at or datetime.utcnow()
+            )
+            db.session.add(booking)
+            db.session.flush()
+            reserve_nights(room_id, booking.start_date, booking.end_date, booking.id)
+            db.session.commit()
+            return booking.id
+    return make
+
+@pytest.fixture
+def statements(app):
+    """SQL statements executed while the test runs, as (statement, parameters) pairs."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', record)
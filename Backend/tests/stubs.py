@@ -0,0 +1,152 @@
+"""Local stand-ins for the external services the app talks to."""
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class SmtpStub:
+    """A minimal SMTP server on localhost that records messages.
+
+    ``delay`` stalls the greeting of every connection (a slow relay), and
+    ``reject`` maps a recipient to the (code, text) reply for its RCPT.
+    """
+
+    def __init__(self, delay=0, reject=None):
+        self.delay = delay
+        self.reject = dict(reject or {})
+        self.messages = []
+        self.connections = 0
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode() + b'\r\n')
+
+            def handle(self):
+                stub.connections += 1
+                time.sleep(stub.delay)
+                self.reply('220 localhost SMTP stub')
+                sender, recipients = None, []
+                for raw in self.rfile:
+                    command = raw.decode().strip()
+                    verb = command[:4].upper()
+                    if verb in ('EHLO', 'HELO'):
+                        self.reply('250 localhost')
+                    elif verb == 'MAIL':
+                        sender, recipients = command[10:].strip('<>'), []
+                        self.reply('250 OK')
+                    elif verb == 'RCPT':
+                        recipient = command[8:].strip('<>')
+                        code, text = stub.reject.get(recipient, (250, 'OK'))
+                        if code == 250:
+                            recipients.append(recipient)
+                        self.reply(f'{code} {text}')
+                    elif verb == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        lines = []
+                        for line in self.rfile:
+                            if line in (b'.\r\n', b'.\n'):
+                                break
+                            lines.append(line)
+                        stub.messages.append((sender, recipients, b''.join(lines).decode()))
+                        self.reply('250 Queued')
+                    elif verb == 'RSET':
+                        sender, recipients = None, []
+                        self.reply('250 OK')
+                    elif verb == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('250 OK')
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.port = self.server.server_address[1]
+
+    def config(self):
+        """App config that points Flask-Mail at this server."""
+        return {
+            'MAIL_SERVER': '127.0.0.1',
+            'MAIL_PORT': self.port,
+            'MAIL_USE_TLS': False,
+            'MAIL_USE_SSL': False,
+            'MAIL_USERNAME': None,
+            'MAIL_PASSWORD': None,
+            'MAIL_SUPPRESS_SEND': False
+        }
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+class GatewayStub:
+    """A fake Razorpay order API on localhost.
+
+    ``mode`` picks the answer to the next calls: 'ok' creates an order,
+    'slow' answers after ``delay`` seconds, 'error' is a 500 and 'reject'
+    a 400 (a client error that says nothing about gateway health).
+    """
+
+    def __init__(self, mode='ok', delay=0):
+        self.mode = mode
+        self.delay = delay
+        self.calls = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def answer(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                data = json.loads(self.rfile.read(int(self.headers['Content-Length'])) or b'{}')
+                stub.calls += 1
+                mode = stub.mode
+                if mode == 'slow':
+                    time.sleep(stub.delay)
+                if mode == 'error':
+                    return self.answer(500, {'error': {'code': 'SERVER_ERROR', 'description': 'Gateway down'}})
+                if mode == 'reject':
+                    return self.answer(400, {'error': {'code': 'BAD_REQUEST_ERROR', 'description': 'Bad amount'}})
+                self.answer(200, {'id': f'order_stub{stub.calls}', 'amount': data['amount'], 'currency': data['currency']})
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def config(self, **overrides):
+        """App config that points the payment gateway at this server."""
+        return dict({
+            'RAZORPAY_KEY_ID': 'rzp_test_stub',
+            'RAZORPAY_KEY_SECRET': 'stub-secret',
+            'RAZORPAY_BASE_URL': self.url,
+            'RAZORPAY_CONNECT_TIMEOUT': 1,
+            'RAZORPAY_READ_TIMEOUT': 0.3,
+            'RAZORPAY_MAX_RETRIES': 2,
+            'RAZORPAY_RETRY_BACKOFF': 0,
+            'RAZORPAY_BREAKER_THRESHOLD': 2,
+            'RAZORPAY_BREAKER_RESET': 0.5
+        }, **overrides)
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,20 @@
+from app.utils.principal import PrincipalCache
+
+def test_principal_cache_is_bounded(app_factory):
+    app = app_factory(PRINCIPAL_CACHE_MAX_ENTRIES=3)
+    cache = PrincipalCache()
+    cache.init_app(app)
+    for user_id in range(10):
+        cache.set(user_id, f'principal {user_id}', ttl=60)
+    assert [cache.get(user_id) for user_id in range(10)] == [None] * 7 + ['principal 7', 'principal 8', 'principal 9']
+
+def test_profile_update_refreshes_me_on_this_worker(app_factory, make_user):
+    app = app_factory(PRINCIPAL_CACHE_TTL=60)
+    client = app.test_client()
+    _, headers = make_user()
+
+    assert client.get('/api/auth/me', headers=headers).get_json()['location'] == ''
+    assert client.put('/api/auth/update-profile', headers=headers, json={
+        'phone_number': '9876543210', 'location': 'Pune'
+    }).status_code == 200
+    assert client.get('/api/auth/me', headers=headers).get_json()['location'] == 'Pune'
@@ -0,0 +1,93 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import combinations
+from app.extensions import db
+from app.models.booking import Booking
+from app.models.room import Room
+from app.models.room_night import RoomNight
+
+def future(days):
+    return datetime.combine(datetime.now().date() + timedelta(days=days), datetime.min.time())
+
+def test_my_bookings_query_count_is_fixed(client, make_user, make_room, make_booking, statements):
+    counts = []
+    for bookings in (1, 40):
+        user_id, headers = make_user()
+        for i in range(bookings):
+            make_booking(user_id, make_room(name=f'Room {i}'), future(10 + i))
+
+        del statements[:]
+        response = client.get('/api/bookings/my-bookings', headers=headers)
+        assert response.status_code == 200
+        assert len(response.get_json()) == bookings
+        counts.append(sum(1 for statement, _ in statements if statement.lstrip().upper().startswith('SELECT')))
+
+    assert counts[0] == counts[1] == 1
+
+def test_my_bookings_pages_newest_first(client, make_user, make_room, make_booking):
+    user_id, headers = make_user()
+    room_id = make_room()
+    created = datetime.utcnow() - timedelta(days=30)
+    booking_ids = [
+        make_booking(user_id, room_id, future(2 * i + 1), created_at=created + timedelta(hours=i))
+        for i in range(55)
+    ]
+
+    everything = client.get('/api/bookings/my-bookings', headers=headers)
+    assert [b['id'] for b in everything.get_json()] == booking_ids[::-1]
+    assert 'X-Next-Cursor' not in everything.headers
+
+    seen = []
+    params = {'limit': 20}
+    while True:
+        page = client.get('/api/bookings/my-bookings', headers=headers, query_string=params)
+        assert page.status_code == 200
+        seen.extend(b['id'] for b in page.get_json())
+        if 'X-Next-Cursor' not in page.headers:
+            break
+        params['cursor'] = page.headers['X-Next-Cursor']
+    assert seen == booking_ids[::-1]
+
+def test_my_bookings_rejects_bad_paging(client, make_user):
+    _, headers = make_user()
+    assert client.get('/api/bookings/my-bookings?limit=0', headers=headers).status_code == 400
+    assert client.get('/api/bookings/my-bookings?cursor=abc', headers=headers).status_code == 400
+    assert client.get('/api/bookings/my-bookings?limit=5&cursor=!!', headers=headers).status_code == 400
+
+def test_concurrent_overlapping_bookings_never_double_book(app, client, make_user, make_room):
+    room_id = make_room()
+    users = [make_user() for _ in range(12)]
+    # Every range overlaps several others, so most requests must lose
+    ranges = [(future(3 + i % 4), future(5 + i % 4)) for i in range(len(users))]
+    barrier = threading.Barrier(len(users))
+
+    def book(i):
+        _, headers = users[i]
+        start, end = ranges[i]
+        barrier.wait()
+        return client.post('/api/bookings', headers=headers, json={
+            'room_id': room_id,
+            'start_date': start.strftime('%Y-%m-%d'),
+            'end_date': end.strftime('%Y-%m-%d'),
+            'guest_name': 'Test Guest',
+            'government_id': 'ABC123456',
+            'phone_number': '9999999999',
+            'amount': 200,
+            'payment_id': f'pay_{i}'
+        }).status_code
+
+    with ThreadPoolExecutor(len(users)) as pool:
+        statuses = list(pool.map(book, range(len(users))))
+
+    assert set(statuses) <= {201, 400}
+    assert statuses.count(201) >= 1
+    with app.app_context():
+        bookings = Booking.query.filter_by(room_id=room_id).all()
+        assert len(bookings) == statuses.count(201)
+        for first, second in combinations(bookings, 2):
+            assert first.end_date <= second.start_date or second.end_date <= first.start_date
+        nights = RoomNight.query.filter_by(room_id=room_id).all()
+        assert len(nights) == sum((booking.end_date - booking.start_date).days for booking in bookings)
+        assert {night.booking_id for night in nights} == {booking.id for booking in bookings}
+        assert db.session.get(Room, room_id).availability
@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+import tracemalloc
+from datetime import datetime
+from app.extensions import db
+from app.models.booking import Booking
+from app.models.room import Room
+from .test_bookings import future
+
+def add_bookings(app, user_id, room_id, count, **fields):
+    with app.app_context():
+        db.session.bulk_insert_mappings(Booking, [dict({
+            'user_id': user_id,
+            'room_id': room_id,
+            'start_date': future(1),
+            'end_date': future(2),
+            'guest_name': 'Test Guest',
+            'government_id': 'ABC123456',
+            'phone_number': '9999999999',
+            'amount': 100.0,
+            'payment_id': 'pay_export',
+            'created_at': datetime.utcnow()
+        }, **fields) for _ in range(count)])
+        db.session.commit()
+
+def test_csv_export_neutralises_formulas(app, client, make_user, make_room):
+    user_id, _ = make_user()
+    _, admin = make_user(is_admin=True)
+    add_bookings(app, user_id, make_room(), 1, guest_name='=HYPERLINK("http://evil.example","x")',
+                 phone_number='+919999999999', payment_id='@SUM(A1)')
+
+    response = client.get('/api/admin/bookings/export?format=csv', headers=admin)
+
+    row = next(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert row['guest_name'] == '\'=HYPERLINK("http://evil.example","x")'
+    assert row['phone_number'] == "'+919999999999"
+    assert row['payment_id'] == "'@SUM(A1)"
+    assert row['amount'] == '100.0'
+    # Only the spreadsheet format is escaped; NDJSON carries the raw value
+    ndjson = client.get('/api/admin/bookings/export?format=ndjson', headers=admin).get_data(as_text=True)
+    assert json.loads(ndjson.splitlines()[0])['phone_number'] == '+919999999999'
+
+def test_export_reports_the_room_type_at_booking_time(app, client, make_user, make_room):
+    user_id, _ = make_user()
+    _, admin = make_user(is_admin=True)
+    room_id = make_room(room_type='Single')
+    add_bookings(app, user_id, room_id, 1, room_type='Single')
+    add_bookings(app, user_id, room_id, 1, room_type=None)
+    with app.app_context():
+        db.session.get(Room, room_id).room_type = 'Suites'
+        db.session.commit()
+
+    response = client.get('/api/admin/bookings/export?format=csv', headers=admin)
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    # Retyping the room does not rewrite history; rows from before the column existed use the room's
+    assert [row['room_type'] for row in rows] == ['Single', 'Suites']
+
+def export_peak(app, client, headers, export_format):
+    """Peak Python memory while the export is requested and its body consumed chunk by chunk."""
+    tracemalloc.start()
+    try:
+        response = client.get(f'/api/admin/bookings/export?format={export_format}', headers=headers, buffered=False)
+        chunks = sum(1 for _ in response.response)
+        response.close()
+        return chunks, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_export_memory_does_not_grow_with_bookings(app, client, make_user, make_room):
+    user_id, _ = make_user()
+    _, admin = make_user(is_admin=True)
+    room_id = make_room()
+
+    for export_format in ('csv', 'ndjson'):
+        add_bookings(app, user_id, room_id, 2000)
+        small_chunks, small_peak = export_peak(app, client, admin, export_format)
+        add_bookings(app, user_id, room_id, 8000)
+        large_chunks, large_peak = export_peak(app, client, admin, export_format)
+        with app.app_context():
+            Booking.query.delete()
+            db.session.commit()
+
+        # Five times the rows, streamed in more chunks, with the same memory ceiling
+        assert large_chunks > small_chunks
+        assert large_peak < 2 * small_peak
@@ -0,0 +1,47 @@
+import time
+import pytest
+from app.utils.hashing import HashingBusy, PasswordHasher
+
+def test_timed_out_job_keeps_its_slot(app_factory):
+    # One worker, no queue, and a KDF slow enough to outlast the timeout
+    app = app_factory(
+        PASSWORD_HASH_WORKERS=1,
+        PASSWORD_HASH_MAX_PENDING=0,
+        PASSWORD_HASH_TIMEOUT=0.2,
+        PASSWORD_HASH_METHOD='pbkdf2:sha256:1000000'
+    )
+    hasher = PasswordHasher(app)
+    # Start the spawned worker before timing anything
+    hasher.timeout = 30
+    hasher.verify('pbkdf2:sha256:1000$salt$00', 'warm-up')
+    hasher.timeout = app.config['PASSWORD_HASH_TIMEOUT']
+
+    with pytest.raises(HashingBusy):
+        hasher.hash('secret123')
+    # The timed-out job is still running, so there is no free slot for another
+    with pytest.raises(HashingBusy):
+        hasher.verify('pbkdf2:sha256:1000$salt$00', 'secret123')
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            assert hasher.verify('pbkdf2:sha256:1000$salt$00', 'secret123') is False
+            break
+        except HashingBusy:
+            time.sleep(0.1)
+    else:
+        pytest.fail('hashing slot was never released')
+
+def test_busy_hasher_answers_503(app_factory, monkeypatch):
+    app = app_factory()
+    client = app.test_client()
+
+    def busy(self, fn, *args):
+        raise HashingBusy()
+    monkeypatch.setattr(PasswordHasher, '_run', busy)
+
+    response = client.post('/api/auth/signup', json={
+        'firstName': 'Busy', 'lastName': 'Guest', 'email': 'busy@example.com', 'password': 'secret123'
+    })
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(app.config['PASSWORD_HASH_RETRY_AFTER'])
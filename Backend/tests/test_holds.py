@@ -0,0 +1,94 @@
+import pytest
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models.booking import Booking
+from app.models.room_hold import RoomHold
+from app.models.room_night import RoomNight
+from app.utils.payments import payment_gateway
+from .test_bookings import future
+
+@pytest.fixture(autouse=True)
+def gateway(monkeypatch):
+    def create_order(data):
+        return {'id': 'order_test', 'amount': data['amount'], 'currency': data['currency']}
+    monkeypatch.setattr(payment_gateway, 'create_order', create_order)
+
+def stay(room_id, **fields):
+    return dict({
+        'room_id': room_id,
+        'start_date': future(3).strftime('%Y-%m-%d'),
+        'end_date': future(5).strftime('%Y-%m-%d')
+    }, **fields)
+
+def booking_for(room_id, hold_id):
+    return stay(room_id, guest_name='Test Guest', government_id='ABC123456', phone_number='9999999999',
+                amount=200, payment_id='pay_hold', hold_id=hold_id)
+
+def test_holding_a_room_requires_sign_in(app, client, make_room):
+    room_id = make_room()
+
+    response = client.post('/api/bookings/create-order', json=stay(room_id, amount=200))
+
+    assert response.status_code == 401
+    with app.app_context():
+        assert RoomHold.query.count() == 0
+    # Paying without holding anything stays open
+    assert client.post('/api/bookings/create-order', json={'amount': 200}).status_code == 200
+
+def test_only_the_holder_can_convert_a_hold(app, client, make_user, make_room):
+    owner_id, owner = make_user()
+    _, stranger = make_user()
+    room_id = make_room()
+
+    order = client.post('/api/bookings/create-order', headers=owner, json=stay(room_id, amount=200)).get_json()
+    with app.app_context():
+        assert db.session.get(RoomHold, order['hold_id']).user_id == owner_id
+
+    assert client.post('/api/bookings', headers=stranger, json=booking_for(room_id, order['hold_id'])).status_code == 400
+    assert client.post('/api/bookings', headers=owner, json=booking_for(room_id, order['hold_id'])).status_code == 201
+
+@pytest.mark.filterwarnings('error::sqlalchemy.exc.SAWarning')
+def test_expired_hold_is_booked_like_no_hold(app, client, make_user, make_room):
+    _, headers = make_user()
+    room_id = make_room()
+    order = client.post('/api/bookings/create-order', headers=headers, json=stay(room_id, amount=200)).get_json()
+    with app.app_context():
+        db.session.get(RoomHold, order['hold_id']).expires_at = datetime.utcnow() - timedelta(minutes=1)
+        db.session.commit()
+
+    response = client.post('/api/bookings', headers=headers, json=booking_for(room_id, order['hold_id']))
+
+    assert response.status_code == 201
+    with app.app_context():
+        booking_id = response.get_json()['booking_id']
+        assert RoomHold.query.count() == 0
+        nights = RoomNight.query.filter_by(room_id=room_id).all()
+        assert len(nights) == 2
+        assert {night.booking_id for night in nights} == {booking_id}
+        assert Booking.query.count() == 1
+
+def test_retried_checkout_replaces_the_callers_hold(app, client, make_user, make_room):
+    _, headers = make_user()
+    _, stranger = make_user()
+    room_id = make_room()
+
+    first = client.post('/api/bookings/create-order', headers=headers, json=stay(room_id, amount=200))
+    retry = client.post('/api/bookings/create-order', headers=headers, json=stay(room_id, amount=200))
+    # Overlapping dates rather than the same ones are replaced too
+    moved = client.post('/api/bookings/create-order', headers=headers,
+                        json=stay(room_id, amount=200, end_date=future(6).strftime('%Y-%m-%d')))
+
+    assert first.status_code == retry.status_code == moved.status_code == 200
+    hold_id = moved.get_json()['hold_id']
+    with app.app_context():
+        assert [hold.id for hold in RoomHold.query.all()] == [hold_id]
+        assert {night.hold_id for night in RoomNight.query.filter_by(room_id=room_id)} == {hold_id}
+        assert RoomNight.query.filter_by(room_id=room_id).count() == 3
+    # Someone else's hold still blocks the stay
+    assert client.post('/api/bookings/create-order', headers=stranger, json=stay(room_id, amount=200)).status_code == 400
+    assert client.post('/api/bookings', headers=headers, json=booking_for(room_id, retry.get_json()['hold_id'])).status_code == 400
+    response = client.post('/api/bookings', headers=headers, json=stay(
+        room_id, end_date=future(6).strftime('%Y-%m-%d'), guest_name='Test Guest', government_id='ABC123456',
+        phone_number='9999999999', amount=300, payment_id='pay_hold', hold_id=hold_id
+    ))
+    assert response.status_code == 201
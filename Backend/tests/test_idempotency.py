@@ -0,0 +1,106 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from app.extensions import db
+from app.models.booking import Booking
+from app.models.room_hold import RoomHold
+from app.utils.idempotency import DatabaseBackend, IdempotencyStore
+from app.utils.payments import payment_gateway
+from .test_bookings import future
+
+DUPLICATES = 8
+
+def fire(client, path, headers, body):
+    """Send the same request from DUPLICATES threads at once; returns the responses."""
+    barrier = threading.Barrier(DUPLICATES)
+
+    def send(_):
+        barrier.wait()
+        response = client.post(path, headers=headers, json=body)
+        return response.status_code, response.get_json(), response.headers.get('Idempotent-Replayed')
+
+    with ThreadPoolExecutor(DUPLICATES) as pool:
+        return list(pool.map(send, range(DUPLICATES)))
+
+def test_concurrent_duplicate_orders_create_one_gateway_order(client, monkeypatch):
+    calls = []
+
+    def create_order(data):
+        calls.append(data)
+        time.sleep(0.2)  # keep the first request in flight while the duplicates arrive
+        return {'id': f'order_{len(calls)}', 'amount': data['amount'], 'currency': data['currency']}
+    monkeypatch.setattr(payment_gateway, 'create_order', create_order)
+
+    responses = fire(client, '/api/bookings/create-order', {'Idempotency-Key': 'order-key-1'}, {'amount': 1500})
+
+    assert len(calls) == 1
+    assert {status for status, _, _ in responses} == {200}
+    assert {body['order_id'] for _, body, _ in responses} == {'order_1'}
+    assert sum(1 for _, _, replayed in responses if replayed) == DUPLICATES - 1
+
+def test_concurrent_duplicate_bookings_book_once(app, client, make_user, make_room):
+    _, headers = make_user()
+    room_id = make_room()
+    start = future(3)
+    body = {
+        'room_id': room_id,
+        'start_date': start.strftime('%Y-%m-%d'),
+        'end_date': future(5).strftime('%Y-%m-%d'),
+        'guest_name': 'Test Guest',
+        'government_id': 'ABC123456',
+        'phone_number': '9999999999',
+        'amount': 200,
+        'payment_id': 'pay_retry'
+    }
+
+    responses = fire(client, '/api/bookings', dict(headers, **{'Idempotency-Key': 'booking-key-1'}), body)
+
+    assert {status for status, _, _ in responses} == {201}
+    assert len({body['booking_id'] for _, body, _ in responses}) == 1
+    with app.app_context():
+        assert Booking.query.count() == 1
+
+def test_claims_are_shared_between_worker_stores(app):
+    # Two stores stand in for two worker processes with nothing in common but the database
+    first, second = IdempotencyStore(), IdempotencyStore()
+    first.backend, second.backend = DatabaseBackend(), DatabaseBackend()
+    with app.app_context():
+        assert first.claim('bookings.create_order:127.0.0.1:k', 'abc', ttl=60)
+        assert not second.claim('bookings.create_order:127.0.0.1:k', 'abc', ttl=60)
+        assert second.get('bookings.create_order:127.0.0.1:k')['state'] == 'pending'
+
+        # An expired claim can be taken over
+        assert first.claim('bookings.create_order:127.0.0.1:stale', 'abc', ttl=-1)
+        assert second.claim('bookings.create_order:127.0.0.1:stale', 'abc', ttl=60)
+        db.session.remove()
+
+def test_rejected_booking_with_key_is_stored_not_locked(app, client, make_user, make_room, make_booking):
+    user_id, headers = make_user()
+    room_id = make_room()
+    make_booking(user_id, room_id, future(3), nights=2)
+    with app.app_context():
+        # A lapsed hold gives the booking a sweep to write before it is rejected
+        db.session.add(RoomHold(room_id=room_id, start_date=future(9), end_date=future(10),
+                                expires_at=datetime.utcnow() - timedelta(minutes=1)))
+        db.session.commit()
+    body = {
+        'room_id': room_id,
+        'start_date': future(4).strftime('%Y-%m-%d'),
+        'end_date': future(6).strftime('%Y-%m-%d'),
+        'guest_name': 'Test Guest',
+        'government_id': 'ABC123456',
+        'phone_number': '9999999999',
+        'amount': 200,
+        'payment_id': 'pay_conflict'
+    }
+    headers = dict(headers, **{'Idempotency-Key': 'booking-conflict'})
+
+    first = client.post('/api/bookings', headers=headers, json=body)
+    retry = client.post('/api/bookings', headers=headers, json=body)
+
+    # The 4xx is final: it is stored and replayed rather than left pending
+    assert first.status_code == 400
+    assert retry.status_code == 400
+    assert retry.get_json() == first.get_json()
+    assert retry.headers['Idempotent-Replayed'] == 'true'
@@ -0,0 +1,17 @@
+import json
+import logging
+import os
+import time
+
+def test_each_process_logs_to_its_own_file(app_factory, tmp_path):
+    app_factory(LOG_FILE=str(tmp_path / 'app-{pid}.log'))
+    logging.getLogger('app.tests').info('booking created with otp=123456')
+
+    # Records are written by the listener thread; wait for it
+    path = tmp_path / f'app-{os.getpid()}.log'
+    deadline = time.monotonic() + 5
+    while not (path.exists() and path.read_text()) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    entry = json.loads(path.read_text().splitlines()[0])
+    assert entry['pid'] == os.getpid()
+    assert entry['message'] == 'booking created with otp=[REDACTED]'
@@ -0,0 +1,55 @@
+import json
+import os
+from app.utils.metrics import RETIRED_SNAPSHOT, Registry, snapshot_path
+
+def worker_registry(requests, latencies):
+    registry = Registry()
+    counter = registry.counter('jobs_total', 'Jobs.', ('status',))
+    histogram = registry.histogram('job_seconds', 'Job time.', buckets=(1.0,))
+    counter.inc(requests, status=200)
+    for latency in latencies:
+        histogram.observe(latency)
+    return registry
+
+def write_as(registry, directory, pid):
+    with open(snapshot_path(directory, pid), 'w') as f:
+        json.dump(registry.snapshot(), f)
+
+def test_dead_workers_are_folded_into_one_file(tmp_path):
+    directory = str(tmp_path)
+    scraper = worker_registry(0, [])
+    write_as(worker_registry(3, [0.5]), directory, 101)
+    write_as(worker_registry(4, [2.0]), directory, 102)
+    before = scraper.collect(directory)
+
+    assert scraper.retire_snapshot(directory, 101)
+    assert scraper.retire_snapshot(directory, 102)
+    assert not scraper.retire_snapshot(directory, 103)
+
+    assert sorted(os.listdir(directory)) == sorted([RETIRED_SNAPSHOT, f'metrics-{os.getpid()}.json'])
+    after = scraper.collect(directory)
+    assert after == before
+    assert after['jobs_total'] == {(200,): 7}
+    assert after['job_seconds'] == {(): ([1, 1], 2.5)}
+
+def test_a_reused_pid_adds_to_the_dead_workers_totals(tmp_path):
+    directory = str(tmp_path)
+    scraper = worker_registry(0, [])
+    write_as(worker_registry(5, []), directory, 101)
+
+    # Master reaps the worker, then a new worker gets the same pid
+    scraper.retire_snapshot(directory, 101)
+    write_as(worker_registry(2, []), directory, 101)
+
+    assert scraper.collect(directory)['jobs_total'] == {(200,): 7}
+
+def test_leftovers_from_a_previous_run_are_retired(tmp_path):
+    directory = str(tmp_path)
+    scraper = worker_registry(0, [])
+    write_as(worker_registry(1, []), directory, 101)
+    write_as(worker_registry(2, []), directory, 102)
+
+    scraper.retire_stale_snapshots(directory)
+
+    assert os.listdir(directory) == [RETIRED_SNAPSHOT]
+    assert scraper.collect(directory)['jobs_total'] == {(200,): 3}
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models.user import User
+from app.utils.otp import Otp, purge_expired_otps
+
+SIGNUP = {'firstName': 'Test', 'lastName': 'Guest', 'password': 'secret123'}
+
+def latest_code(app, email):
+    with app.app_context():
+        return Otp.query.filter_by(email=email).order_by(Otp.created_at.desc()).first().otp
+
+def wrong(code):
+    return f'{(int(code) + 1) % 10 ** 6:06d}'
+
+def is_verified(app, email):
+    with app.app_context():
+        return User.query.filter_by(email=email).first().is_verified
+
+def test_verification_code_is_single_use(app, client):
+    assert client.post('/api/auth/signup', json=dict(SIGNUP, email='new@example.com')).status_code == 201
+    code = latest_code(app, 'new@example.com')
+
+    assert client.post('/api/auth/verify-otp', json={'email': 'new@example.com', 'otp': code}).status_code == 200
+    assert is_verified(app, 'new@example.com')
+    assert client.post('/api/auth/verify-otp', json={'email': 'new@example.com', 'otp': code}).status_code == 400
+
+def test_expired_code_is_rejected(app, client):
+    client.post('/api/auth/signup', json=dict(SIGNUP, email='late@example.com'))
+    code = latest_code(app, 'late@example.com')
+    with app.app_context():
+        Otp.query.update({Otp.created_at: datetime.utcnow() - timedelta(seconds=app.config['OTP_TTL'] + 1)})
+        db.session.commit()
+
+    response = client.post('/api/auth/verify-otp', json={'email': 'late@example.com', 'otp': code})
+
+    assert response.status_code == 400
+    assert 'expired' in response.get_json()['message']
+    assert not is_verified(app, 'late@example.com')
+
+def test_code_locks_after_max_attempts(app_factory):
+    app = app_factory(OTP_MAX_ATTEMPTS=3)
+    client = app.test_client()
+    client.post('/api/auth/signup', json=dict(SIGNUP, email='guess@example.com'))
+    code = latest_code(app, 'guess@example.com')
+
+    for _ in range(3):
+        assert client.post('/api/auth/verify-otp', json={'email': 'guess@example.com', 'otp': wrong(code)}).status_code == 400
+    # Even the right code is refused once the attempts are spent
+    assert client.post('/api/auth/verify-otp', json={'email': 'guess@example.com', 'otp': code}).status_code == 429
+    assert not is_verified(app, 'guess@example.com')
+    with app.app_context():
+        assert Otp.query.one().attempts == 3
+
+def test_sends_are_throttled_per_email(app_factory, make_user):
+    app = app_factory(OTP_RESEND_INTERVAL=60, OTP_MAX_SENDS_PER_EMAIL=2)
+    client = app.test_client()
+    make_user(email='forgot@example.com')
+
+    assert client.post('/api/auth/forgot-password', json={'email': 'forgot@example.com'}).status_code == 200
+    too_soon = client.post('/api/auth/forgot-password', json={'email': 'forgot@example.com'})
+    assert too_soon.status_code == 429
+    assert 0 < int(too_soon.headers['Retry-After']) <= 60
+
+    with app.app_context():
+        Otp.query.update({Otp.created_at: datetime.utcnow() - timedelta(seconds=61)})
+        db.session.commit()
+    assert client.post('/api/auth/forgot-password', json={'email': 'forgot@example.com'}).status_code == 200
+    with app.app_context():
+        Otp.query.update({Otp.created_at: datetime.utcnow() - timedelta(seconds=61)})
+        db.session.commit()
+    over_limit = client.post('/api/auth/forgot-password', json={'email': 'forgot@example.com'})
+    assert over_limit.status_code == 429
+    assert over_limit.headers['Retry-After'] == str(app.config['OTP_SEND_WINDOW'])
+
+def test_sends_are_throttled_per_ip(app_factory, make_user):
+    app = app_factory(OTP_RESEND_INTERVAL=0, OTP_MAX_SENDS_PER_IP=2)
+    client = app.test_client()
+    for i in range(4):
+        make_user(email=f'user{i}@example.com')
+
+    def forgot(i, ip):
+        return client.post('/api/auth/forgot-password', json={'email': f'user{i}@example.com'},
+                           environ_base={'REMOTE_ADDR': ip}).status_code
+
+    assert [forgot(i, '203.0.113.7') for i in range(3)] == [200, 200, 429]
+    assert forgot(3, '198.51.100.2') == 200
+
+def test_purge_keeps_codes_inside_the_throttle_window(app):
+    now = datetime.utcnow()
+    window = max(app.config['OTP_TTL'], app.config['OTP_SEND_WINDOW'])
+    with app.app_context():
+        db.session.add_all([
+            Otp(email='old@example.com', purpose='verify', otp='123456', created_at=now - timedelta(seconds=window + 1)),
+            Otp(email='new@example.com', purpose='verify', otp='654321', created_at=now - timedelta(seconds=window - 60))
+        ])
+        db.session.commit()
+
+        assert purge_expired_otps() == 1
+        assert [otp.email for otp in Otp.query.all()] == ['new@example.com']
@@ -0,0 +1,121 @@
+import time
+from datetime import datetime, timedelta
+import pytest
+from app.extensions import db
+from app.models.outbox import OutboxEmail
+from app.utils.email import enqueue_email
+from app.utils.outbox import outbox, purge_old_emails
+from .stubs import SmtpStub
+
+@pytest.fixture
+def smtp():
+    with SmtpStub() as stub:
+        yield stub
+
+@pytest.fixture
+def mail_app(app_factory, smtp):
+    return app_factory(**smtp.config())
+
+def queue(app, *recipients):
+    with app.app_context():
+        for recipient in recipients:
+            enqueue_email('Your OTP', [recipient], 'Your OTP is 123456.')
+        db.session.commit()
+
+def entries(app):
+    with app.app_context():
+        return {entry.recipients: entry for entry in OutboxEmail.query.all()}
+
+def drain(app):
+    with app.app_context():
+        return outbox.drain_batch()
+
+def test_purge_keeps_recent_and_pending_mail(app):
+    old = datetime.utcnow() - timedelta(days=app.config['MAIL_OUTBOX_RETENTION_DAYS'] + 1)
+    with app.app_context():
+        for status, touched in [('sent', old), ('failed', old), ('pending', old), ('sent', datetime.utcnow())]:
+            db.session.add(OutboxEmail(
+                subject='Your OTP', recipients='guest@example.com', body='Your OTP is 123456.',
+                status=status, next_attempt_at=touched
+            ))
+        db.session.commit()
+
+        assert purge_old_emails() == 2
+        remaining = sorted((e.status, e.next_attempt_at == old) for e in OutboxEmail.query.all())
+        assert remaining == [('pending', True), ('sent', False)]
+
+def test_drain_sends_a_batch_over_one_connection(mail_app, smtp):
+    queue(mail_app, 'a@example.com', 'b@example.com', 'c@example.com')
+
+    assert drain(mail_app) == 3
+    assert drain(mail_app) == 0
+
+    assert smtp.connections == 1
+    assert sorted(recipients[0] for _, recipients, _ in smtp.messages) == ['a@example.com', 'b@example.com', 'c@example.com']
+    assert {entry.status for entry in entries(mail_app).values()} == {'sent'}
+
+def test_transient_failures_back_off_then_send(mail_app, smtp):
+    backoff = mail_app.config['MAIL_OUTBOX_RETRY_BACKOFF']
+    smtp.reject['busy@example.com'] = (451, 'Mailbox busy, try later')
+    queue(mail_app, 'busy@example.com', 'ok@example.com')
+
+    for attempt in (1, 2):
+        started = datetime.utcnow()
+        drain(mail_app)
+        busy = entries(mail_app)['busy@example.com']
+        assert (busy.status, busy.attempts) == ('pending', attempt)
+        # Exponential backoff: 1x, then 2x the base delay
+        delay = (busy.next_attempt_at - started).total_seconds()
+        assert backoff * 2 ** (attempt - 1) <= delay < backoff * 2 ** (attempt - 1) + 5
+        assert drain(mail_app) == 0  # not due yet
+        with mail_app.app_context():
+            db.session.get(OutboxEmail, busy.id).next_attempt_at = datetime.utcnow()
+            db.session.commit()
+
+    del smtp.reject['busy@example.com']
+    drain(mail_app)
+    assert entries(mail_app)['busy@example.com'].status == 'sent'
+    assert entries(mail_app)['ok@example.com'].attempts == 0
+
+def test_permanent_failures_are_not_retried(app_factory, smtp):
+    app = app_factory(MAIL_OUTBOX_RETRY_BACKOFF=0, MAIL_OUTBOX_MAX_ATTEMPTS=3, **smtp.config())
+    smtp.reject['nobody@example.com'] = (550, 'No such user')
+    smtp.reject['busy@example.com'] = (451, 'Try later')
+    queue(app, 'nobody@example.com', 'busy@example.com')
+
+    drain(app)
+    assert (entries(app)['nobody@example.com'].status, entries(app)['nobody@example.com'].attempts) == ('failed', 1)
+    # A transient failure gives up only after MAIL_OUTBOX_MAX_ATTEMPTS
+    for _ in range(2):
+        assert entries(app)['busy@example.com'].status == 'pending'
+        drain(app)
+    busy = entries(app)['busy@example.com']
+    assert (busy.status, busy.attempts) == ('failed', 3)
+    assert '451' in busy.last_error
+
+def test_unreachable_server_keeps_mail_queued(app_factory):
+    app = app_factory(MAIL_SERVER='127.0.0.1', MAIL_PORT=1, MAIL_USE_TLS=False, MAIL_SUPPRESS_SEND=False)
+    queue(app, 'a@example.com')
+
+    drain(app)
+
+    entry = entries(app)['a@example.com']
+    assert (entry.status, entry.attempts) == ('pending', 1)
+
+def test_signup_and_password_reset_do_not_wait_for_smtp(app_factory, make_user):
+    with SmtpStub(delay=1.0) as slow:
+        app = app_factory(**slow.config())
+        client = app.test_client()
+        make_user(email='known@example.com')
+
+        started = time.perf_counter()
+        assert client.post('/api/auth/signup', json={
+            'firstName': 'New', 'lastName': 'Guest', 'email': 'new@example.com', 'password': 'secret123'
+        }).status_code == 201
+        assert client.post('/api/auth/forgot-password', json={'email': 'known@example.com'}).status_code == 200
+        # Each SMTP connection takes a second before it even greets
+        assert time.perf_counter() - started < slow.delay
+
+        # The outbox worker pays for the handshake instead
+        assert drain(app) == 2
+        assert sorted(recipients[0] for _, recipients, _ in slow.messages) == ['known@example.com', 'new@example.com']
@@ -0,0 +1,91 @@
+import time
+import pytest
+from app.utils.metrics import payment_rejected
+from app.utils.payments import payment_gateway
+from .stubs import GatewayStub
+
+@pytest.fixture
+def gateway():
+    with GatewayStub() as stub:
+        yield stub
+
+@pytest.fixture
+def client(app_factory, gateway):
+    return app_factory(**gateway.config()).test_client()
+
+def create_order(client):
+    return client.post('/api/bookings/create-order', json={'amount': 1500})
+
+def rejected():
+    return sum(value for _, value in payment_rejected.samples())
+
+def test_orders_are_created_through_the_gateway(client, gateway):
+    response = create_order(client)
+
+    assert response.status_code == 200
+    assert response.get_json()['order_id'] == 'order_stub1'
+    assert response.get_json()['amount'] == 150000
+    assert payment_gateway.breaker.state == 'closed'
+
+def test_server_errors_are_retried_then_open_the_breaker(client, gateway):
+    gateway.mode = 'error'
+
+    for _ in range(2):
+        assert create_order(client).status_code == 503
+    # One call plus RAZORPAY_MAX_RETRIES retries, each time
+    assert gateway.calls == 6
+    assert payment_gateway.breaker.state == 'open'
+
+    before = rejected()
+    response = create_order(client)
+    assert response.status_code == 503
+    assert gateway.calls == 6  # failed fast without touching the gateway
+    assert rejected() == before + 1
+
+def test_half_open_trial_closes_the_breaker_on_recovery(client, gateway):
+    gateway.mode = 'error'
+    for _ in range(2):
+        create_order(client)
+    assert payment_gateway.breaker.state == 'open'
+
+    time.sleep(0.5)
+    assert payment_gateway.breaker.state == 'half_open'
+    gateway.mode = 'ok'
+    calls = gateway.calls
+
+    assert create_order(client).status_code == 200
+    assert gateway.calls == calls + 1
+    assert payment_gateway.breaker.state == 'closed'
+    assert create_order(client).status_code == 200
+
+def test_failed_half_open_trial_reopens_the_breaker(client, gateway):
+    gateway.mode = 'error'
+    for _ in range(2):
+        create_order(client)
+    time.sleep(0.5)
+
+    assert create_order(client).status_code == 503
+    assert payment_gateway.breaker.state == 'open'
+    calls = gateway.calls
+    assert create_order(client).status_code == 503
+    assert gateway.calls == calls
+
+def test_slow_gateway_times_out_without_retrying(client, gateway):
+    gateway.mode, gateway.delay = 'slow', 1.0
+
+    started = time.perf_counter()
+    response = create_order(client)
+
+    # A read timeout may mean the order was created, so it is not retried
+    assert response.status_code == 503
+    assert gateway.calls == 1
+    assert time.perf_counter() - started < gateway.delay
+    assert payment_gateway.breaker.failures == 1
+
+def test_client_errors_do_not_trip_the_breaker(client, gateway):
+    gateway.mode = 'reject'
+
+    for _ in range(3):
+        assert create_order(client).status_code == 500
+    assert gateway.calls == 3
+    assert payment_gateway.breaker.state == 'closed'
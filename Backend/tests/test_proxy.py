@@ -0,0 +1,30 @@
+import pytest
+
+LOGIN_LIMIT = {'auth.login': ['2/minute:ip']}
+
+def login_statuses(client, forwarded_for):
+    return [
+        client.post('/api/auth/login', headers={'X-Forwarded-For': forwarded_for},
+                    json={'email': 'nobody@example.com', 'password': 'wrong'}).status_code
+        for _ in range(3)
+    ]
+
+@pytest.mark.parametrize('hops', [1, 2])
+def test_rate_limits_key_on_the_forwarded_client(app_factory, hops):
+    app = app_factory(RATE_LIMIT_ENABLED=True, RATE_LIMITS=LOGIN_LIMIT, PROXY_FIX_X_FOR=hops)
+    client = app.test_client()
+    # The last `hops` addresses were appended by trusted proxies; anything before them is client-supplied
+    proxies = ', '.join(['10.0.0.1'] * (hops - 1))
+
+    first = login_statuses(client, ', '.join(filter(None, ['203.0.113.7', proxies])))
+    second = login_statuses(client, ', '.join(filter(None, ['198.51.100.1, 203.0.113.8', proxies])))
+
+    assert first == second == [401, 401, 429]
+
+def test_forwarded_for_is_ignored_without_trusted_proxies(app_factory):
+    app = app_factory(RATE_LIMIT_ENABLED=True, RATE_LIMITS=LOGIN_LIMIT)
+    client = app.test_client()
+
+    assert login_statuses(client, '203.0.113.7')[:2] == [401, 401]
+    # A spoofed header does not buy a fresh bucket
+    assert login_statuses(client, '203.0.113.8') == [429, 429, 429]
@@ -0,0 +1,51 @@
+from datetime import timedelta
+from app.extensions import db
+from .test_bookings import future
+
+# Tables that grow with traffic; a hot query must reach them through an index
+GROWING_TABLES = ('bookings', 'room_nights', 'room_holds', 'users', 'otps')
+
+def full_scans(app, statements):
+    """EXPLAIN QUERY PLAN every recorded SELECT; returns the plan steps that scan a growing table."""
+    scans = []
+    with app.app_context():
+        connection = db.session.connection()
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith('SELECT'):
+                continue
+            for step in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters):
+                detail = step[-1]
+                if any(detail.startswith(f'SCAN {table}') for table in GROWING_TABLES):
+                    scans.append((detail, statement))
+    return scans
+
+def test_hot_queries_use_indexes(app, client, make_user, make_room, make_booking, statements):
+    user_id, headers = make_user(email='planner@example.com')
+    rooms = [make_room(name=f'Room {i}') for i in range(5)]
+    for i, room_id in enumerate(rooms):
+        make_booking(user_id, room_id, future(5 + i), nights=2)
+
+    del statements[:]
+    start = future(30)
+    end = start + timedelta(days=2)
+    assert client.post('/api/auth/login', json={'email': 'planner@example.com', 'password': 'secret123'}).status_code == 200
+    assert client.post('/api/bookings', headers=headers, json={
+        'room_id': rooms[0],
+        'start_date': start.strftime('%Y-%m-%d'),
+        'end_date': end.strftime('%Y-%m-%d'),
+        'guest_name': 'Test Guest',
+        'government_id': 'ABC123456',
+        'phone_number': '9999999999',
+        'amount': 200,
+        'payment_id': 'pay_plan'
+    }).status_code == 201
+    assert client.get('/api/bookings/my-bookings', headers=headers).status_code == 200
+    assert client.get('/api/bookings/my-bookings?limit=2', headers=headers).status_code == 200
+    assert client.get('/api/rooms/available', query_string={
+        'start': start.strftime('%Y-%m-%d'), 'end': end.strftime('%Y-%m-%d')
+    }).status_code == 200
+    assert client.get(f'/api/rooms/{rooms[1]}/availability', query_string={
+        'start': start.strftime('%Y-%m-%d'), 'end': end.strftime('%Y-%m-%d')
+    }).status_code == 200
+
+    assert full_scans(app, list(statements)) == []
@@ -0,0 +1,97 @@
+import pytest
+from app.utils import ratelimit
+from app.utils.ratelimit import rate_limiter
+
+class Clock:
+    """Stands in for the time module so buckets refill on demand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit, 'time', clock)
+    return clock
+
+@pytest.fixture
+def limited(app_factory):
+    def build(rules):
+        return app_factory(RATE_LIMIT_ENABLED=True, RATE_LIMITS=rules).test_client()
+    return build
+
+def forgot(client, email, ip='203.0.113.7'):
+    return client.post('/api/auth/forgot-password', json={'email': email},
+                       environ_base={'REMOTE_ADDR': ip}).status_code
+
+def test_over_limit_gets_429_with_retry_after(limited, clock):
+    client = limited({'auth.forgot_password': ['2/minute']})
+
+    assert [forgot(client, 'a@example.com') for _ in range(2)] == [404, 404]
+    response = client.post('/api/auth/forgot-password', json={'email': 'a@example.com'},
+                           environ_base={'REMOTE_ADDR': '203.0.113.7'})
+    assert response.status_code == 429
+    # Two per minute is one token every 30 seconds
+    assert response.headers['Retry-After'] == '30'
+    clock.now += 20
+    response = client.post('/api/auth/forgot-password', json={'email': 'a@example.com'},
+                           environ_base={'REMOTE_ADDR': '203.0.113.7'})
+    assert int(response.headers['Retry-After']) == pytest.approx(10, abs=1)  # rounded up
+    # Other addresses have their own bucket
+    assert forgot(client, 'a@example.com', ip='198.51.100.2') == 404
+
+def test_buckets_refill_over_time(limited, clock):
+    client = limited({'auth.forgot_password': ['2/minute']})
+    assert [forgot(client, 'a@example.com') for _ in range(3)] == [404, 404, 429]
+
+    clock.now += 30
+    assert [forgot(client, 'a@example.com') for _ in range(2)] == [404, 429]
+    clock.now += 3600
+    # Idle time refills the bucket only up to its capacity
+    assert [forgot(client, 'a@example.com') for _ in range(3)] == [404, 404, 429]
+
+def test_email_rules_key_on_the_normalized_address(limited, clock):
+    client = limited({'auth.forgot_password': ['1/minute:email']})
+
+    assert forgot(client, 'guest@example.com') == 404
+    assert forgot(client, '  Guest@Example.com ') == 429
+    assert forgot(client, 'other@example.com') == 404
+    # Requests without an email are not counted by an email rule
+    assert client.post('/api/auth/forgot-password', json={}).status_code == 400
+
+def test_user_rules_key_on_the_jwt_identity(limited, clock, make_user):
+    client = limited({'bookings.create_order': ['1/minute:user']})
+    _, first = make_user()
+    _, second = make_user()
+
+    def order(headers):
+        return client.post('/api/bookings/create-order', headers=headers, json={}).status_code
+
+    assert order(first) == 400
+    assert order(first) == 429
+    assert order(second) == 400
+    # Anonymous callers fall back to a bucket per address
+    assert order({}) == 400
+    assert order({}) == 429
+
+def test_a_refused_request_does_not_use_up_earlier_rules(limited, clock):
+    client = limited({'auth.forgot_password': ['3/minute:ip', '1/minute:email']})
+
+    assert [forgot(client, 'locked@example.com') for _ in range(4)] == [404, 429, 429, 429]
+    # Only the request the email rule let through was charged to the address
+    assert [forgot(client, f'user{i}@example.com') for i in range(3)] == [404, 404, 429]
+
+def test_backend_errors_fail_open(limited, clock, monkeypatch):
+    client = limited({'auth.forgot_password': ['1/minute']})
+
+    def broken(*args):
+        raise ConnectionError('rate limit store is down')
+    monkeypatch.setattr(rate_limiter.backend, 'consume', broken)
+
+    assert [forgot(client, 'a@example.com') for _ in range(3)] == [404, 404, 404]
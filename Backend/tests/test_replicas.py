@@ -0,0 +1,79 @@
+import sqlite3
+import pytest
+from sqlalchemy import event
+from app.extensions import db
+from .test_bookings import future
+
+REPORT = '/api/admin/reports/occupancy'
+REPLICAS = ('replica_0', 'replica_1')
+
+@pytest.fixture
+def app(app_factory, tmp_path):
+    """The app on a primary SQLite file, with two replica files beside it."""
+    return app_factory(SQLALCHEMY_BINDS={key: f'sqlite:///{tmp_path / key}.db' for key in REPLICAS})
+
+@pytest.fixture
+def replicate(app, tmp_path):
+    """Copy the primary onto every replica, as streaming replication eventually would."""
+    def replicate():
+        with app.app_context():
+            for key in REPLICAS:
+                db.engines[key].dispose()
+        with sqlite3.connect(tmp_path / 'hotel.db') as primary:
+            for key in REPLICAS:
+                with sqlite3.connect(tmp_path / f'{key}.db') as replica:
+                    primary.backup(replica)
+    return replicate
+
+def engine_log(app, keys):
+    """Bind keys that ran a statement, in order."""
+    used = []
+    with app.app_context():
+        for key in keys:
+            event.listen(db.engines[key], 'before_cursor_execute',
+                         lambda *args, key=key: used.append(key))
+    return used
+
+def test_read_only_views_read_from_one_replica_per_request(app, replicate, make_user, make_room):
+    _, admin = make_user(is_admin=True)
+    make_room(room_type='Single')
+    replicate()
+    used = engine_log(app, REPLICAS)
+    client = app.test_client()
+    query = {'start': future(1).strftime('%Y-%m-%d'), 'end': future(8).strftime('%Y-%m-%d')}
+
+    picked = set()
+    for _ in range(20):
+        del used[:]
+        response = client.get(REPORT, headers=admin, query_string=query)
+        assert response.status_code == 200
+        # The report runs several SELECTs and every one of them goes to the same replica
+        assert len(used) > 1 and len(set(used)) == 1
+        picked |= set(used)
+    assert picked == set(REPLICAS)
+
+def test_replica_lag_is_hidden_after_a_write(app, replicate, make_user, make_room):
+    _, headers = make_user()
+    client = app.test_client()
+    room_id = make_room()
+    replicate()
+    body = {
+        'room_id': room_id,
+        'start_date': future(3).strftime('%Y-%m-%d'),
+        'end_date': future(5).strftime('%Y-%m-%d'),
+        'guest_name': 'Test Guest',
+        'government_id': 'ABC123456',
+        'phone_number': '9999999999',
+        'amount': 200,
+        'payment_id': 'pay_replica'
+    }
+
+    # Another client reads from the replicas, which have not seen the booking yet
+    assert client.post('/api/bookings', headers=headers, json=body).status_code == 201
+    other = app.test_client()
+    assert other.get('/api/bookings/my-bookings', headers=headers).get_json() == []
+    # The writer's read-your-writes cookie pins it to the primary
+    assert len(client.get('/api/bookings/my-bookings', headers=headers).get_json()) == 1
+
+    replicate()
+    assert len(other.get('/api/bookings/my-bookings', headers=headers).get_json()) == 1
@@ -0,0 +1,44 @@
+from app.extensions import db
+from app.models.booking import Booking
+from app.models.booking_stat import DailyBookingStat
+from app.utils.reports import rebuild_booking_stats
+from .test_bookings import future
+
+def rollup(app):
+    with app.app_context():
+        return {
+            (stat.day, stat.room_type): (stat.nights_sold, round(stat.revenue, 2), stat.check_ins)
+            for stat in DailyBookingStat.query.all()
+            if stat.nights_sold or stat.revenue or stat.check_ins
+        }
+
+def test_cancelling_after_retyping_the_room_empties_the_rollup(app, client, make_user, make_room, make_booking):
+    user_id, headers = make_user()
+    _, admin = make_user(is_admin=True)
+    room_id = make_room(room_type='Single')
+    booking_id = make_booking(user_id, room_id, future(5), nights=2, amount=300.0)
+    assert rollup(app) == {
+        (future(5).date(), 'Single'): (1, 150.0, 1),
+        (future(6).date(), 'Single'): (1, 150.0, 0)
+    }
+
+    assert client.put(f'/api/rooms/{room_id}', headers=admin, json={'room_type': 'Double'}).status_code == 200
+    with app.app_context():
+        assert db.session.get(Booking, booking_id).room_type == 'Single'
+    assert client.delete(f'/api/bookings/{booking_id}', headers=headers).status_code == 200
+
+    assert rollup(app) == {}
+
+def test_rebuild_keeps_the_booked_room_type(app, client, make_user, make_room, make_booking):
+    user_id, _ = make_user()
+    _, admin = make_user(is_admin=True)
+    room_id = make_room(room_type='Single')
+    make_booking(user_id, room_id, future(5), nights=1, amount=100.0)
+    assert client.put(f'/api/rooms/{room_id}', headers=admin, json={'room_type': 'Double'}).status_code == 200
+    before = rollup(app)
+
+    with app.app_context():
+        rebuild_booking_stats()
+        db.session.commit()
+
+    assert rollup(app) == before == {(future(5).date(), 'Single'): (1, 100.0, 1)}
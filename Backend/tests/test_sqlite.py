@@ -0,0 +1,65 @@
+import sqlite3
+import threading
+import time
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.exc import OperationalError
+from app.extensions import db
+from app.models.room import Room
+
+@pytest.fixture
+def tuned(app_factory):
+    return app_factory(SQLITE_TUNING=True, SQLITE_WRITE_LOCK_TIMEOUT=5)
+
+def room(name):
+    return insert(Room).values(name=name, price=100.0, room_type='Single')
+
+def test_every_connection_gets_the_pragmas(tuned):
+    with tuned.app_context(), db.engine.connect() as connection:
+        pragma = lambda name: connection.execute(text(f'PRAGMA {name}')).scalar()
+        assert pragma('journal_mode') == 'wal'
+        assert pragma('synchronous') == 1  # NORMAL
+        assert pragma('busy_timeout') == tuned.config['SQLITE_BUSY_TIMEOUT']
+        assert pragma('cache_size') == tuned.config['SQLITE_CACHE_SIZE']
+        assert pragma('mmap_size') == tuned.config['SQLITE_MMAP_SIZE']
+
+def test_second_writer_connection_in_one_thread_fails_fast(tuned):
+    with tuned.app_context():
+        with db.engine.connect() as first:
+            first.execute(room('First'))
+            started = time.monotonic()
+            with pytest.raises(OperationalError, match='another connection'):
+                with db.engine.begin() as second:
+                    second.execute(room('Second'))
+            assert time.monotonic() - started < 1
+            # Reads on another connection are not held up
+            with db.engine.connect() as reader:
+                assert reader.execute(text('SELECT count(*) FROM rooms')).scalar() == 0
+            first.commit()
+
+        # Once the first commits, the same thread can write anywhere
+        with db.engine.begin() as second:
+            second.execute(room('Second'))
+        assert Room.query.count() == 2
+
+def test_concurrent_writers_queue_instead_of_failing(tuned):
+    errors = []
+
+    def write(worker):
+        try:
+            with tuned.app_context():
+                for i in range(20):
+                    with db.engine.begin() as connection:
+                        connection.execute(room(f'Room {worker}-{i}'))
+        except (sqlite3.Error, OperationalError) as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with tuned.app_context():
+        assert Room.query.count() == 160
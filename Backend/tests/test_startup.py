@@ -0,0 +1,15 @@
+from app.extensions import oauth
+from app.utils.payments import payment_gateway
+from benchmarks.import_time import IMPORT_BUDGET, eager_lazy_modules, profile_import
+
+def test_import_stays_within_budget_and_lazy():
+    modules = profile_import()
+
+    assert modules['app'][1] < IMPORT_BUDGET
+    assert eager_lazy_modules(modules) == []
+
+def test_create_app_does_not_reach_external_services(app):
+    # The Razorpay client and Google's OIDC metadata are fetched on first use
+    with app.app_context():
+        assert payment_gateway._client is None
+        assert oauth.google.server_metadata == {}
@@ -83,11 +83,19 @@ export const logout = async () => {
 
 
 // ROOMS
-export const getRooms = async () => {
-  const res = await API.get("/rooms");
+// Optional params: room_type, is_ac, has_parking, min_price, max_price,
+// availability, sort, limit, cursor (filtering is done server-side)
+export const getRooms = async (params = {}) => {
+  const res = await API.get("/rooms", { params });
   return res.data;
 };
 
+// One page of rooms: pass limit (and the previous nextCursor) to walk the catalog
+export const getRoomsPage = async (params = {}) => {
+  const res = await API.get("/rooms", { params });
+  return { rooms: res.data, nextCursor: res.headers["x-next-cursor"] || null };
+};
+
 export const getRoom = async (id) => {
   const res = await API.get(`/rooms/${id}`);
   return res.data;
@@ -128,9 +136,10 @@ export const bookRoom = async ({ room_id, start_date, end_date, guest_name, gove
   return res.data;
 };
 
-export const getMyBookings = async () => {
-  const res = await API.get("/bookings/my-bookings");
-  return res.data;
+// Newest first; pass { limit, cursor } to page, following the returned nextCursor
+export const getMyBookings = async (params = {}) => {
+  const res = await API.get("/bookings/my-bookings", { params });
+  return { bookings: res.data, nextCursor: res.headers["x-next-cursor"] || null };
 };
 
 // UPDATE PROFILE
@@ -94,7 +94,13 @@ const BookRoom = () => {
           'Content-Type': 'application/json',
           Authorization: `Bearer ${token}`,
         },
-        body: JSON.stringify({ amount: formData.amount }),
+        // Dates and room are sent so the server holds the room during checkout
+        body: JSON.stringify({
+          amount: formData.amount,
+          room_id: id,
+          start_date: formData.start_date,
+          end_date: formData.end_date,
+        }),
       });
 
       if (!orderResponse.ok) {
@@ -125,6 +131,7 @@ const BookRoom = () => {
               phone_number: formData.phone_number,
               amount: formData.amount,
               payment_id: response.razorpay_payment_id,
+              hold_id: order.hold_id,
             };
             const bookingResponse = await bookRoom(bookingData);
             toast.success('Room booked successfully!');
@@ -3,8 +3,12 @@ import { useNavigate } from "react-router-dom";
 import { getMyBookings } from "../../api/auth"; // Adjusted path to auth.js
 import { toast } from 'react-toastify';
 
+const PAGE_SIZE = 50;
+
 function MyBookings() {
   const [bookings, setBookings] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState("");
   const navigate = useNavigate();
 
@@ -17,8 +21,9 @@ function MyBookings() {
           navigate("/login");
           return;
         }
-        const bookingsResponse = await getMyBookings();
-        setBookings(bookingsResponse);
+        const page = await getMyBookings({ limit: PAGE_SIZE });
+        setBookings(page.bookings);
+        setNextCursor(page.nextCursor);
       } catch (err) {
         console.error("Error fetching bookings:", err);
         setError("Failed to fetch bookings: " + (err.response?.data?.message || err.message));
@@ -33,6 +38,20 @@ function MyBookings() {
     fetchMyBookings();
   }, [navigate]);
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await getMyBookings({ limit: PAGE_SIZE, cursor: nextCursor });
+      setBookings((previous) => [...previous, ...page.bookings]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Error fetching more bookings:", err);
+      toast.error("Failed to fetch bookings: " + (err.response?.data?.message || err.message));
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   return (
     <div className="min-h-screen bg-gray-100 px-4 py-6">
       <div className="max-w-4xl mx-auto">
@@ -56,6 +75,18 @@ function MyBookings() {
             ))}
           </div>
         )}
+
+        {nextCursor && (
+          <div className="text-center mt-6">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="px-6 py-2 bg-indigo-600 text-white rounded-lg hover:bg-indigo-700 transition duration-300 font-semibold shadow-md disabled:opacity-50"
+            >
+              {loadingMore ? "Loading..." : "Load more"}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
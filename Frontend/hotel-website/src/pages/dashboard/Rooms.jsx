@@ -1,55 +1,118 @@
 import { useState, useEffect } from "react";
 import { Link, useNavigate } from "react-router-dom";
-import { getRooms, deleteRoom, getUserDetails } from "../../api/auth"; // Updated path and added getUserDetails
+import { getRoomsPage, deleteRoom, getUserDetails } from "../../api/auth"; // Updated path and added getUserDetails
 import { toast } from 'react-toastify';
 import { FaBed, FaRupeeSign, FaCheckCircle, FaTimesCircle, FaParking, FaEdit, FaTrash, FaPlus, FaSpinner } from 'react-icons/fa'; // Importing icons
 
+const PAGE_SIZE = 24;
+const ROOM_TYPES = ["Single", "Double", "Twin", "Queen", "King", "Suites"];
+const SORT_OPTIONS = [
+  { value: "id", label: "Default" },
+  { value: "price", label: "Price: low to high" },
+  { value: "-price", label: "Price: high to low" },
+  { value: "name", label: "Name" },
+  { value: "-created_at", label: "Newest" },
+];
+const EMPTY_FILTERS = { room_type: "", is_ac: false, has_parking: false, min_price: "", max_price: "", sort: "id" };
+
+// Only send the filters that are set; the server does the filtering and paging
+const toParams = (filters, cursor) => {
+  const params = { limit: PAGE_SIZE, sort: filters.sort };
+  if (filters.room_type) params.room_type = filters.room_type;
+  if (filters.is_ac) params.is_ac = true;
+  if (filters.has_parking) params.has_parking = true;
+  if (filters.min_price) params.min_price = filters.min_price;
+  if (filters.max_price) params.max_price = filters.max_price;
+  if (cursor) params.cursor = cursor;
+  return params;
+};
+
 function Rooms() {
   const [rooms, setRooms] = useState([]);
+  const [filters, setFilters] = useState(EMPTY_FILTERS);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState("");
   const [loading, setLoading] = useState(true);
   const [isAdmin, setIsAdmin] = useState(false); // State to store admin status
   const navigate = useNavigate();
 
+  const handleError = (err, fallback) => {
+    const errorMessage =
+      err.response?.data?.message ||
+      err.message ||
+      fallback;
+    setError(errorMessage);
+    toast.error("Error: " + errorMessage);
+    // If authentication fails, redirect to login
+    if (err.response?.status === 401) {
+      localStorage.removeItem("token");
+      navigate("/login");
+    }
+  };
+
   useEffect(() => {
-    const fetchRoomsAndAdminStatus = async () => {
-      try {
-        const token = localStorage.getItem("token");
-        if (!token) {
-          setError("Please log in to view rooms.");
-          toast.error("Please log in to view rooms.");
-          navigate("/login");
-          return;
-        }
-
-        // Fetch rooms and user details in parallel
-        const [roomsData, userData] = await Promise.all([
-          getRooms(),
-          getUserDetails()
-        ]);
-
-        setRooms(roomsData);
-        setIsAdmin(userData.is_admin); // Set admin status
-        setLoading(false);
-      } catch (err) {
-        console.error("Failed to fetch rooms or user details:", err);
-        const errorMessage =
-          err.response?.data?.message ||
-          err.message ||
-          "Failed to load rooms. Please try again.";
-        setError(errorMessage);
-        toast.error("Error: " + errorMessage);
-        setLoading(false);
-        // If authentication fails, redirect to login
-        if (err.response?.status === 401) {
-          localStorage.removeItem("token");
-          navigate("/login");
-        }
-      }
-    };
-    fetchRoomsAndAdminStatus();
+    const token = localStorage.getItem("token");
+    if (!token) {
+      setError("Please log in to view rooms.");
+      toast.error("Please log in to view rooms.");
+      navigate("/login");
+      return;
+    }
+    getUserDetails()
+      .then((userData) => setIsAdmin(userData.is_admin)) // Set admin status
+      .catch((err) => {
+        console.error("Failed to fetch user details:", err);
+        handleError(err, "Failed to load user details.");
+      });
   }, [navigate]);
 
+  // Refetch the first page whenever the filters change
+  useEffect(() => {
+    if (!localStorage.getItem("token")) {
+      return;
+    }
+    let cancelled = false;
+    setLoading(true);
+    getRoomsPage(toParams(filters))
+      .then((page) => {
+        if (cancelled) return;
+        setRooms(page.rooms);
+        setNextCursor(page.nextCursor);
+        setError("");
+      })
+      .catch((err) => {
+        if (cancelled) return;
+        console.error("Failed to fetch rooms:", err);
+        handleError(err, "Failed to load rooms. Please try again.");
+      })
+      .finally(() => {
+        if (!cancelled) setLoading(false);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [filters]);
+
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await getRoomsPage(toParams(filters, nextCursor));
+      setRooms((previous) => [...previous, ...page.rooms]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Failed to fetch more rooms:", err);
+      handleError(err, "Failed to load rooms. Please try again.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const updateFilter = (event) => {
+    const { name, type, value, checked } = event.target;
+    setFilters((previous) => ({ ...previous, [name]: type === "checkbox" ? checked : value }));
+  };
+
   const handleDeleteRoom = async (id) => {
     if (!window.confirm("Are you sure you want to delete this room?")) {
       return;
@@ -69,7 +132,7 @@ function Rooms() {
     }
   };
 
-  if (loading) {
+  if (loading && rooms.length === 0) {
     return (
       <div className="min-h-screen flex items-center justify-center bg-gradient-to-br from-indigo-500 via-purple-500 to-pink-500">
         <FaSpinner className="animate-spin text-white text-4xl" />
@@ -93,6 +156,44 @@ function Rooms() {
           )}
         </div>
 
+        <div className="grid grid-cols-2 md:grid-cols-6 gap-3 mb-8 items-end">
+          <select name="room_type" value={filters.room_type} onChange={updateFilter} className="border rounded-lg px-3 py-2">
+            <option value="">All types</option>
+            {ROOM_TYPES.map((type) => (
+              <option key={type} value={type}>{type}</option>
+            ))}
+          </select>
+          <input
+            type="number"
+            name="min_price"
+            min="0"
+            placeholder="Min price"
+            value={filters.min_price}
+            onChange={updateFilter}
+            className="border rounded-lg px-3 py-2"
+          />
+          <input
+            type="number"
+            name="max_price"
+            min="0"
+            placeholder="Max price"
+            value={filters.max_price}
+            onChange={updateFilter}
+            className="border rounded-lg px-3 py-2"
+          />
+          <label className="flex items-center text-gray-700">
+            <input type="checkbox" name="is_ac" checked={filters.is_ac} onChange={updateFilter} className="mr-2" /> AC
+          </label>
+          <label className="flex items-center text-gray-700">
+            <input type="checkbox" name="has_parking" checked={filters.has_parking} onChange={updateFilter} className="mr-2" /> Parking
+          </label>
+          <select name="sort" value={filters.sort} onChange={updateFilter} className="border rounded-lg px-3 py-2">
+            {SORT_OPTIONS.map((option) => (
+              <option key={option.value} value={option.value}>{option.label}</option>
+            ))}
+          </select>
+        </div>
+
         {error && (
           <div className="bg-red-100 border border-red-400 text-red-700 px-4 py-3 rounded-lg relative mb-6" role="alert">
             <span className="block sm:inline">{error}</span>
@@ -100,7 +201,7 @@ function Rooms() {
         )}
 
         {rooms.length === 0 ? (
-          <p className="text-center text-gray-600 text-lg py-10">No rooms available at the moment.</p>
+          <p className="text-center text-gray-600 text-lg py-10">No rooms match these filters.</p>
         ) : (
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
             {rooms.map((room) => (
@@ -165,6 +266,18 @@ function Rooms() {
             ))}
           </div>
         )}
+
+        {nextCursor && (
+          <div className="text-center mt-8">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="px-6 py-3 bg-indigo-600 text-white rounded-lg hover:bg-indigo-700 transition duration-300 shadow-md font-semibold disabled:opacity-50"
+            >
+              {loadingMore ? "Loading..." : "Load more rooms"}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );